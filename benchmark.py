@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline cho TikTok View Counter
+Chạy scraper trên fixture server local (không cần truy cập TikTok thật)
+
+Kịch bản:
+  - synthetic: kênh giả lập N = 100 / 1,000 / 10,000 video, đo thời gian
+    navigation / scroll / extract, peak RSS và số round-trip
+  - coverage: mọi bố cục VIDEO_SELECTORS x mọi chiến lược view (aria-label,
+    title attribute, text) ở N nhỏ
+  - parser: throughput của parse_counts so với parse_view_count cũ trên 1M chuỗi
+  - records: bộ nhớ + thời gian của 1M VideoRecord so với 1M dict, và báo cáo
+    top 10 bằng heap một lần duyệt so với lọc + sort toàn bộ
+  - request-blocking: so sánh có/không chặn request (--block)
+  - fast-path: fast path HTTP (JSON rehydration) so với browser trên cùng kênh
+  - attach: thời gian khởi động -> điều hướng đầu tiên khi launch mới (cold)
+    và khi gắn vào browser server (--connect)
+  - enrich: kênh synthetic chỉ có view làm tròn (text), so sánh sai số tổng view
+    khi không enrich và khi enrich đủ / giới hạn số trang video
+  - rate-limit: nhiều worker fast path trên fixture server giả lập throttle
+    (429 khi vượt capacity, latency tăng theo tải): không giới hạn, tốc độ cố
+    định thận trọng và rate controller thích ứng (không cần Chromium)
+  - selector-plan: kênh synthetic bố cục 3 + view dạng text (chuỗi fallback dài
+    nhất), thời gian extract khi dò đầy đủ, khi vừa học plan và khi dùng plan đã lưu
+
+Kết quả được ghi thêm (append) vào file JSON Lines để so sánh giữa các lần chạy.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import random
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+from playwright.async_api import async_playwright
+
+from browser_server import start_browser_server
+from fast_path import HttpPool
+from fixture_server import (
+    SYNTHETIC_LAYOUTS, FixtureHandler, ThrottlingFixtureHandler, start_fixture_server,
+    synthetic_play_count
+)
+from metrics import process_tree_rss
+from rate_limiter import AdaptiveRateLimiter
+from video_records import VideoList, VideoRecord, summarize_videos
+from tiktok_counter import (
+    BLOCK_CATEGORIES, TikTokViewCounter, parse_block_arg, parse_count, parse_counts
+)
+
+SCENARIOS = ['synthetic', 'coverage', 'parser', 'records', 'blocking', 'fast-path', 'attach', 'enrich',
+             'rate-limit', 'selector-plan']
+DEFAULT_SCENARIOS = ['synthetic', 'coverage', 'parser', 'records']
+DEFAULT_SIZES = [100, 1000, 10000]
+PARSER_STRINGS = 1000000
+PARSER_DISTINCT = 50000  # Số chuỗi hiển thị khác nhau trong tập benchmark parser
+RECORD_COUNT = 1000000
+# Nguồn view giống kết quả thật (chuỗi selector dài lặp lại ở mọi video)
+RECORD_SOURCES = [
+    'aria-label',
+    'title-strong[data-e2e="video-views"]',
+    'text-strong[data-e2e="video-views"]',
+    'api-item-list',
+]
+COVERAGE_SIZE = 100
+COVERAGE_STRATEGIES = ['aria', 'title', 'text']
+RSS_SAMPLE_INTERVAL = 0.1  # giây
+ENRICH_SIZE = 100
+ENRICH_LIMIT = 10  # Số trang video của biến thể enrich giới hạn
+RATE_CAPACITY = 20.0  # req/s mà fixture server throttle chịu được
+RATE_WORKERS = 16
+RATE_DURATION = 10.0  # giây cho mỗi biến thể
+SELECTOR_PLAN_SIZE = 2000
+
+
+class RssSampler:
+    """
+    Lấy mẫu RSS của cây process trong nền, giữ lại giá trị lớn nhất
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            self.peak = max(self.peak, process_tree_rss())
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self.peak = max(self.peak, process_tree_rss())
+
+
+async def _timed_scrape(channel_url: str, verbose: bool = False, **counter_kwargs) -> tuple:
+    """
+    Scrape một kênh fixture, đo wall time và peak RSS
+    Returns: (result, wall_seconds, peak_rss_bytes)
+    """
+    counter = TikTokViewCounter(**counter_kwargs)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    async with RssSampler() as rss:
+        started = time.perf_counter()
+        with output:
+            result = await counter.scrape_channel(channel_url)
+        elapsed = time.perf_counter() - started
+
+    return result, round(elapsed, 3), rss.peak
+
+
+async def run_synthetic(base_url: str, n: int, layout: int = 0, strategy: str = 'mixed',
+                        scenario: str = 'synthetic', verbose: bool = False) -> Dict:
+    """
+    Chạy scraper trên kênh synthetic n video với bố cục / chiến lược cho trước
+    """
+    channel_url = f"{base_url}/@bench?n={n}&layout={layout}&strategy={strategy}"
+    FixtureHandler.reset_stats()
+    result, elapsed, peak_rss = await _timed_scrape(channel_url, verbose)
+
+    return {
+        'scenario': scenario,
+        'n': n,
+        'layout': layout,
+        'selector': SYNTHETIC_LAYOUTS[layout],
+        'strategy': strategy,
+        'wall_seconds': elapsed,
+        'navigation_seconds': result.get('navigation_seconds'),
+        'scroll_seconds': result.get('scroll_seconds'),
+        'extraction_seconds': result.get('extraction_seconds'),
+        'scroll_steps': result.get('scroll_steps'),
+        'extraction_round_trips': result.get('extraction_round_trips'),
+        'total_videos': result.get('total_videos', 0),
+        'total_views': result.get('total_views', 0),
+        'expected_total_views': sum(synthetic_play_count(i) for i in range(n)),
+        'sources': dict(Counter(v['source'] for v in result.get('videos', []))),
+        'peak_rss_bytes': peak_rss,
+        'bytes_served': FixtureHandler.stats()['bytes_served'],
+        'error': result.get('error'),
+    }
+
+
+async def run_scrape(channel_url: str, verbose: bool = False, **counter_kwargs) -> Dict:
+    """
+    Scrape một kênh fixture và đo wall time + dung lượng server đã phục vụ
+    """
+    FixtureHandler.reset_stats()
+    result, elapsed, peak_rss = await _timed_scrape(channel_url, verbose, **counter_kwargs)
+
+    served = FixtureHandler.stats()
+    return {
+        'wall_seconds': elapsed,
+        'bytes_served': served['bytes_served'],
+        'requests_served': served['requests_served'],
+        'total_videos': result.get('total_videos', 0),
+        'total_views': result.get('total_views', 0),
+        'startup_seconds': result.get('startup_seconds'),
+        'blocked_requests': result.get('blocked_requests', {}),
+        'enriched_videos': result.get('enriched_videos', 0),
+        'enrich_seconds': result.get('enrich_seconds', 0.0),
+        'extraction_seconds': result.get('extraction_seconds'),
+        'extraction_round_trips': result.get('extraction_round_trips'),
+        'selector_plan': result.get('selector_plan'),
+        'peak_rss_bytes': peak_rss,
+        'error': result.get('error'),
+    }
+
+
+async def compare_blocking(channel_url: str, block: List[str], verbose: bool = False) -> Dict:
+    """
+    So sánh scrape không chặn và có chặn request trên cùng fixture
+    """
+    baseline = await run_scrape(channel_url, verbose)
+    blocked = await run_scrape(channel_url, verbose, block=block)
+
+    return {
+        'scenario': 'request-blocking',
+        'block': block,
+        'baseline': baseline,
+        'blocked': blocked,
+        'wall_reduction_pct': _reduction(baseline['wall_seconds'], blocked['wall_seconds']),
+        'transfer_reduction_pct': _reduction(baseline['bytes_served'], blocked['bytes_served']),
+    }
+
+
+async def compare_fast_path(channel_url: str, verbose: bool = False) -> Dict:
+    """
+    So sánh browser và fast path HTTP trên kênh có JSON rehydration đầy đủ
+    """
+    browser = await run_scrape(channel_url, verbose)
+    fast = await run_scrape(channel_url, verbose, fast_path=True)
+
+    return {
+        'scenario': 'fast-path',
+        'browser': browser,
+        'fast': fast,
+        'same_total_views': browser['total_views'] == fast['total_views'],
+        'wall_reduction_pct': _reduction(browser['wall_seconds'], fast['wall_seconds']),
+        'rss_reduction_pct': _reduction(browser['peak_rss_bytes'], fast['peak_rss_bytes']),
+    }
+
+
+async def compare_enrich(base_url: str, n: int = ENRICH_SIZE, limit: int = ENRICH_LIMIT,
+                         verbose: bool = False) -> Dict:
+    """
+    So sánh sai số tổng view trên kênh chỉ có view làm tròn: không enrich,
+    enrich `limit` video sai số lớn nhất và enrich toàn bộ
+    """
+    channel_url = f"{base_url}/@bench?n={n}&layout=0&strategy=text"
+    expected = sum(synthetic_play_count(i) for i in range(n))
+    runs = {
+        'grid': await run_scrape(channel_url, verbose),
+        'limited': await run_scrape(channel_url, verbose, enrich=limit),
+        'full': await run_scrape(channel_url, verbose, enrich=0),
+    }
+    for run in runs.values():
+        run['abs_error'] = abs(run['total_views'] - expected)
+
+    return dict(scenario='enrich', n=n, limit=limit, expected_total_views=expected, **runs)
+
+
+async def compare_selector_plan(base_url: str, n: int = SELECTOR_PLAN_SIZE, verbose: bool = False) -> Dict:
+    """
+    So sánh extract dò đầy đủ từng item, học plan trong lần chạy đầu và dùng plan
+    đã lưu ở lần chạy sau (file plan tạm, không đụng tới file của người dùng)
+    """
+    channel_url = f"{base_url}/@bench?n={n}&layout=3&strategy=text"
+    with tempfile.TemporaryDirectory() as tmp:
+        plans = os.path.join(tmp, 'selector_plans.json')
+        runs = {
+            'probe': await run_scrape(channel_url, verbose),
+            'learned': await run_scrape(channel_url, verbose, selector_plans=plans),
+            'cached': await run_scrape(channel_url, verbose, selector_plans=plans),
+        }
+
+    return dict(scenario='selector-plan', n=n, **runs,
+                same_total_views=len({run['total_views'] for run in runs.values()}) == 1,
+                extraction_reduction_pct=_reduction(runs['probe']['extraction_seconds'] or 0,
+                                                    runs['cached']['extraction_seconds'] or 0))
+
+
+async def compare_attach(channel_url: str, verbose: bool = False) -> Dict:
+    """
+    So sánh thời gian khởi động -> điều hướng đầu tiên: launch Chromium mới
+    và gắn vào browser server đã chạy sẵn (profile tạm)
+    """
+    cold = await run_scrape(channel_url, verbose)
+
+    with tempfile.TemporaryDirectory() as profile_dir:
+        async with async_playwright() as p:
+            context, endpoint = await start_browser_server(TikTokViewCounter(), p, profile_dir, port=0)
+            try:
+                attached = await run_scrape(channel_url, verbose, connect=endpoint)
+            finally:
+                await context.close()
+
+    return {
+        'scenario': 'attach',
+        'cold': cold,
+        'attached': attached,
+        'startup_reduction_pct': _reduction(cold['startup_seconds'], attached['startup_seconds']),
+        'wall_reduction_pct': _reduction(cold['wall_seconds'], attached['wall_seconds']),
+    }
+
+
+def legacy_parse_view_count(view_str: str) -> int:
+    """
+    parse_view_count trước khi có parse_count (chỉ để so sánh throughput)
+    """
+    if not view_str:
+        return 0
+
+    view_str = view_str.strip().upper()
+    multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
+
+    for suffix, multiplier in multipliers.items():
+        if suffix in view_str:
+            try:
+                num_str = view_str.replace(suffix, '').strip()
+                return round(float(num_str) * multiplier)
+            except:
+                continue
+
+    try:
+        clean_str = re.sub(r'[^\d]', '', view_str)
+        return int(clean_str) if clean_str else 0
+    except:
+        return 0
+
+
+def synthetic_view_texts(count: int, distinct: int = PARSER_DISTINCT, seed: int = 42) -> List[str]:
+    """
+    Tập chuỗi view giống view_text đã lưu: số đầy đủ, dạng rút gọn English,
+    tiếng Việt và CJK; lặp lại nhiều (phân phối lệch về vài chuỗi phổ biến)
+    """
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        value = int(rng.paretovariate(0.8) * 500)
+        form = rng.random()
+        if form < 0.3:
+            pool.append(f"{value:,}")
+        elif form < 0.7:
+            pool.append(_rounded(value, ('K', 'M', 'B'), '.'))
+        elif form < 0.9:
+            pool.append(_rounded(value, (' N', ' Tr', ' T'), ','))
+        else:
+            pool.append(f"{value / 10000:.1f}万" if value >= 10000 else str(value))
+
+    # Zipf: vài chuỗi ("1.2K", "523") chiếm phần lớn
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return rng.choices(pool, weights=weights, k=count)
+
+
+def _rounded(value: int, suffixes: tuple, decimal: str) -> str:
+    for divisor, suffix in zip((1e9, 1e6, 1e3), reversed(suffixes)):
+        if value >= divisor:
+            return f"{value / divisor:.1f}".replace('.', decimal) + suffix
+    return str(value)
+
+
+def run_parser_benchmark(count: int = PARSER_STRINGS) -> Dict:
+    """
+    So sánh throughput parse_view_count cũ với parse_counts (cache nguội và nóng)
+    """
+    texts = synthetic_view_texts(count)
+
+    started = time.perf_counter()
+    legacy = [legacy_parse_view_count(text) for text in texts]
+    legacy_seconds = time.perf_counter() - started
+
+    parse_count.cache_clear()
+    started = time.perf_counter()
+    parsed = parse_counts(texts)
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parse_counts(texts)
+    warm_seconds = time.perf_counter() - started
+
+    return {
+        'scenario': 'parser',
+        'strings': count,
+        'distinct': len(set(texts)),
+        'legacy_seconds': round(legacy_seconds, 3),
+        'cold_seconds': round(cold_seconds, 3),
+        'warm_seconds': round(warm_seconds, 3),
+        'legacy_per_second': round(count / legacy_seconds),
+        'cold_per_second': round(count / cold_seconds),
+        'warm_per_second': round(count / warm_seconds),
+        'speedup_cold': round(legacy_seconds / cold_seconds, 2),
+        'legacy_mismatches': sum(1 for a, b in zip(legacy, parsed) if a != b),
+        'cache': parse_count.cache_info()._asdict(),
+    }
+
+
+def print_parser_results(result: Dict):
+    """
+    In kết quả benchmark parser
+    """
+    print("\n" + "="*60)
+    print(f"🔢 BENCHMARK PARSER ({result['strings']:,} chuỗi, {result['distinct']:,} khác nhau)")
+    print("="*60)
+    print(f"parse_view_count cũ: {result['legacy_seconds']:.2f}s ({result['legacy_per_second']:,}/s)")
+    print(f"parse_counts (nguội): {result['cold_seconds']:.2f}s ({result['cold_per_second']:,}/s), "
+          f"nhanh hơn {result['speedup_cold']}x")
+    print(f"parse_counts (nóng): {result['warm_seconds']:.2f}s ({result['warm_per_second']:,}/s)")
+    print(f"Khác kết quả với bản cũ: {result['legacy_mismatches']:,} chuỗi (tiếng Việt / CJK)")
+    print("="*60)
+
+
+def _record_values(count: int):
+    """
+    Giá trị video synthetic. Chuỗi được decode lại mỗi lần như khi đọc từ
+    page.evaluate (mỗi video giữ một object chuỗi riêng, kể cả source)
+    """
+    for i in range(count):
+        views = synthetic_play_count(i)
+        yield (i + 1, views, str(views), RECORD_SOURCES[i % len(RECORD_SOURCES)].encode().decode(),
+               f"https://www.tiktok.com/@bench/video/{7300000000000000000 + i}", f"Synthetic video {i}")
+
+
+def _legacy_record(index, views, view_text, source, link, caption) -> Dict:
+    return {'index': index, 'views': views, 'view_text': view_text,
+            'source': source, 'link': link, 'caption': caption}
+
+
+def _build_records(factory, container, count: int) -> tuple:
+    """
+    Tạo `count` bản ghi, đo thời gian và bộ nhớ tăng thêm (tracemalloc, đo ở lần chạy riêng)
+    Returns: (records, seconds, bytes)
+    """
+    started = time.perf_counter()
+    records = container(factory(*values) for values in _record_values(count))
+    seconds = time.perf_counter() - started
+    del records
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    records = container(factory(*values) for values in _record_values(count))
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return records, seconds, used
+
+
+def _legacy_report(videos: List[Dict]) -> tuple:
+    """
+    Thống kê báo cáo như print_report cũ: đếm nguồn, lọc bản sao, sort toàn bộ
+    """
+    sources = {}
+    for video in videos:
+        src = video.get('source', 'unknown')
+        sources[src] = sources.get(src, 0) + 1
+    videos_with_views = [v for v in videos if v['views'] > 0]
+    top = sorted(videos_with_views, key=lambda x: x['views'], reverse=True)[:10]
+    return sources, len(videos_with_views), top
+
+
+def run_records_benchmark(count: int = RECORD_COUNT) -> Dict:
+    """
+    So sánh dict với VideoRecord: bộ nhớ, thời gian tạo và thời gian tính báo cáo
+    """
+    dicts, dict_seconds, dict_bytes = _build_records(_legacy_record, list, count)
+    started = time.perf_counter()
+    legacy = _legacy_report(dicts)
+    legacy_report_seconds = time.perf_counter() - started
+    del dicts
+
+    records, record_seconds, record_bytes = _build_records(VideoRecord, VideoList, count)
+    started = time.perf_counter()
+    summary = summarize_videos(records, 10)
+    report_seconds = time.perf_counter() - started
+
+    return {
+        'scenario': 'records',
+        'records': count,
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'memory_reduction_pct': _reduction(dict_bytes, record_bytes),
+        'dict_build_seconds': round(dict_seconds, 3),
+        'record_build_seconds': round(record_seconds, 3),
+        'legacy_report_seconds': round(legacy_report_seconds, 3),
+        'report_seconds': round(report_seconds, 3),
+        'report_speedup': round(legacy_report_seconds / report_seconds, 2) if report_seconds else None,
+        'same_report': (legacy[0] == summary[0] and legacy[1] == summary[1]
+                        and [v['link'] for v in legacy[2]] == [v.link for v in summary[2]]),
+    }
+
+
+def print_records_results(result: Dict):
+    """
+    In kết quả benchmark bản ghi video
+    """
+    print("\n" + "="*60)
+    print(f"🧱 BENCHMARK BẢN GHI VIDEO ({result['records']:,} video)")
+    print("="*60)
+    print(f"dict:        {result['dict_bytes'] / 1024 / 1024:>8.1f} MB, tạo trong {result['dict_build_seconds']:.2f}s")
+    print(f"VideoRecord: {result['record_bytes'] / 1024 / 1024:>8.1f} MB, tạo trong {result['record_build_seconds']:.2f}s "
+          f"(giảm {result['memory_reduction_pct']}% bộ nhớ)")
+    print(f"Báo cáo (lọc + sort toàn bộ): {result['legacy_report_seconds']:.3f}s")
+    print(f"Báo cáo (1 lần duyệt + heap top 10): {result['report_seconds']:.3f}s "
+          f"(nhanh hơn {result['report_speedup']}x)")
+    print(f"Cùng kết quả báo cáo: {result['same_report']}")
+    print("="*60)
+
+
+def _reduction(before: float, after: float) -> float:
+    return round((before - after) / before * 100, 1) if before else 0.0
+
+
+async def run_rate_variant(base_url: str, limiter, workers: int, duration: float,
+                           verbose: bool = False) -> Dict:
+    """
+    `workers` worker fast path cùng tải trang kênh liên tục trong `duration` giây
+    """
+    ThrottlingFixtureHandler.configure()
+    FixtureHandler.reset_stats()
+    counter = TikTokViewCounter(fast_path=True, rate_limiter=limiter)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    completed = failed = 0
+
+    async def worker(client, deadline):
+        nonlocal completed, failed
+        while time.perf_counter() < deadline:
+            result = await counter._spawn().fetch_channel_http(f"{base_url}/@hydrated", client)
+            if result is None:
+                failed += 1
+            else:
+                completed += 1
+
+    with output:
+        async with HttpPool(limit_per_host=workers) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client, started + duration) for _ in range(workers)))
+            elapsed = time.perf_counter() - started
+
+    refused = ThrottlingFixtureHandler.throttle_stats()
+    sent = completed + failed
+    return {
+        'completed': completed,
+        'failed': failed,
+        'goodput_per_second': round(completed / elapsed, 2),
+        'throttled_429': refused['throttled'],
+        'overloaded_503': refused['overloaded'],
+        'refused_pct': round(100 * failed / sent, 1) if sent else 0.0,
+        'rate_limit': limiter.snapshot() if limiter else None,
+    }
+
+
+async def compare_rate_limit(capacity: float = RATE_CAPACITY, workers: int = RATE_WORKERS,
+                             duration: float = RATE_DURATION, verbose: bool = False) -> Dict:
+    """
+    So sánh không giới hạn / tốc độ cố định (capacity/4) / rate controller thích ứng
+    trên fixture server chỉ chịu được `capacity` req/s
+    """
+    ThrottlingFixtureHandler.configure(capacity=capacity, max_in_flight=workers // 2)
+    server, base_url = start_fixture_server(handler=ThrottlingFixtureHandler)
+    try:
+        fixed_rate = capacity / 4
+        variants = {
+            'unpaced': None,
+            'fixed': AdaptiveRateLimiter(rate=fixed_rate, min_rate=fixed_rate, max_rate=fixed_rate),
+            'adaptive': AdaptiveRateLimiter(rate=2, max_rate=capacity * 4),
+        }
+        runs = {}
+        for label, limiter in variants.items():
+            print(f"⏱️ rate-limit {label}...")
+            runs[label] = await run_rate_variant(base_url, limiter, workers, duration, verbose)
+    finally:
+        server.shutdown()
+
+    return dict(scenario='rate-limit', capacity=capacity, workers=workers, duration=duration, **runs)
+
+
+def print_rate_limit_comparison(comparison: Dict):
+    """
+    In bảng so sánh các chế độ giới hạn tốc độ
+    """
+    print("\n" + "="*60)
+    print(f"🚦 RATE CONTROLLER ({comparison['workers']} worker, server chịu {comparison['capacity']} req/s)")
+    print("="*60)
+    for label in ('unpaced', 'fixed', 'adaptive'):
+        run = comparison[label]
+        line = (f"{label:>9}: {run['goodput_per_second']:>6.2f} kênh/s thành công, "
+                f"{run['throttled_429']} x 429, {run['overloaded_503']} x 503 "
+                f"({run['refused_pct']}% bị từ chối)")
+        if run['rate_limit']:
+            line += f", rate cuối {run['rate_limit']['rate']} req/s"
+        print(line)
+    print("="*60)
+
+
+def print_synthetic_results(results: List[Dict]):
+    """
+    In bảng kết quả các kịch bản synthetic / coverage
+    """
+    print("\n" + "="*100)
+    print("📊 BENCHMARK SYNTHETIC")
+    print("="*100)
+    print(f"{'scenario':<10} {'n':>6} {'layout':>6} {'strategy':<8} {'wall':>8} {'nav':>7} {'scroll':>8} "
+          f"{'extract':>8} {'rt':>5} {'videos':>7} {'views ok':>8} {'RSS MB':>7}")
+    for r in results:
+        views_ok = 'yes' if r['total_views'] == r['expected_total_views'] else 'rounded'
+        if r['error']:
+            views_ok = 'error'
+        print(f"{r['scenario']:<10} {r['n']:>6} {r['layout']:>6} {r['strategy']:<8} {r['wall_seconds']:>7.2f}s "
+              f"{r['navigation_seconds'] or 0:>6.2f}s {r['scroll_seconds'] or 0:>7.2f}s "
+              f"{r['extraction_seconds'] or 0:>7.2f}s {r['extraction_round_trips'] or 0:>5} "
+              f"{r['total_videos']:>7} {views_ok:>8} {r['peak_rss_bytes'] / 1024 / 1024:>7.0f}")
+    print("="*100)
+
+
+def print_blocking_comparison(comparison: Dict):
+    """
+    In bảng so sánh có/không chặn request
+    """
+    print("\n" + "="*60)
+    print(f"🚫 SO SÁNH CHẶN REQUEST ({','.join(comparison['block'])})")
+    print("="*60)
+    for label in ('baseline', 'blocked'):
+        run = comparison[label]
+        print(f"{label:>9}: {run['wall_seconds']:.2f}s, {run['bytes_served'] / 1024:.0f} KB, "
+              f"{run['requests_served']} request, {run['total_videos']} video")
+    print(f"⏱️ Giảm thời gian: {comparison['wall_reduction_pct']}%")
+    print(f"📦 Giảm dung lượng: {comparison['transfer_reduction_pct']}%")
+    print("="*60)
+
+
+def print_fast_path_comparison(comparison: Dict):
+    """
+    In bảng so sánh browser và fast path HTTP
+    """
+    print("\n" + "="*60)
+    print("⚡ SO SÁNH FAST PATH HTTP VÀ BROWSER")
+    print("="*60)
+    for label in ('browser', 'fast'):
+        run = comparison[label]
+        print(f"{label:>9}: {run['wall_seconds']:.2f}s, peak RSS {run['peak_rss_bytes'] / 1024 / 1024:.0f} MB, "
+              f"{run['requests_served']} request, {run['total_videos']} video, {run['total_views']:,} views")
+    print(f"⏱️ Giảm thời gian: {comparison['wall_reduction_pct']}%")
+    print(f"🧠 Giảm bộ nhớ: {comparison['rss_reduction_pct']}%")
+    print(f"✅ Cùng tổng view: {comparison['same_total_views']}")
+    print("="*60)
+
+
+def print_enrich_comparison(comparison: Dict):
+    """
+    In bảng so sánh độ chính xác trước/sau enrich
+    """
+    print("\n" + "="*60)
+    print(f"🔎 ENRICH VIEW LÀM TRÒN ({comparison['n']} video, tổng thật {comparison['expected_total_views']:,})")
+    print("="*60)
+    for label in ('grid', 'limited', 'full'):
+        run = comparison[label]
+        print(f"{label:>9}: sai số {run['abs_error']:,} views, {run['enriched_videos']} trang video, "
+              f"enrich {run['enrich_seconds']}s, tổng {run['wall_seconds']:.2f}s")
+    print("="*60)
+
+
+def print_selector_plan_comparison(comparison: Dict):
+    """
+    In bảng so sánh extract có/không có selector plan
+    """
+    print("\n" + "="*60)
+    print(f"🧭 SELECTOR PLAN ({comparison['n']} video, bố cục 3, view dạng text)")
+    print("="*60)
+    for label in ('probe', 'learned', 'cached'):
+        run = comparison[label]
+        plan = run['selector_plan'] or {}
+        hits = f", plan trúng {plan['hits']}/{plan['hits'] + plan['misses']}" if plan else ''
+        print(f"{label:>9}: extract {run['extraction_seconds']}s trong {run['extraction_round_trips']} "
+              f"round-trip{hits}, tổng {run['wall_seconds']:.2f}s")
+    print(f"⚡ Giảm thời gian extract (plan đã lưu): {comparison['extraction_reduction_pct']}%")
+    print(f"✅ Cùng tổng view: {comparison['same_total_views']}")
+    print("="*60)
+
+
+def print_attach_comparison(comparison: Dict):
+    """
+    In bảng so sánh cold start và attach vào browser server
+    """
+    print("\n" + "="*60)
+    print("🔌 SO SÁNH COLD START VÀ BROWSER SERVER (--connect)")
+    print("="*60)
+    for label in ('cold', 'attached'):
+        run = comparison[label]
+        print(f"{label:>9}: khởi động -> điều hướng {run['startup_seconds']}s, tổng {run['wall_seconds']:.2f}s, "
+              f"{run['total_videos']} video")
+    print(f"🚀 Giảm thời gian khởi động: {comparison['startup_reduction_pct']}%")
+    print(f"⏱️ Giảm tổng thời gian: {comparison['wall_reduction_pct']}%")
+    print("="*60)
+
+
+async def run_browser_scenarios(scenarios: set, args, block: List[str], synthetic: List[Dict],
+                                results: List[Dict]):
+    """
+    Chạy các kịch bản cần Chromium trên fixture server local
+    """
+    server, base_url = start_fixture_server()
+    try:
+        if 'synthetic' in scenarios:
+            for n in args.sizes:
+                print(f"⏱️ synthetic n={n}...")
+                synthetic.append(await run_synthetic(base_url, n, verbose=args.verbose))
+
+        if 'coverage' in scenarios:
+            for layout in SYNTHETIC_LAYOUTS:
+                for strategy in COVERAGE_STRATEGIES:
+                    print(f"⏱️ coverage layout={layout} strategy={strategy}...")
+                    synthetic.append(await run_synthetic(
+                        base_url, COVERAGE_SIZE, layout, strategy, 'coverage', args.verbose
+                    ))
+        results.extend(synthetic)
+
+        if 'blocking' in scenarios:
+            results.append(await compare_blocking(f"{base_url}/@fixture", block, args.verbose))
+
+        if 'fast-path' in scenarios:
+            print("⏱️ fast-path...")
+            results.append(await compare_fast_path(f"{base_url}/@hydrated", args.verbose))
+
+        if 'attach' in scenarios:
+            print("⏱️ attach...")
+            results.append(await compare_attach(f"{base_url}/@fixture", args.verbose))
+
+        if 'enrich' in scenarios:
+            print("⏱️ enrich...")
+            results.append(await compare_enrich(base_url, verbose=args.verbose))
+
+        if 'selector-plan' in scenarios:
+            print("⏱️ selector-plan...")
+            results.append(await compare_selector_plan(base_url, verbose=args.verbose))
+    finally:
+        server.shutdown()
+
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark for TikTok View Counter')
+    parser.add_argument('--scenarios', type=lambda v: [x.strip() for x in v.split(',') if x.strip()],
+                       default=DEFAULT_SCENARIOS,
+                       help=f"Scenarios to run, comma-separated ({','.join(SCENARIOS)})")
+    parser.add_argument('--sizes', type=lambda v: [int(x) for x in v.split(',') if x.strip()],
+                       default=DEFAULT_SIZES, help='Synthetic channel sizes, comma-separated')
+    parser.add_argument('--parser-strings', type=int, default=PARSER_STRINGS,
+                       help='Number of view strings in the parser benchmark')
+    parser.add_argument('--records', type=int, default=RECORD_COUNT,
+                       help='Number of video records in the records benchmark')
+    parser.add_argument('--rate-capacity', type=float, default=RATE_CAPACITY,
+                       help='Requests per second the throttling fixture server accepts (rate-limit scenario)')
+    parser.add_argument('--rate-duration', type=float, default=RATE_DURATION,
+                       help='Seconds per variant in the rate-limit scenario')
+    parser.add_argument('--block', type=parse_block_arg,
+                       help=f"Compare scraping with these request types blocked ({','.join(BLOCK_CATEGORIES)}); "
+                            "implies the blocking scenario")
+    parser.add_argument('--output', default='benchmark_results.jsonl',
+                       help='Append this run as one JSON line to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show scraper output')
+
+    args = parser.parse_args()
+
+    scenarios = set(args.scenarios)
+    unknown = scenarios - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    if args.block:
+        scenarios.add('blocking')
+    block = args.block or BLOCK_CATEGORIES
+
+    synthetic = []
+    results = []
+    parser_result = None
+
+    if 'parser' in scenarios:
+        print(f"⏱️ parser {args.parser_strings:,} chuỗi...")
+        parser_result = run_parser_benchmark(args.parser_strings)
+        results.append(parser_result)
+
+    records_result = None
+    if 'records' in scenarios:
+        print(f"⏱️ records {args.records:,} video...")
+        records_result = run_records_benchmark(args.records)
+        results.append(records_result)
+
+    if 'rate-limit' in scenarios:
+        results.append(await compare_rate_limit(args.rate_capacity, RATE_WORKERS,
+                                                args.rate_duration, args.verbose))
+
+    if scenarios & {'synthetic', 'coverage', 'blocking', 'fast-path', 'attach', 'enrich', 'selector-plan'}:
+        await run_browser_scenarios(scenarios, args, block, synthetic, results)
+
+    if parser_result:
+        print_parser_results(parser_result)
+    if records_result:
+        print_records_results(records_result)
+    if synthetic:
+        print_synthetic_results(synthetic)
+    for result in results:
+        if result['scenario'] == 'request-blocking':
+            print_blocking_comparison(result)
+        elif result['scenario'] == 'fast-path':
+            print_fast_path_comparison(result)
+        elif result['scenario'] == 'attach':
+            print_attach_comparison(result)
+        elif result['scenario'] == 'enrich':
+            print_enrich_comparison(result)
+        elif result['scenario'] == 'rate-limit':
+            print_rate_limit_comparison(result)
+        elif result['scenario'] == 'selector-plan':
+            print_selector_plan_comparison(result)
+
+    run = {
+        'run_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    print(f"\n💾 Đã ghi kết quả vào: {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
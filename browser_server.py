@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Browser server chạy lâu dài cho TikTok View Counter
+Giữ một Chromium với profile trên đĩa (cookie, localStorage, HTTP cache) và mở
+cổng CDP websocket để các lần chạy `tiktok_counter.py --connect` gắn vào,
+bỏ qua chi phí khởi động Chromium mỗi lần.
+
+    python tiktok_counter.py serve --port 9222
+    python tiktok_counter.py https://www.tiktok.com/@abc --connect
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+DEFAULT_PORT = 9222
+DEFAULT_PROFILE_DIR = '.tiktok_browser'
+ENDPOINT_FILE = 'endpoint.json'  # Websocket endpoint của server đang chạy
+STORAGE_STATE_FILE = 'storage_state.json'  # Cookie + localStorage, dùng được cho cả browser thường
+STORAGE_SAVE_INTERVAL = 60  # giây
+ENDPOINT_WAIT_TIMEOUT = 10  # giây đợi Chromium ghi DevToolsActivePort
+
+
+def storage_state_path(profile_dir: str = DEFAULT_PROFILE_DIR) -> str:
+    return os.path.join(profile_dir, STORAGE_STATE_FILE)
+
+
+def read_endpoint(profile_dir: str = DEFAULT_PROFILE_DIR) -> Optional[str]:
+    """
+    Websocket endpoint của browser server đang chạy trên profile này (None nếu không có)
+    """
+    try:
+        with open(os.path.join(profile_dir, ENDPOINT_FILE), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        os.kill(info['pid'], 0)  # Server đã tắt mà không dọn file?
+    except (OSError, ValueError, KeyError):
+        return None
+    return info.get('ws_endpoint')
+
+
+async def _wait_for_endpoint(user_data_dir: str, host: str) -> str:
+    """
+    Đọc DevToolsActivePort (Chromium ghi port + path websocket khi bật remote debugging)
+    """
+    path = os.path.join(user_data_dir, 'DevToolsActivePort')
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ENDPOINT_WAIT_TIMEOUT
+    while loop.time() < deadline:
+        try:
+            with open(path, 'r') as f:
+                lines = f.read().split()
+            if len(lines) >= 2:
+                return f"ws://{host}:{lines[0]}{lines[1]}"
+        except OSError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError(f"Chromium không mở cổng remote debugging sau {ENDPOINT_WAIT_TIMEOUT}s")
+
+
+async def start_browser_server(counter, p, profile_dir: str = DEFAULT_PROFILE_DIR,
+                               port: int = DEFAULT_PORT, host: str = '127.0.0.1') -> tuple:
+    """
+    Launch Chromium với profile lưu trên đĩa và cổng CDP mở (port 0 = tự chọn)
+    Returns: (context mặc định, websocket endpoint)
+    """
+    user_data_dir = os.path.join(profile_dir, 'user-data')
+    os.makedirs(user_data_dir, exist_ok=True)
+    # File của lần chạy trước sẽ trỏ sai port
+    if os.path.exists(os.path.join(user_data_dir, 'DevToolsActivePort')):
+        os.remove(os.path.join(user_data_dir, 'DevToolsActivePort'))
+
+    context = await counter.launch_persistent(p, user_data_dir, [
+        f'--remote-debugging-port={port}',
+        f'--remote-debugging-address={host}',
+        f'--disk-cache-dir={os.path.abspath(os.path.join(profile_dir, "cache"))}',
+    ])
+    return context, await _wait_for_endpoint(user_data_dir, host)
+
+
+async def _save_storage_periodically(context, path: str):
+    while True:
+        await asyncio.sleep(STORAGE_SAVE_INTERVAL)
+        await context.storage_state(path=path)
+
+
+async def serve(counter, profile_dir: str = DEFAULT_PROFILE_DIR, port: int = DEFAULT_PORT,
+                host: str = '127.0.0.1'):
+    """
+    Chạy browser server tới khi bị dừng (Ctrl+C). Storage state được lưu định kỳ
+    và khi tắt; endpoint được ghi vào <profile_dir>/endpoint.json cho --connect.
+    """
+    async with async_playwright() as p:
+        context, endpoint = await start_browser_server(counter, p, profile_dir, port, host)
+        endpoint_file = os.path.join(profile_dir, ENDPOINT_FILE)
+        with open(endpoint_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ws_endpoint': endpoint,
+                'pid': os.getpid(),
+                'started_at': datetime.now().isoformat(),
+            }, f, indent=2)
+
+        print(f"🖥️ Browser server: {endpoint}")
+        print(f"📁 Profile (cookie + cache): {os.path.abspath(profile_dir)}")
+        print("   Dùng: python tiktok_counter.py <url> --connect")
+
+        saver = asyncio.ensure_future(_save_storage_periodically(context, storage_state_path(profile_dir)))
+        try:
+            await asyncio.Event().wait()
+        finally:
+            saver.cancel()
+            try:
+                await context.storage_state(path=storage_state_path(profile_dir))
+            finally:
+                if os.path.exists(endpoint_file):
+                    os.remove(endpoint_file)
+                await context.close()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Checkpoint cho scrape kênh bị gián đoạn
+Trong lúc scroll, các video đã extract + vị trí scroll của kênh được ghi định kỳ
+vào <dir>/<kênh>.json (ghi file tạm rồi os.replace nên file không bao giờ dở dang).
+Lần chạy sau với --resume nạp lại checkpoint: video đã lưu không bị mất kể cả
+khi grid không còn giữ chúng, và checkpoint chỉ ghi tiếp khi đã scroll qua vị trí cũ.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from video_store import channel_key
+
+DEFAULT_CHECKPOINT_DIR = '.tiktok_checkpoints'
+CHECKPOINT_EVERY = 10  # Số bước scroll giữa 2 lần checkpoint
+
+
+class CheckpointStore:
+    """
+    Thư mục checkpoint, mỗi kênh một file JSON:
+    {channel_url, saved_at, scroll_steps, loaded, scroll_y, videos: [...]}
+    """
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self.directory = directory
+
+    def path(self, channel_url: str) -> str:
+        name = ''.join(c if c.isalnum() or c in '._-' else '_' for c in channel_key(channel_url))
+        return os.path.join(self.directory, f"{name or 'channel'}.json")
+
+    def load(self, channel_url: str) -> Optional[Dict]:
+        """
+        Checkpoint của kênh, None nếu chưa có hoặc file hỏng
+        """
+        try:
+            with open(self.path(channel_url), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get('videos'), list):
+            return None
+        return data
+
+    def save(self, channel_url: str, videos: List[Dict], scroll_steps: int, loaded: int,
+             scroll_y: int = 0) -> str:
+        """
+        Ghi đè checkpoint của kênh
+        Returns: đường dẫn file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(channel_url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'channel_url': channel_url,
+                'saved_at': datetime.now().isoformat(),
+                'scroll_steps': scroll_steps,
+                'loaded': loaded,
+                'scroll_y': scroll_y,
+                'videos': videos,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def clear(self, channel_url: str):
+        """
+        Xóa checkpoint khi kênh đã scrape xong
+        """
+        try:
+            os.remove(self.path(channel_url))
+        except FileNotFoundError:
+            pass
@@ -1,45 +1,44 @@
 #!/usr/bin/env python3
 """
-Ví dụ sử dụng TikTok Stats Analyzer với Python code
+Ví dụ sử dụng TikTok View Counter với Python code
 """
 
 import asyncio
-from tiktok_counter import TikTokStatsAnalyzer
+from tiktok_counter import TikTokViewCounter
 
 async def analyze_channel(url: str):
     """
     Phân tích một kênh TikTok
     """
-    # Khởi tạo analyzer
-    analyzer = TikTokStatsAnalyzer(
+    # Khởi tạo counter
+    counter = TikTokViewCounter(
         headless=True,      # Chạy ẩn browser
-        max_scrolls=25      # Scroll 25 lần để load nhiều video
+        intercept=True      # Lấy view chính xác từ API item_list
     )
     
     # Scrape dữ liệu
     print(f"🔍 Đang phân tích: {url}\n")
-    result = await analyzer.scrape_channel(url)
+    result = await counter.scrape_channel(url)
     
     # Hiển thị báo cáo
-    analyzer.print_report(result)
+    counter.print_report(result)
     
     # Lưu kết quả
-    await analyzer.save_to_json(result)
-    await analyzer.save_to_csv(result)
+    await counter.save_to_file(result)
     
     return result
 
 async def compare_channels(urls: list):
     """
-    So sánh nhiều kênh
+    So sánh nhiều kênh - dùng chung 1 browser, scrape song song
     """
+    counter = TikTokViewCounter(headless=True)
     results = []
     
-    for url in urls:
-        analyzer = TikTokStatsAnalyzer(headless=True, max_scrolls=20)
-        result = await analyzer.scrape_channel(url)
+    async for result in counter.scrape_channels(urls, concurrency=3):
         results.append(result)
-        print("\n" + "="*70 + "\n")
+    
+    counter.print_batch_summary(counter.batch_stats)
     
     # So sánh
     print("📊 SO SÁNH CÁC KÊNH:")
@@ -47,14 +46,10 @@ async def compare_channels(urls: list):
     
     for i, result in enumerate(results, 1):
         if 'error' not in result:
-            channel_info = result['channel_info']
-            stats = result['statistics']
-            
-            print(f"\n{i}. {channel_info.get('name', 'N/A')}")
-            print(f"   Followers: {stats.get('total_views_formatted', 'N/A')}")
-            print(f"   Total Views: {stats.get('total_views_formatted', 'N/A')}")
-            print(f"   Videos: {stats.get('total_videos', 0)}")
-            print(f"   Avg Views: {stats.get('average_views', 0):,}")
+            print(f"\n{i}. {result.get('channel_name', 'N/A')}")
+            print(f"   Total Views: {result.get('total_views_formatted', 'N/A')}")
+            print(f"   Videos: {result.get('total_videos', 0)}")
+            print(f"   Avg Views: {result.get('average_views', 0):,}")
 
 async def main():
     # Ví dụ 1: Phân tích 1 kênh
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Fast path không cần browser cho TikTok View Counter
+Tải HTML trang kênh bằng HTTP client async (pool kết nối keep-alive) và đọc
+JSON rehydration nhúng trong trang (__UNIVERSAL_DATA_FOR_REHYDRATION__ / SIGI_STATE):
+thông tin kênh + trang video đầu tiên với playCount chính xác.
+"""
+
+import asyncio
+import gzip
+import json
+import re
+import ssl
+import zlib
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+# Script chứa state của trang (theo thứ tự ưu tiên)
+REHYDRATION_SCRIPT_IDS = ('__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE')
+REHYDRATION_RE = re.compile(
+    r'<script[^>]+id="(' + '|'.join(REHYDRATION_SCRIPT_IDS) + r')"[^>]*>(.*?)</script>',
+    re.DOTALL
+)
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpResponse:
+    __slots__ = ('status', 'headers', 'body', 'url')
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+
+class HttpPool:
+    """
+    HTTP/1.1 client tối giản trên asyncio streams.
+    Giữ các kết nối keep-alive theo host để dùng lại giữa các request,
+    tối đa `limit_per_host` request đồng thời mỗi host. Hỗ trợ gzip/deflate,
+    chunked encoding, redirect và cookie đơn giản theo host.
+    """
+
+    def __init__(self, limit_per_host: int = 4, timeout: float = 30, headers: Optional[Dict] = None):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.headers = {
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+        }
+        self.headers.update(headers or {})
+        self._idle = {}  # (scheme, host, port) -> [(reader, writer)]
+        self._limits = {}  # (scheme, host, port) -> Semaphore
+        self._cookies = {}  # host -> {name: value}
+        self._ssl = None
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle = {}
+
+    async def get(self, url: str, headers: Optional[Dict] = None) -> HttpResponse:
+        """
+        GET `url`, tự theo redirect
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await asyncio.wait_for(self._request(url, headers or {}), self.timeout)
+            location = response.headers.get('location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+        raise HttpError(f"Quá nhiều redirect: {url}")
+
+    async def _request(self, url: str, headers: Dict) -> HttpResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HttpError(f"Không hỗ trợ URL: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+        request_headers = dict(self.headers, Host=parts.netloc, Connection='keep-alive')
+        request_headers.update(headers)
+        cookies = self._cookies.get(parts.hostname)
+        if cookies:
+            request_headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in cookies.items())
+        request = f'GET {path} HTTP/1.1\r\n' + ''.join(
+            f'{name}: {value}\r\n' for name, value in request_headers.items()
+        ) + '\r\n'
+
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.limit_per_host))
+        async with limit:
+            idle = self._idle.setdefault(key, [])
+            # Kết nối idle có thể đã bị server đóng: thử lại 1 lần bằng kết nối mới
+            for reused in (True, False):
+                if reused and not idle:
+                    continue
+                reader, writer = idle.pop() if reused else await self._connect(key)
+                try:
+                    writer.write(request.encode('latin-1'))
+                    self.requests_sent += 1
+                    status, response_headers, body, keep_alive = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, HttpError):
+                    writer.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    # Timeout của get() (CancelledError) hoặc response hỏng giữa chừng:
+                    # kết nối đang đọc dở không dùng lại được
+                    writer.close()
+                    raise
+                break
+
+            if keep_alive:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+
+        for cookie in response_headers.get('set-cookie', '').split('\n'):
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            if name.strip() and value:
+                self._cookies.setdefault(parts.hostname, {})[name.strip()] = value.strip()
+
+        encoding = response_headers.get('content-encoding', '').lower()
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+
+        return HttpResponse(status, response_headers, body, url)
+
+    async def _connect(self, key: tuple):
+        scheme, host, port = key
+        if scheme == 'https' and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        connection = await asyncio.open_connection(host, port, ssl=self._ssl if scheme == 'https' else None)
+        self.connections_opened += 1
+        return connection
+
+    async def _read_response(self, reader) -> tuple:
+        """
+        Đọc status line, header và body
+        Returns: (status, headers, body, keep_alive)
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError('Kết nối bị đóng')
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise HttpError(f"Status line không hợp lệ: {status_line!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            # Set-Cookie có thể lặp lại: nối bằng xuống dòng
+            headers[name] = f"{headers[name]}\n{value}" if name in headers else value
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    # Bỏ qua trailer
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        return status, headers, body, keep_alive
+
+
+def extract_rehydration(html: str) -> Optional[Dict]:
+    """
+    JSON state nhúng trong HTML trang kênh, None nếu không có
+    """
+    for match in REHYDRATION_RE.finditer(html):
+        try:
+            return json.loads(match.group(2))
+        except ValueError:
+            continue
+    return None
+
+
+def parse_video_state(state: Optional[Dict]) -> Optional[Dict]:
+    """
+    Số liệu chính xác của video từ state rehydration của trang video
+    Returns: {'views', 'likes', 'comments', 'shares'} hoặc None
+    """
+    if not isinstance(state, dict):
+        return None
+
+    if '__DEFAULT_SCOPE__' in state:
+        detail = (state['__DEFAULT_SCOPE__'] or {}).get('webapp.video-detail') or {}
+        item = (detail.get('itemInfo') or {}).get('itemStruct') or {}
+    elif 'ItemModule' in state:
+        item = next(iter((state.get('ItemModule') or {}).values()), None) or {}
+    else:
+        return None
+
+    stats = item.get('stats') or item.get('statsV2') or {}
+    if stats.get('playCount') is None:
+        return None
+    return {
+        'views': int(stats['playCount']),
+        'likes': int(stats.get('diggCount') or 0),
+        'comments': int(stats.get('commentCount') or 0),
+        'shares': int(stats.get('shareCount') or 0),
+    }
+
+
+def parse_profile_state(state: Optional[Dict]) -> Optional[Dict]:
+    """
+    Lấy thông tin kênh + danh sách video từ state rehydration.
+    Returns: {'unique_id', 'nickname', 'video_count', 'items', 'has_more'} hoặc None
+    """
+    if not isinstance(state, dict):
+        return None
+
+    if '__DEFAULT_SCOPE__' in state:
+        # __UNIVERSAL_DATA_FOR_REHYDRATION__
+        scope = state['__DEFAULT_SCOPE__'] or {}
+        user_info = (scope.get('webapp.user-detail') or {}).get('userInfo') or {}
+        user = user_info.get('user') or {}
+        stats = user_info.get('stats') or {}
+
+        items: List[Dict] = []
+        has_more = None
+        for value in scope.values():
+            if isinstance(value, dict) and isinstance(value.get('itemList'), list):
+                items.extend(value['itemList'])
+                has_more = value.get('hasMore', has_more)
+    elif 'ItemModule' in state or 'UserModule' in state:
+        # SIGI_STATE (bố cục cũ)
+        users = (state.get('UserModule') or {}).get('users') or {}
+        unique_id = next(iter(users), None)
+        user = users.get(unique_id) or {}
+        stats = ((state.get('UserModule') or {}).get('stats') or {}).get(unique_id) or {}
+
+        item_module = state.get('ItemModule') or {}
+        post_list = (state.get('ItemList') or {}).get('user-post') or {}
+        order = post_list.get('list') or list(item_module)
+        items = [dict(item_module[video_id], id=video_id) for video_id in order if video_id in item_module]
+        has_more = post_list.get('hasMore')
+    else:
+        return None
+
+    if not user and not items:
+        return None
+
+    return {
+        'unique_id': user.get('uniqueId'),
+        'nickname': user.get('nickname'),
+        'video_count': stats.get('videoCount'),
+        'items': items,
+        'has_more': has_more,
+    }
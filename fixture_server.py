@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Local fixture server - giả lập trang kênh TikTok để chạy offline
+Phục vụ trang profile và các response /api/post/item_list/ từ thư mục fixtures/
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from fast_path import extract_rehydration, parse_profile_state
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Kích thước (bytes) của các asset giả lập theo đuôi file
+STATIC_SIZES = {
+    '.jpg': 48 * 1024,
+    '.mp4': 512 * 1024,
+    '.woff2': 40 * 1024,
+    '.css': 24 * 1024,
+}
+
+# Bố cục grid của trang synthetic, mỗi bố cục ứng với một entry của VIDEO_SELECTORS
+SYNTHETIC_LAYOUTS = {
+    0: '[data-e2e="user-post-item"]',
+    1: '[data-e2e="user-post-item-list"] > div',
+    2: '.video-feed-item',
+    3: 'div[data-e2e="user-post-item-list"] div',
+}
+
+# Cách hiển thị view, ứng với các chiến lược của get_exact_view_count
+SYNTHETIC_STRATEGIES = ['aria', 'title', 'text', 'mixed']
+
+SYNTHETIC_PAGE_SIZE = 35  # Số video mỗi response item_list, giống trang thật
+SYNTHETIC_FIRST_ID = 7300000000000000000  # ID của video thứ 0 trong kênh synthetic
+
+# Trang video: JSON state với số liệu chính xác + số đếm rút gọn trên DOM như trang thật
+VIDEO_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{desc}</title></head>
+<body>
+<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">{state}</script>
+<strong data-e2e="like-count">{likes}</strong>
+<strong data-e2e="comment-count">{comments}</strong>
+<strong data-e2e="share-count">{shares}</strong>
+</body>
+</html>
+"""
+
+STATIC_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.mp4': 'video/mp4',
+    '.woff2': 'font/woff2',
+    '.css': 'text/css',
+}
+
+
+def synthetic_play_count(index: int) -> int:
+    """
+    View chính xác của video thứ `index` trong kênh synthetic (tất định)
+    """
+    return (index * 104729 + 7) % 9876543 + index % 1000
+
+
+def synthetic_stats(index: int) -> dict:
+    """
+    Số liệu đầy đủ của video synthetic thứ `index` (like/comment/share suy từ view)
+    """
+    views = synthetic_play_count(index)
+    return {'playCount': views, 'diggCount': views // 20, 'commentCount': views // 400,
+            'shareCount': views // 900}
+
+
+@lru_cache(maxsize=1)
+def fixture_items() -> dict:
+    """
+    Mọi video có trong fixtures/ (item_list_*.json + state nhúng trong profile*.html)
+    Returns: {video_id: item}
+    """
+    items = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'item_list_*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f).get('itemList') or []:
+                items[str(item['id'])] = item
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'profile*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = parse_profile_state(extract_rehydration(f.read()))
+        for item in (profile or {}).get('items') or []:
+            items.setdefault(str(item['id']), item)
+    return items
+
+
+def video_page(username: str, video_id: str) -> str:
+    """
+    HTML trang video: item của fixtures/ nếu có (cùng tác giả), còn lại video synthetic theo ID
+    """
+    item = fixture_items().get(video_id)
+    if item is not None and (item.get('author') or {}).get('uniqueId', username) != username:
+        item = None
+    if item is None:
+        index = int(video_id) - SYNTHETIC_FIRST_ID
+        if index < 0:
+            return None
+        item = {'id': video_id, 'desc': f"Synthetic video {index}",
+                'author': {'uniqueId': username}, 'stats': synthetic_stats(index)}
+
+    stats = item.get('stats') or {}
+    state = {'__DEFAULT_SCOPE__': {'webapp.video-detail': {'itemInfo': {'itemStruct': item}}}}
+    return VIDEO_PAGE_TEMPLATE.format(
+        desc=item.get('desc', ''),
+        state=json.dumps(state, ensure_ascii=False).replace('</', '<\\/'),
+        likes=stats.get('diggCount', 0), comments=stats.get('commentCount', 0),
+        shares=stats.get('shareCount', 0),
+    )
+
+
+def synthetic_item_list(n: int, cursor: int, count: int = SYNTHETIC_PAGE_SIZE) -> dict:
+    """
+    Response item_list cho kênh synthetic có n video
+    """
+    end = min(n, cursor + count)
+    items = [
+        {
+            'id': str(SYNTHETIC_FIRST_ID + i),
+            'desc': f"Synthetic video {i}",
+            'author': {'uniqueId': 'bench'},
+            'stats': synthetic_stats(i),
+        }
+        for i in range(cursor, end)
+    ]
+    return {'statusCode': 0, 'itemList': items, 'cursor': str(end), 'hasMore': end < n}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Handler cho fixture server:
+      /@<username>/video/<id>    -> trang video (JSON state với view/like/comment/share)
+      /@<username>               -> fixtures/profile_<username>.html nếu có,
+                                    còn lại fixtures/profile.html
+      /@<username>?n=N&layout=L&strategy=S -> kênh synthetic N video
+      /api/post/item_list/?cursor=N -> fixtures/item_list_N.json
+      /api/post/item_list/?n=N&cursor=C -> item_list synthetic
+      /static/<name>.<ext>       -> asset giả lập (ảnh, video preview, font)
+      /monitor_browser/...       -> beacon analytics giả lập
+    """
+    fixtures_dir = FIXTURES_DIR
+    protocol_version = 'HTTP/1.1'  # Keep-alive như server thật
+
+    # Thống kê dùng chung cho mọi request (đọc bằng stats(), xóa bằng reset_stats())
+    _lock = threading.Lock()
+    bytes_served = 0
+    requests_served = 0
+
+    @classmethod
+    def reset_stats(cls):
+        with cls._lock:
+            cls.bytes_served = 0
+            cls.requests_served = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {'bytes_served': cls.bytes_served, 'requests_served': cls.requests_served}
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if parsed.path.startswith('/@') and '/video/' in parsed.path:
+            username, _, video_id = parsed.path[2:].partition('/video/')
+            video_id = video_id.strip('/')
+            html = video_page(username, video_id) if video_id.isdigit() else None
+            if html is None:
+                self.send_error(404)
+                return
+            self.send_body(html.encode('utf-8'), 'text/html; charset=utf-8')
+        elif parsed.path.startswith('/@'):
+            username = parsed.path[2:].split('/')[0]
+            named = f'profile_{username}.html'
+            if 'n' in query:
+                self.send_fixture('synthetic_profile.html', 'text/html; charset=utf-8')
+            elif username.isalnum() and os.path.isfile(os.path.join(self.fixtures_dir, named)):
+                self.send_fixture(named, 'text/html; charset=utf-8')
+            else:
+                self.send_fixture('profile.html', 'text/html; charset=utf-8')
+        elif parsed.path.startswith('/api/post/item_list'):
+            cursor = query.get('cursor', ['0'])[0]
+            if not cursor.isdigit():
+                self.send_error(400, 'Invalid cursor')
+                return
+            if 'n' in query:
+                n = int(query['n'][0])
+                count = int(query.get('count', [SYNTHETIC_PAGE_SIZE])[0])
+                body = json.dumps(synthetic_item_list(n, int(cursor), count)).encode('utf-8')
+                self.send_body(body, 'application/json')
+            else:
+                self.send_fixture(f'item_list_{cursor}.json', 'application/json')
+        elif parsed.path.startswith('/static/'):
+            ext = os.path.splitext(parsed.path)[1]
+            if ext not in STATIC_SIZES:
+                self.send_error(404)
+                return
+            self.send_body(b'\0' * STATIC_SIZES[ext], STATIC_TYPES[ext])
+        elif parsed.path.startswith('/monitor_browser/'):
+            self.send_body(b'{"code":0}', 'application/json')
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        # Beacon analytics gửi bằng POST
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.path.startswith('/monitor_browser/'):
+            self.send_body(b'{"code":0}', 'application/json')
+        else:
+            self.send_error(404)
+
+    def send_fixture(self, name: str, content_type: str):
+        path = os.path.join(self.fixtures_dir, name)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        self.send_body(body, content_type)
+
+    def send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+        with FixtureHandler._lock:
+            FixtureHandler.bytes_served += len(body)
+            FixtureHandler.requests_served += 1
+
+    def log_message(self, format, *args):
+        # Giữ output gọn khi chạy cùng scraper
+        pass
+
+
+class ThrottlingFixtureHandler(FixtureHandler):
+    """
+    Fixture server giả lập site bị quá tải (dùng để thử rate controller):
+    - chỉ nhận tối đa `capacity` request/giây (token bucket, burst `burst`),
+      vượt quá -> 429 kèm Retry-After
+    - latency tăng theo số request đang xử lý cùng lúc (`base_latency` x (1 + in-flight))
+    - quá `max_in_flight` request đồng thời -> 503
+    """
+    capacity = 20.0
+    burst = 5
+    base_latency = 0.01
+    max_in_flight = 16
+    retry_after = 1
+
+    _throttle_lock = threading.Lock()
+    _tokens = 0.0
+    _refilled_at = 0.0
+    _in_flight = 0
+    throttled = 0
+    overloaded = 0
+
+    @classmethod
+    def configure(cls, capacity: float = None, burst: int = None, base_latency: float = None,
+                  max_in_flight: int = None):
+        """
+        Đổi giới hạn của server và xóa trạng thái throttle
+        """
+        with cls._throttle_lock:
+            if capacity is not None:
+                cls.capacity = capacity
+            if burst is not None:
+                cls.burst = burst
+            if base_latency is not None:
+                cls.base_latency = base_latency
+            if max_in_flight is not None:
+                cls.max_in_flight = max_in_flight
+            cls._tokens = float(cls.burst)
+            cls._refilled_at = time.monotonic()
+            cls._in_flight = 0
+            cls.throttled = 0
+            cls.overloaded = 0
+
+    @classmethod
+    def throttle_stats(cls) -> dict:
+        with cls._throttle_lock:
+            return {'throttled': cls.throttled, 'overloaded': cls.overloaded}
+
+    def do_GET(self):
+        cls = ThrottlingFixtureHandler
+        with cls._throttle_lock:
+            now = time.monotonic()
+            cls._tokens = min(float(cls.burst), cls._tokens + (now - cls._refilled_at) * cls.capacity)
+            cls._refilled_at = now
+            if cls._in_flight >= cls.max_in_flight:
+                cls.overloaded += 1
+                status = 503
+            elif cls._tokens < 1:
+                cls.throttled += 1
+                status = 429
+            else:
+                cls._tokens -= 1
+                cls._in_flight += 1
+                status = 200
+            in_flight = cls._in_flight
+
+        if status != 200:
+            self.send_refusal(status)
+            return
+
+        try:
+            time.sleep(cls.base_latency * in_flight)
+            super().do_GET()
+        finally:
+            with cls._throttle_lock:
+                cls._in_flight -= 1
+
+    def send_refusal(self, status: int):
+        body = b'{"statusCode":10000,"statusMsg":"Too many requests"}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Retry-After', str(self.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fixture_server(port: int = 0, host: str = '127.0.0.1', handler=FixtureHandler):
+    """
+    Chạy fixture server trong thread nền
+    Returns: (server, base_url) - gọi server.shutdown() để dừng
+    """
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local TikTok fixture server')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind')
+    parser.add_argument('--capacity', type=float, metavar='REQ_PER_SEC',
+                        help='Simulate an overloaded site: answer 429 above this request rate '
+                             'and slow down with concurrent requests')
+
+    args = parser.parse_args()
+
+    handler = FixtureHandler
+    if args.capacity:
+        ThrottlingFixtureHandler.configure(capacity=args.capacity)
+        handler = ThrottlingFixtureHandler
+
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"🧪 Fixture server: http://{args.host}:{args.port}/@fixture")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Instrumentation cho TikTok View Counter
+Đo thời gian từng phase, đếm CDP call và thống kê chiến lược/selector thắng.
+Xuất ra JSON hoặc Prometheus text format.
+
+Mặc định counter dùng NULL_METRICS (mọi method là no-op) nên gần như không
+tốn chi phí khi không bật --metrics.
+"""
+
+import contextlib
+import json
+import os
+import time
+from typing import Dict
+
+
+class Metrics:
+    """
+    Bộ thu thập metrics:
+      - phase: tổng thời gian + số lần quan sát (summary)
+      - counter: bộ đếm đơn (ví dụ cdp_calls)
+      - labeled: bộ đếm theo nhãn (ví dụ view_source -> aria-label)
+    """
+
+    def __init__(self, prefix: str = 'tiktok_counter'):
+        self.prefix = prefix
+        self.phases = {}  # tên phase -> [tổng giây, số lần]
+        self.counters = {}
+        self.labeled = {}  # tên -> {nhãn: số lần}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float, count: int = 1):
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += count
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, label: str, value: int = 1):
+        labels = self.labeled.setdefault(name, {})
+        labels[label] = labels.get(label, 0) + value
+
+    def merge(self, data: Dict):
+        """
+        Cộng dồn một bản to_dict() (ví dụ metrics do worker process gửi về)
+        """
+        for name, phase in data.get('phases', {}).items():
+            self.observe(name, phase['seconds'], phase['count'])
+        for name, value in data.get('counters', {}).items():
+            self.count(name, value)
+        for name, labels in data.get('labeled', {}).items():
+            for label, value in labels.items():
+                self.record(name, label, value)
+
+    def to_dict(self) -> Dict:
+        return {
+            'phases': {
+                name: {
+                    'seconds': round(total, 6),
+                    'count': count,
+                    'avg_seconds': round(total / count, 6) if count else 0.0,
+                }
+                for name, (total, count) in self.phases.items()
+            },
+            'counters': dict(self.counters),
+            'labeled': {name: dict(labels) for name, labels in self.labeled.items()},
+        }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        p = self.prefix
+
+        if self.phases:
+            lines.append(f'# HELP {p}_phase_seconds Duration of scrape phases')
+            lines.append(f'# TYPE {p}_phase_seconds summary')
+            for name, (total, count) in sorted(self.phases.items()):
+                label = f'{{phase="{_escape(name)}"}}'
+                lines.append(f'{p}_phase_seconds_sum{label} {total:.6f}')
+                lines.append(f'{p}_phase_seconds_count{label} {count}')
+
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'# TYPE {p}_{name}_total counter')
+            lines.append(f'{p}_{name}_total {value}')
+
+        for name, labels in sorted(self.labeled.items()):
+            lines.append(f'# TYPE {p}_{name}_total counter')
+            for label, value in sorted(labels.items()):
+                lines.append(f'{p}_{name}_total{{{name}="{_escape(label)}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path: str):
+        """
+        Ghi metrics ra file: .prom/.txt -> Prometheus text, còn lại -> JSON
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+class NullMetrics:
+    """
+    Metrics no-op, dùng khi không bật instrumentation
+    """
+
+    _null_context = contextlib.nullcontext()
+
+    def phase(self, name: str):
+        return self._null_context
+
+    def observe(self, name: str, seconds: float, count: int = 1):
+        pass
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def record(self, name: str, label: str, value: int = 1):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def process_tree_rss(root_pid: int = None) -> int:
+    """
+    Tổng RSS (bytes) của process hiện tại và mọi process con (driver + Chromium).
+    Chỉ hỗ trợ Linux (/proc); nơi khác trả về peak RSS của chính process Python.
+    """
+    root_pid = root_pid or os.getpid()
+    if not os.path.isdir('/proc'):
+        try:
+            import resource
+        except ImportError:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # Trường thứ 4 là ppid; comm nằm trong ngoặc và có thể chứa dấu cách
+                ppid = int(f.read().rsplit(b')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+
+    return total
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Rate controller thích ứng dùng chung cho mọi request ra ngoài (goto, scroll, HTTP fast path)
+Token bucket (nạp lại theo tốc độ hiện tại; request đang đợi tính lại thời gian chờ
+mỗi lần thức dậy nên đổi tốc độ có hiệu lực ngay) với tốc độ điều chỉnh theo AIMD:
+  - response khỏe (không 429/5xx, latency không vọt) -> tăng cộng, ~`increase` req/s mỗi giây;
+    trước lần giảm tốc đầu tiên (slow start) mỗi response cộng `slow_start_step` nên
+    tốc độ tăng theo cấp số nhân tới khi chạm giới hạn của server
+  - 429/5xx hoặc latency > `latency_factor` x baseline -> nhân tốc độ với `decrease`
+    (tối đa 1 lần mỗi `cooldown` giây), Retry-After tạm dừng cả bucket
+Cùng một limiter được chia cho mọi page/worker trong process; với shared=True trạng
+thái nằm trong bộ nhớ dùng chung nên các process của ShardedRunner cũng dùng chung.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import time
+from array import array
+from typing import Dict, Optional
+
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Latency được so với baseline riêng của từng loại request
+LATENCY_KINDS = ('page', 'api')
+
+# Vị trí các giá trị trong mảng trạng thái
+(_RATE, _TOKENS, _REFILLED_AT, _PAUSED_UNTIL, _LAST_DECREASE, _PEAK_RATE,
+ _REQUESTS, _HEALTHY, _THROTTLED, _SPIKES, _BACKOFFS, _WAIT_SECONDS) = range(12)
+_BASELINE = 12  # + chỉ số trong LATENCY_KINDS
+_STATE_SIZE = _BASELINE + len(LATENCY_KINDS)
+
+
+class ThrottledError(Exception):
+    """
+    Server từ chối/quá tải (429 hoặc 5xx)
+    """
+
+    def __init__(self, status: int, url: str = '', retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} (throttled){f': {url}' if url else ''}")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Header Retry-After dạng số giây (dạng ngày HTTP bị bỏ qua)
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value.strip()))
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket + AIMD.
+
+        limiter = AdaptiveRateLimiter(rate=2, max_rate=10)
+        await limiter.acquire()
+        ... request ...
+        limiter.observe(status, latency_seconds, kind='api')
+    """
+
+    def __init__(self, rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 burst: int = 2, increase: float = 1.0, decrease: float = 0.5, slow_start_step: float = 0.5,
+                 latency_factor: float = 3.0, min_spike: float = 0.25, cooldown: float = 1.0,
+                 shared: bool = False):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.burst = max(1, burst)
+        self.increase = increase  # req/s cộng thêm mỗi giây khi mọi response đều khỏe
+        self.decrease = decrease  # Hệ số nhân khi bị throttle
+        self.slow_start_step = slow_start_step  # req/s cộng thêm mỗi response khỏe khi chưa bị throttle
+        self.latency_factor = latency_factor
+        self.min_spike = min_spike  # giây, latency dưới mức này không bao giờ tính là vọt
+        self.cooldown = cooldown  # giây giữa 2 lần giảm tốc (một đợt lỗi chỉ giảm 1 lần)
+
+        initial = [0.0] * _STATE_SIZE
+        initial[_RATE] = initial[_PEAK_RATE] = min(max(rate, min_rate), self.max_rate)
+        initial[_TOKENS] = self.burst
+        if shared:
+            # Bộ nhớ dùng chung + lock, truyền được cho process con lúc spawn
+            self._state = multiprocessing.get_context('spawn').Array('d', initial)
+            self._lock = self._state.get_lock()
+        else:
+            self._state = array('d', initial)
+            self._lock = contextlib.nullcontext()
+
+    @property
+    def rate(self) -> float:
+        return self._state[_RATE]
+
+    def try_acquire(self) -> float:
+        """
+        Lấy 1 token nếu có
+        Returns: 0 nếu đã lấy được, ngược lại số giây nên đợi trước khi thử lại
+        """
+        state = self._state
+        with self._lock:
+            now = time.monotonic()
+            if now < state[_PAUSED_UNTIL]:
+                return state[_PAUSED_UNTIL] - now
+            # Bucket chứa tối đa `burst` token (số request được gửi liền nhau)
+            if state[_REFILLED_AT]:
+                state[_TOKENS] = min(float(self.burst),
+                                     state[_TOKENS] + (now - state[_REFILLED_AT]) * state[_RATE])
+            state[_REFILLED_AT] = now
+            if state[_TOKENS] >= 1:
+                state[_TOKENS] -= 1
+                state[_REQUESTS] += 1
+                return 0.0
+            return (1 - state[_TOKENS]) / state[_RATE]
+
+    async def acquire(self) -> float:
+        """
+        Đợi tới lượt gửi request
+        Returns: số giây đã đợi
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        if waited:
+            with self._lock:
+                self._state[_WAIT_SECONDS] += waited
+        return waited
+
+    def observe(self, status: Optional[int], latency: Optional[float] = None,
+                retry_after: Optional[float] = None, kind: str = 'page') -> bool:
+        """
+        Ghi nhận kết quả một request và điều chỉnh tốc độ
+        Returns: True nếu response khỏe
+        """
+        state = self._state
+        baseline_index = _BASELINE + LATENCY_KINDS.index(kind)
+        with self._lock:
+            now = time.monotonic()
+            baseline = state[baseline_index]
+            throttled = status in THROTTLE_STATUSES
+            spike = (latency is not None and baseline > 0 and latency >= self.min_spike
+                     and latency > baseline * self.latency_factor)
+
+            if throttled or spike:
+                if throttled:
+                    state[_THROTTLED] += 1
+                else:
+                    state[_SPIKES] += 1
+                if now - state[_LAST_DECREASE] >= self.cooldown:
+                    state[_RATE] = max(self.min_rate, state[_RATE] * self.decrease)
+                    state[_LAST_DECREASE] = now
+                    state[_BACKOFFS] += 1
+                    # Bỏ token dồn lại: không gửi thêm một loạt ngay sau khi bị throttle
+                    state[_TOKENS] = min(state[_TOKENS], 0.0)
+                if retry_after:
+                    state[_PAUSED_UNTIL] = max(state[_PAUSED_UNTIL], now + retry_after)
+                return False
+
+            state[_HEALTHY] += 1
+            if latency is not None:
+                # EWMA chỉ từ response khỏe để baseline không trôi lên theo latency vọt
+                state[baseline_index] = latency if baseline <= 0 else baseline * 0.8 + latency * 0.2
+            if state[_BACKOFFS]:
+                # Tăng cộng: mỗi response khỏe thêm increase/rate -> ~increase req/s mỗi giây
+                step = self.increase / state[_RATE]
+            else:
+                step = self.slow_start_step
+            state[_RATE] = min(self.max_rate, state[_RATE] + step)
+            state[_PEAK_RATE] = max(state[_PEAK_RATE], state[_RATE])
+            return True
+
+    def snapshot(self) -> Dict:
+        """
+        Trạng thái hiện tại cho báo cáo / endpoint status
+        """
+        state = self._state
+        with self._lock:
+            values = list(state)
+        return {
+            'rate': round(values[_RATE], 2),
+            'peak_rate': round(values[_PEAK_RATE], 2),
+            'requests': int(values[_REQUESTS]),
+            'healthy': int(values[_HEALTHY]),
+            'throttled': int(values[_THROTTLED]),
+            'latency_spikes': int(values[_SPIKES]),
+            'backoffs': int(values[_BACKOFFS]),
+            'wait_seconds': round(values[_WAIT_SECONDS], 3),
+            'baseline_latency': {
+                kind: round(values[_BASELINE + i], 4) for i, kind in enumerate(LATENCY_KINDS)
+            },
+        }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Plan selector đã học cho DOM extractor
+Với mỗi cấu trúc trang (fingerprint của thẻ video đầu tiên), PLAN_SAMPLE item đầu
+được dò đầy đủ để biết selector video, chiến lược view (aria-label / title /
+view selector) và selector caption nào trúng; các item sau query các selector đó
+trước, trượt mới dò lại cả chuỗi fallback. aria-label và title luôn được thử trước
+text nên plan không bao giờ thay số chính xác bằng số làm tròn. Cứ PLAN_AUDIT_EVERY
+item lại có một item được dò đầy đủ để chắc view selector của plan vẫn là selector
+đầu tiên khớp. Plan được lưu vào file JSON cho các lần chạy sau và bị bỏ (dò lại
+từ đầu) khi tỉ lệ trúng tụt dưới PLAN_MIN_HIT_RATE.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_PLAN_FILE = '.tiktok_selector_plans.json'
+PLAN_SAMPLE = 12           # Số item dò đầy đủ để học plan (và cửa sổ đo tỉ lệ trúng)
+PLAN_MIN_HIT_RATE = 0.8    # Chiến lược phải trúng ít nhất tỉ lệ này của mẫu / cửa sổ
+PLAN_AUDIT_EVERY = 8       # Cứ N item theo plan lại dò đầy đủ 1 item để kiểm tra
+
+
+def page_fingerprint(signature: str) -> str:
+    """
+    Fingerprint ngắn từ chữ ký cấu trúc do PAGE_FINGERPRINT_JS trả về
+    """
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def view_strategy(source: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Nhãn source của BATCH_EXTRACT_JS -> (chiến lược, view selector)
+    Ví dụ: 'aria-label' -> ('aria', None), 'text-strong' -> ('selector', 'strong')
+    """
+    if source == 'aria-label':
+        return 'aria', None
+    if source == 'title-attribute':
+        return 'title', None
+    for prefix in ('title-', 'text-'):
+        if source.startswith(prefix):
+            return 'selector', source[len(prefix):]
+    return None
+
+
+def learn_plan(video_selector: str, samples: Iterable[Tuple[str, Optional[str]]],
+               min_share: float = PLAN_MIN_HIT_RATE) -> Optional[Dict]:
+    """
+    Học plan từ (source, caption selector) của các item mẫu
+    Returns: None nếu không chiến lược view nào chiếm đủ min_share mẫu
+    (grid trộn nhiều kiểu hiển thị: dò đầy đủ từng item rẻ hơn trượt plan liên tục)
+    """
+    samples = list(samples)
+    if not video_selector or not samples:
+        return None
+    source, count = Counter(source for source, _ in samples).most_common(1)[0]
+    strategy = view_strategy(source)
+    if strategy is None or count < len(samples) * min_share:
+        return None
+
+    captions = Counter(selector for _, selector in samples if selector)
+    return {
+        'videoSelector': video_selector,
+        'view': strategy[0],
+        'viewSelector': strategy[1],
+        'captionSelector': captions.most_common(1)[0][0] if captions else None,
+    }
+
+
+class SelectorPlanCache:
+    """
+    File JSON {fingerprint: {plan, learned_at}} dùng chung giữa các lần chạy.
+    plan = None: cấu trúc đã dò nhưng không có chiến lược trội (không học lại).
+    Khi ghi, file được đọc lại và chỉ các fingerprint process này đã học/bỏ bị
+    ghi đè, nên nhiều process (ShardedRunner) không xóa plan của nhau.
+    """
+
+    def __init__(self, path: str = DEFAULT_PLAN_FILE):
+        self.path = path
+        self._entries = None  # Nạp lần đầu khi cần
+        self._changed = {}  # fingerprint -> entry mới (None = đã bỏ)
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _plans(self) -> Dict:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def known(self, fingerprint: str) -> bool:
+        """
+        Cấu trúc này đã được dò (có plan hoặc đã biết là không có plan)
+        """
+        return fingerprint in self._plans()
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        entry = self._plans().get(fingerprint)
+        plan = entry.get('plan') if isinstance(entry, dict) else None
+        if not isinstance(plan, dict) or not plan.get('videoSelector'):
+            return None
+        return plan
+
+    def put(self, fingerprint: str, plan: Optional[Dict]):
+        entry = {'plan': plan, 'learned_at': datetime.now().isoformat()}
+        self._plans()[fingerprint] = entry
+        self._changed[fingerprint] = entry
+        self.save()
+
+    def drop(self, fingerprint: str):
+        """
+        Bỏ plan khi tỉ lệ trúng giảm: lần gặp sau cấu trúc này được học lại
+        """
+        self._plans().pop(fingerprint, None)
+        self._changed[fingerprint] = None
+        self.save()
+
+    def save(self):
+        if not self._changed:
+            return
+        merged = self._read()
+        for fingerprint, entry in self._changed.items():
+            if entry is None:
+                merged.pop(fingerprint, None)
+            else:
+                merged[fingerprint] = entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._changed.clear()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Sharded runner - chia danh sách kênh cho nhiều process, mỗi process có browser riêng
+Dùng được nhiều core CPU (mỗi Chromium + event loop chạy trên process riêng).
+
+- Worker được thay mới sau `pages_per_worker` page hoặc khi RSS (cả cây process,
+  gồm Chromium) vượt `max_rss_mb` - tránh Chromium phình bộ nhớ theo thời gian
+- Worker chết giữa chừng được phát hiện qua sentinel của process; kênh đang
+  scrape được đưa lại vào hàng đợi (tối đa `max_attempts` lần)
+- Kết quả từ mọi worker được gộp thành một stream duy nhất
+- Rate controller (AdaptiveRateLimiter(shared=True)) nằm trong bộ nhớ dùng chung,
+  mọi worker cùng giảm tốc khi server bắt đầu throttle
+- Với `metrics`, mỗi worker đo riêng và gửi phần metrics của từng kênh kèm kết quả;
+  process cha cộng dồn vào một Metrics duy nhất
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait
+from typing import Dict, Iterator, List, Optional
+
+from metrics import Metrics, process_tree_rss
+
+
+def _worker_main(conn, counter_kwargs: Dict, db_path: Optional[str], pages_per_worker: int,
+                 max_rss: int, verbose: bool, rate_limiter=None, collect_metrics: bool = False):
+    """
+    Entry point của process worker
+    """
+    if not verbose:
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        asyncio.run(_worker_loop(conn, counter_kwargs, db_path, pages_per_worker, max_rss, rate_limiter,
+                                 collect_metrics))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_loop(conn, counter_kwargs: Dict, db_path: Optional[str], pages_per_worker: int,
+                       max_rss: int, rate_limiter=None, collect_metrics: bool = False):
+    """
+    Nhận URL từ process cha qua pipe, scrape trên 1 page dùng lại, gửi kết quả về.
+    Tự thoát (để được thay mới) khi đủ số page hoặc vượt ngưỡng RSS.
+    """
+    from playwright.async_api import async_playwright
+    from fast_path import HttpPool
+    from tiktok_counter import TikTokViewCounter
+    from video_store import VideoStore
+
+    counter = TikTokViewCounter(store=VideoStore(db_path) if db_path else None,
+                                metrics=Metrics() if collect_metrics else None,
+                                rate_limiter=rate_limiter, **counter_kwargs)
+    loop = asyncio.get_running_loop()
+
+    async with async_playwright() as p, HttpPool() as client:
+        browser = await counter.open_browser(p)
+        context = page = None
+        try:
+            context = await counter.new_context(browser)
+            page = await context.new_page()
+            pages = 0
+
+            while True:
+                url = await loop.run_in_executor(None, conn.recv)
+                if url is None:
+                    break
+
+                result = None
+                if counter.fast_path:
+                    result = await counter._spawn().fetch_channel_http(url, client)
+                if result is None:
+                    result = await counter._spawn().scrape_page(page, url)
+                if not browser.is_connected():
+                    # Chromium chết: thoát không gửi kết quả để process cha requeue kênh
+                    raise RuntimeError('browser disconnected')
+                pages += 1
+                rss = process_tree_rss()
+                recycle = pages >= pages_per_worker or bool(max_rss and rss >= max_rss)
+                message = {'result': result, 'rss': rss, 'pages': pages, 'recycle': recycle}
+                if collect_metrics:
+                    # Gửi phần đo của kênh này rồi đo lại từ đầu (worker crash chỉ mất kênh đang chạy)
+                    message['metrics'] = counter.metrics.to_dict()
+                    counter.metrics = Metrics()
+                conn.send(message)
+                if recycle:
+                    break
+        finally:
+            if page is not None and browser.is_connected():
+                await counter.close_context(context, page)
+            await counter.close_browser(browser)
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'url', 'pages')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.url = None  # Kênh đang scrape (None = rảnh)
+        self.pages = 0
+
+
+class ShardedRunner:
+    """
+    Pool process scrape kênh song song. Mỗi worker giữ 1 browser + 1 page;
+    process cha phát từng URL cho worker rảnh và gộp kết quả.
+    """
+
+    def __init__(self, counter_kwargs: Optional[Dict] = None, workers: Optional[int] = None,
+                 pages_per_worker: int = 50, max_rss_mb: Optional[int] = 1500,
+                 db_path: Optional[str] = None, max_attempts: int = 2, verbose: bool = False,
+                 rate_limiter=None, metrics: Optional[Metrics] = None):
+        self.counter_kwargs = counter_kwargs or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_worker = max(1, pages_per_worker)
+        self.max_rss = (max_rss_mb or 0) * 1024 * 1024
+        self.db_path = db_path
+        self.max_attempts = max_attempts  # Số lần thử mỗi kênh khi worker bị crash
+        self.verbose = verbose
+        # AdaptiveRateLimiter(shared=True): mọi worker dùng chung một tốc độ
+        self.rate_limiter = rate_limiter
+        # Metrics gộp từ mọi worker (None = worker không đo)
+        self.metrics = metrics
+        self._ctx = multiprocessing.get_context('spawn')
+        self.stats = {}
+
+    def _spawn_worker(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.counter_kwargs, self.db_path, self.pages_per_worker,
+                  self.max_rss, self.verbose, self.rate_limiter, self.metrics is not None),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.stats['workers_started'] += 1
+        return _Worker(process, parent_conn)
+
+    def _update_stats(self, started: float):
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        if elapsed > 0:
+            stats['channels_per_minute'] = round(stats['channels'] / elapsed * 60, 2)
+            stats['videos_per_second'] = round(stats['videos'] / elapsed, 2)
+
+    def run(self, channel_urls: List[str]) -> Iterator[Dict]:
+        """
+        Scrape toàn bộ kênh, yield kết quả ngay khi từng kênh xong (không theo thứ tự).
+        Thống kê (throughput, crash, recycle, peak RSS) được lưu vào self.stats.
+        """
+        pending = deque(channel_urls)
+        attempts = {}
+        workers: List[_Worker] = []
+        self.stats = {
+            'channels': 0,
+            'failed': 0,
+            'videos': 0,
+            'elapsed_seconds': 0.0,
+            'channels_per_minute': 0.0,
+            'videos_per_second': 0.0,
+            'workers_started': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'requeued': 0,
+            'peak_worker_rss': 0,
+        }
+        started = time.perf_counter()
+
+        def finish(result: Dict) -> Dict:
+            if 'error' in result:
+                self.stats['failed'] += 1
+            else:
+                self.stats['videos'] += result['total_videos']
+            self.stats['channels'] += 1
+            self._update_stats(started)
+            return result
+
+        try:
+            while pending or any(w.url for w in workers):
+                # Giữ đủ số worker còn việc để làm, phát URL cho worker rảnh
+                idle = sum(1 for w in workers if w.url is None)
+                while pending and len(workers) < self.workers and idle < len(pending):
+                    workers.append(self._spawn_worker())
+                    idle += 1
+                for worker in workers:
+                    if worker.url is None and pending:
+                        worker.url = pending.popleft()
+                        attempts[worker.url] = attempts.get(worker.url, 0) + 1
+                        with contextlib.suppress(OSError):
+                            # Worker đã chết: sentinel sẽ báo và kênh được requeue
+                            worker.conn.send(worker.url)
+
+                ready = wait([w.conn for w in workers] + [w.process.sentinel for w in workers])
+
+                for worker in list(workers):
+                    dead = worker.process.sentinel in ready
+                    if worker.conn in ready:
+                        try:
+                            message = worker.conn.recv()
+                        except (EOFError, OSError):
+                            message = None
+                            dead = True
+                        if message is not None:
+                            worker.url = None
+                            worker.pages = message['pages']
+                            self.stats['peak_worker_rss'] = max(self.stats['peak_worker_rss'], message['rss'])
+                            if self.metrics is not None and message.get('metrics'):
+                                self.metrics.merge(message['metrics'])
+                            if message['recycle']:
+                                self.stats['recycled'] += 1
+                                self._retire(worker)
+                                workers.remove(worker)
+                            yield finish(message['result'])
+                            continue
+
+                    if dead:
+                        workers.remove(worker)
+                        self._retire(worker)
+                        if worker.url is None:
+                            continue
+
+                        # Worker chết khi đang scrape: đưa kênh lại vào hàng đợi
+                        self.stats['crashed'] += 1
+                        url = worker.url
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Worker {worker.process.pid} "
+                              f"crash (exit code {worker.process.exitcode}) khi scrape {url}")
+                        if attempts[url] < self.max_attempts:
+                            self.stats['requeued'] += 1
+                            pending.appendleft(url)
+                        else:
+                            yield finish({
+                                'error': f'worker crashed {attempts[url]} times',
+                                'channel_url': url,
+                                'scraped_at': datetime.now().isoformat(),
+                            })
+        finally:
+            for worker in workers:
+                with contextlib.suppress(OSError):
+                    worker.conn.send(None)
+            for worker in workers:
+                self._retire(worker)
+            self._update_stats(started)
+
+    def _retire(self, worker: _Worker, timeout: float = 10):
+        """
+        Đợi worker thoát (kill nếu treo) và đóng pipe
+        """
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Snapshot archive dạng cột (append-only) cho lịch sử view
+Mỗi lần scrape một kênh = một snapshot. Các cột video_id / timestamp / views / channel
+được lưu thành mảng số nguyên 64-bit liền nhau, chuỗi (tên kênh, link, caption)
+chỉ được lưu một lần. Đọc bằng mmap nên không phải load toàn bộ lịch sử vào RAM.
+Truy vấn chỉ đọc các dòng của snapshot liên quan (theo index snapshots.q); riêng
+video_history phải tìm dòng đầu tiên của video trên cả cột video_id (mmap.find,
+chạy trong C) vì archive không lưu video thuộc kênh nào.
+
+Cấu trúc thư mục archive:
+  video_id.q, ts.q, views.q, channel.q  - các cột, mỗi dòng = 1 video trong 1 snapshot
+  snapshots.q                          - index snapshot: (channel, ts, start, count, total_views)
+  strings.txt                          - bảng chuỗi intern (tên kênh), 1 dòng = 1 chuỗi
+  videos.jsonl                         - link + caption của mỗi video, ghi lần đầu gặp
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import mmap
+import os
+import re
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from video_store import channel_key
+
+ROW_COLUMNS = ('video_id', 'ts', 'views', 'channel')
+SNAPSHOT_FIELDS = ('channel', 'ts', 'start', 'count', 'total_views')
+ITEM_SIZE = array('q').itemsize
+
+VIDEO_ID_RE = re.compile(r'/video/(\d+)')
+
+
+def snapshot_video_id(video: Dict) -> Optional[int]:
+    """
+    Video ID dạng số của một video trong kết quả scrape (từ 'video_id' hoặc link)
+    """
+    video_id = video.get('video_id')
+    if not video_id:
+        match = VIDEO_ID_RE.search(video.get('link') or '')
+        video_id = match.group(1) if match else None
+    return int(video_id) if video_id else None
+
+
+def parse_timestamp(value) -> int:
+    """
+    scraped_at (ISO) / datetime / số -> unix timestamp (giây)
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int((value or datetime.now()).timestamp())
+
+
+class SnapshotArchive:
+    """
+    Archive cột append-only. Snapshot chỉ được tính là đã ghi khi index
+    snapshots.q được cập nhật (ghi sau cùng), nên dòng thừa do crash giữa chừng
+    sẽ bị cắt bỏ ở lần ghi tiếp theo.
+    """
+
+    def __init__(self, path: str = 'tiktok_archive'):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.strings = []
+        self._string_ids = {}
+        strings_path = self._file('strings.txt')
+        if os.path.exists(strings_path):
+            with open(strings_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._string_ids[line.rstrip('\n')] = len(self.strings)
+                    self.strings.append(line.rstrip('\n'))
+
+        self._known_videos = None  # Tập video_id đã có trong videos.jsonl (load khi cần)
+        self._index = None  # Nội dung snapshots.q đã decode (đọc lại sau mỗi append)
+        self._maps = {}  # tên cột -> (mmap, memoryview)
+        self._mapped_rows = -1
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # ---------- Ghi ----------
+
+    def intern(self, value: str) -> int:
+        """
+        ID của chuỗi trong bảng intern (thêm mới nếu chưa có)
+        """
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            with open(self._file('strings.txt'), 'a', encoding='utf-8') as f:
+                f.write(value.replace('\n', ' ') + '\n')
+            self._string_ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+    def _snapshot_index(self) -> array:
+        """
+        Index snapshot, chỉ đọc từ đĩa lần đầu hoặc sau append_snapshot.
+        Snapshot do process khác ghi thêm chỉ thấy được khi mở lại archive.
+        """
+        if self._index is None:
+            index = array('q')
+            path = self._file('snapshots.q')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                usable = len(data) - len(data) % (ITEM_SIZE * len(SNAPSHOT_FIELDS))
+                index.frombytes(data[:usable])
+            self._index = index
+        return self._index
+
+    def committed_rows(self) -> int:
+        index = self._snapshot_index()
+        if not index:
+            return 0
+        width = len(SNAPSHOT_FIELDS)
+        return index[-width + 2] + index[-width + 3]
+
+    def has_snapshot(self, channel: str, ts: int) -> bool:
+        channel_id = self._string_ids.get(channel)
+        if channel_id is None:
+            return False
+        return any(s['channel_id'] == channel_id and s['ts'] == ts for s in self._iter_snapshots())
+
+    def append_snapshot(self, result: Dict, timestamp=None) -> int:
+        """
+        Ghi kết quả scrape của một kênh thành một snapshot
+        Returns: số video đã ghi
+        """
+        channel = channel_key(result['channel_url'])
+        ts = parse_timestamp(timestamp if timestamp is not None else result.get('scraped_at'))
+
+        ids = array('q')
+        views = array('q')
+        new_videos = []
+        known = self._load_known_videos()
+        for video in result.get('videos', []):
+            video_id = snapshot_video_id(video)
+            if video_id is None:
+                continue
+            ids.append(video_id)
+            views.append(int(video.get('views') or 0))
+            if video_id not in known:
+                known.add(video_id)
+                new_videos.append({
+                    'id': str(video_id),
+                    'link': video.get('link') or '',
+                    'caption': video.get('caption') or '',
+                })
+
+        channel_id = self.intern(channel)
+        start = self.committed_rows()
+        count = len(ids)
+
+        # Cắt dòng chưa commit (nếu lần ghi trước bị ngắt giữa chừng) rồi append cột
+        columns = {
+            'video_id': ids,
+            'ts': array('q', [ts]) * count,
+            'views': views,
+            'channel': array('q', [channel_id]) * count,
+        }
+        for name in ROW_COLUMNS:
+            with open(self._file(f'{name}.q'), 'ab') as f:
+                f.truncate(start * ITEM_SIZE)
+                f.write(columns[name].tobytes())
+
+        if new_videos:
+            with open(self._file('videos.jsonl'), 'a', encoding='utf-8') as f:
+                for video in new_videos:
+                    f.write(json.dumps(video, ensure_ascii=False) + '\n')
+
+        # Commit: thêm dòng index snapshot
+        with open(self._file('snapshots.q'), 'ab') as f:
+            f.write(array('q', [channel_id, ts, start, count, sum(views)]).tobytes())
+        # Index đọc lại ở lần dùng tới; mmap được map lại vì số dòng đã đổi
+        self._index = None
+
+        return count
+
+    def _load_known_videos(self) -> set:
+        if self._known_videos is None:
+            self._known_videos = set()
+            path = self._file('videos.jsonl')
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            self._known_videos.add(int(json.loads(line)['id']))
+        return self._known_videos
+
+    # ---------- Đọc (mmap) ----------
+
+    def column(self, name: str) -> memoryview:
+        """
+        Cột `name` dạng memoryview int64 trên mmap (chỉ gồm các dòng đã commit)
+        """
+        rows = self.committed_rows()
+        if rows != self._mapped_rows:
+            self.close()
+            self._mapped_rows = rows
+
+        if name not in self._maps:
+            if rows == 0:
+                return memoryview(array('q'))
+            with open(self._file(f'{name}.q'), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), rows * ITEM_SIZE, access=mmap.ACCESS_READ)
+            self._maps[name] = (mapped, memoryview(mapped).cast('q'))
+        return self._maps[name][1]
+
+    def close(self):
+        for mapped, view in self._maps.values():
+            view.release()
+            mapped.close()
+        self._maps = {}
+
+    def _iter_snapshots(self):
+        index = self._snapshot_index()
+        width = len(SNAPSHOT_FIELDS)
+        for i in range(0, len(index), width):
+            channel_id, ts, start, count, total_views = index[i:i + width]
+            yield {
+                'channel_id': channel_id,
+                'ts': ts,
+                'start': start,
+                'count': count,
+                'total_views': total_views,
+            }
+
+    def snapshots(self, channel: Optional[str] = None) -> List[Dict]:
+        """
+        Danh sách snapshot (sắp theo thời gian), lọc theo kênh nếu có
+        """
+        channel_id = self._string_ids.get(channel) if channel else None
+        if channel and channel_id is None:
+            return []
+
+        result = []
+        for snap in self._iter_snapshots():
+            if channel_id is not None and snap['channel_id'] != channel_id:
+                continue
+            snap['channel'] = self.strings[snap['channel_id']]
+            result.append(snap)
+        result.sort(key=lambda s: s['ts'])
+        return result
+
+    def _snapshot_views(self, snap: Dict) -> Dict[int, int]:
+        """
+        {video_id: views} của một snapshot (đọc thẳng từ slice mmap)
+        """
+        start, end = snap['start'], snap['start'] + snap['count']
+        return dict(zip(self.column('video_id')[start:end], self.column('views')[start:end]))
+
+    def _window(self, channel: str, since=None, until=None) -> List[Dict]:
+        snaps = self.snapshots(channel)
+        if since is not None:
+            snaps = [s for s in snaps if s['ts'] >= parse_timestamp(since)]
+        if until is not None:
+            snaps = [s for s in snaps if s['ts'] <= parse_timestamp(until)]
+        return snaps
+
+    # ---------- Truy vấn ----------
+
+    def channel_totals(self, channel: str, since=None, until=None) -> List[Tuple[int, int]]:
+        """
+        Tổng view của kênh theo thời gian: [(ts, total_views), ...]
+        """
+        return [(s['ts'], s['total_views']) for s in self._window(channel, since, until)]
+
+    def _find_row(self, video_id: int, start: int, end: int) -> int:
+        """
+        Dòng đầu tiên trong [start, end) có video_id, -1 nếu không có.
+        Tìm chuỗi 8 byte trên mmap (C) thay vì duyệt từng phần tử bằng Python.
+        """
+        if end <= start or not len(self.column('video_id')):
+            return -1
+        data = self._maps['video_id'][0]
+        needle = array('q', [video_id]).tobytes()
+        pos, stop = start * ITEM_SIZE, end * ITEM_SIZE
+        while True:
+            pos = data.find(needle, pos, stop)
+            if pos < 0:
+                return -1
+            if pos % ITEM_SIZE == 0:
+                return pos // ITEM_SIZE
+            pos += 1  # Trùng lệch biên giữa 2 giá trị: tìm tiếp
+
+    def video_history(self, video_id: int) -> List[Tuple[int, int]]:
+        """
+        Lịch sử view của một video: [(ts, views), ...]
+        Dòng đầu tiên của video cho biết kênh; sau đó chỉ tìm trong các
+        snapshot của kênh đó từ snapshot chứa dòng này trở đi.
+        """
+        video_id = int(video_id)
+        first = self._find_row(video_id, 0, self.committed_rows())
+        if first < 0:
+            return []
+        channel_id = self.column('channel')[first]
+        views = self.column('views')
+
+        history = []
+        for snap in self._iter_snapshots():
+            end = snap['start'] + snap['count']
+            if snap['channel_id'] != channel_id or end <= first:
+                continue
+            row = self._find_row(video_id, max(snap['start'], first), end)
+            if row >= 0:
+                history.append((snap['ts'], views[row]))
+        history.sort()
+        return history
+
+    def growth_rates(self, channel: str, since=None, until=None) -> Dict[int, float]:
+        """
+        Tốc độ tăng view (views/giờ) của từng video giữa lần đầu và lần cuối
+        xuất hiện trong khoảng [since, until]
+        """
+        first_views, first_ts = {}, {}
+        last_views, last_ts = {}, {}
+        snaps = self._window(channel, since, until)
+        # Chỉ dùng dict.update (C) trên slice của từng snapshot: duyệt xuôi giữ lần
+        # xuất hiện cuối, duyệt ngược giữ lần xuất hiện đầu
+        for snap in snaps:
+            views = self._snapshot_views(snap)
+            last_views.update(views)
+            last_ts.update(dict.fromkeys(views, snap['ts']))
+        for snap in reversed(snaps):
+            views = self._snapshot_views(snap)
+            first_views.update(views)
+            first_ts.update(dict.fromkeys(views, snap['ts']))
+
+        rates = {}
+        for video_id, views in last_views.items():
+            hours = (last_ts[video_id] - first_ts[video_id]) / 3600
+            if hours > 0:
+                rates[video_id] = (views - first_views[video_id]) / hours
+        return rates
+
+    def top_movers(self, channel: str, before=None, after=None, n: int = 10) -> List[Dict]:
+        """
+        Top N video tăng view nhiều nhất giữa 2 snapshot của kênh
+        (mặc định: 2 snapshot gần nhất; before/after chọn snapshot gần nhất không sau mốc đó)
+        """
+        snaps = self.snapshots(channel)
+        if len(snaps) < 2:
+            return []
+
+        def pick(moment, default):
+            if moment is None:
+                return default
+            ts = parse_timestamp(moment)
+            candidates = [s for s in snaps if s['ts'] <= ts]
+            return candidates[-1] if candidates else snaps[0]
+
+        snap_b = pick(after, snaps[-1])
+        snap_a = pick(before, snaps[-2] if snap_b is snaps[-1] else snaps[0])
+        views_a = self._snapshot_views(snap_a)
+        views_b = self._snapshot_views(snap_b)
+
+        movers = heapq.nlargest(
+            n, ((views - views_a.get(video_id, 0), video_id, views) for video_id, views in views_b.items())
+        )
+        return [
+            {
+                'video_id': str(video_id),
+                'views': views,
+                'delta': delta,
+                'new': video_id not in views_a,
+            }
+            for delta, video_id, views in movers
+        ]
+
+    def video_info(self, video_ids: Iterable) -> Dict[str, Dict]:
+        """
+        Link + caption của các video (đọc từ videos.jsonl)
+        """
+        wanted = {str(v) for v in video_ids}
+        info = {}
+        path = self._file('videos.jsonl')
+        if wanted and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        video = json.loads(line)
+                        if video['id'] in wanted:
+                            info[video['id']] = video
+        return info
+
+
+def import_json_files(archive: SnapshotArchive, paths: Iterable[str]) -> Dict:
+    """
+    Import các file tiktok_views_*.json (save_to_file) vào archive, theo thứ tự scraped_at.
+    Bỏ qua file lỗi và snapshot đã có (cùng kênh + thời điểm).
+    """
+    results = []
+    stats = {'files': 0, 'snapshots': 0, 'videos': 0, 'skipped': 0}
+    for path in paths:
+        stats['files'] += 1
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            stats['skipped'] += 1
+            continue
+        if 'error' in data or 'channel_url' not in data:
+            stats['skipped'] += 1
+            continue
+        results.append(data)
+
+    results.sort(key=lambda r: parse_timestamp(r.get('scraped_at')))
+    for data in results:
+        if archive.has_snapshot(channel_key(data['channel_url']), parse_timestamp(data.get('scraped_at'))):
+            stats['skipped'] += 1
+            continue
+        stats['videos'] += archive.append_snapshot(data)
+        stats['snapshots'] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar archive of TikTok view snapshots')
+    parser.add_argument('--archive', default='tiktok_archive', help='Archive directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help='Import tiktok_views_*.json files')
+    p_import.add_argument('files', nargs='*', help='JSON files (default: tiktok_views_*.json)')
+
+    p_totals = sub.add_parser('totals', help='Channel total views over time')
+    p_totals.add_argument('channel')
+
+    p_growth = sub.add_parser('growth', help='Fastest-growing videos (views/hour)')
+    p_growth.add_argument('channel')
+    p_growth.add_argument('--top', type=int, default=10)
+    p_growth.add_argument('--since', type=datetime.fromisoformat)
+
+    p_movers = sub.add_parser('movers', help='Top movers between two snapshots')
+    p_movers.add_argument('channel')
+    p_movers.add_argument('--top', type=int, default=10)
+    p_movers.add_argument('--before', type=datetime.fromisoformat)
+    p_movers.add_argument('--after', type=datetime.fromisoformat)
+
+    args = parser.parse_args()
+    archive = SnapshotArchive(args.archive)
+    channel = channel_key(args.channel) if getattr(args, 'channel', None) else None
+
+    try:
+        if args.command == 'import':
+            stats = import_json_files(archive, args.files or sorted(glob.glob('tiktok_views_*.json')))
+            print(f"📦 Đã import {stats['snapshots']} snapshot ({stats['videos']:,} video) "
+                  f"từ {stats['files']} file, bỏ qua {stats['skipped']}")
+        elif args.command == 'totals':
+            for ts, total in archive.channel_totals(channel):
+                print(f"{datetime.fromtimestamp(ts).isoformat()}  {total:>15,}")
+        elif args.command == 'growth':
+            rates = archive.growth_rates(channel, since=args.since)
+            top = heapq.nlargest(args.top, rates.items(), key=lambda item: item[1])
+            info = archive.video_info(video_id for video_id, _ in top)
+            for video_id, rate in top:
+                caption = info.get(str(video_id), {}).get('caption', '')[:50]
+                print(f"{video_id}  {rate:>12,.1f} views/h  {caption}")
+        elif args.command == 'movers':
+            movers = archive.top_movers(channel, args.before, args.after, args.top)
+            info = archive.video_info(m['video_id'] for m in movers)
+            for m in movers:
+                caption = info.get(m['video_id'], {}).get('caption', '')[:50]
+                flag = ' (mới)' if m['new'] else ''
+                print(f"{m['video_id']}  +{m['delta']:>12,}  {m['views']:>13,}{flag}  {caption}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'fixtures')
+sys.path.insert(0, ROOT)
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class NodePage:
+    """
+    Page giả: chạy script page.evaluate bằng node trên DOM tối thiểu (tests/dom_shim.js)
+    dựng từ danh sách thẻ video; đánh dấu data-tvc-* được giữ giữa các lần gọi
+    """
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.marks = []
+        self.calls = 0
+
+    def is_closed(self):
+        return False
+
+    async def evaluate(self, js, arg=None):
+        self.calls += 1
+        payload = json.dumps({'js': js, 'arg': arg, 'cards': self.cards, 'marks': self.marks})
+        out = subprocess.run(['node', os.path.join(ROOT, 'tests', 'dom_shim.js')], input=payload,
+                             capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout)
+        self.marks = data['marks']
+        return data['result']
+
+
+@pytest.fixture
+def node_page():
+    if not shutil.which('node'):
+        pytest.skip('node is required to run page scripts without Chromium')
+    return NodePage
@@ -0,0 +1,60 @@
+// DOM tối thiểu để chạy các script page.evaluate của tiktok_counter bằng node
+// (không cần Chromium). Chỉ hỗ trợ selector đơn: tag, .class, [attr="v"], [attr*="v"], *
+// stdin: {js, arg, cards, marks} -> stdout: {result, marks}
+const fs = require('fs');
+
+class El {
+  constructor(tag, attrs = {}, children = [], text = '') {
+    this.tagName = tag.toUpperCase();
+    this.attrs = {...attrs};
+    this.children = children;
+    this._text = text;
+    this.parentElement = null;
+    children.forEach(c => { c.parentElement = this; });
+  }
+  getAttribute(n) { return n in this.attrs ? this.attrs[n] : null; }
+  hasAttribute(n) { return n in this.attrs; }
+  setAttribute(n, v) { this.attrs[n] = String(v); }
+  getAttributeNames() { return Object.keys(this.attrs); }
+  get textContent() { return this._text + this.children.map(c => c.textContent).join(''); }
+  descendants() {
+    const out = [];
+    for (const c of this.children) { out.push(c, ...c.descendants()); }
+    return out;
+  }
+  querySelectorAll(sel) { return this.descendants().filter(matcher(sel)); }
+  querySelector(sel) { return this.querySelectorAll(sel)[0] || null; }
+}
+
+function matcher(sel) {
+  if (sel === '*') return () => true;
+  const m = sel.match(/^([a-z]*)(?:\.([\w-]+))?(?:\[([\w-]+)(\*?=)"([^"]*)"\])?$/);
+  if (!m) throw new SyntaxError('unsupported selector: ' + sel);
+  const [, tag, cls, attr, op, val] = m;
+  return (el) => (!tag || el.tagName === tag.toUpperCase())
+    && (!cls || (el.attrs['class'] || '').split(' ').includes(cls))
+    && (!attr || (attr in el.attrs && (op === '=' ? el.attrs[attr] === val : el.attrs[attr].includes(val))));
+}
+
+// Thẻ video giống trang kênh: div[data-e2e=user-post-item] > a > strong + p caption
+function card(spec) {
+  const views = {'data-e2e': 'video-views'};
+  if (spec.title) views.title = spec.title;
+  const link = new El('a', {href: spec.href}, [new El('strong', views, [], spec.text)]);
+  const caption = new El('p', {'data-e2e': 'user-post-item-desc'}, [], spec.caption || '');
+  const attrs = {'data-e2e': 'user-post-item'};
+  if (spec.aria) attrs['aria-label'] = spec.aria;
+  return new El('div', attrs, [link, caption]);
+}
+
+const input = JSON.parse(fs.readFileSync(0, 'utf-8'));
+const cards = input.cards.map(card);
+const body = new El('body', {}, [new El('div', {'data-e2e': 'user-post-item-list'}, cards)]);
+global.document = {body, querySelectorAll: s => body.querySelectorAll(s), querySelector: s => body.querySelector(s)};
+global.location = {host: 'www.tiktok.com'};
+(input.marks || []).forEach(([i, name]) => cards[i].setAttribute(name, '1'));
+
+const result = eval(input.js)(input.arg);
+const marks = [];
+cards.forEach((c, i) => c.getAttributeNames().filter(n => n.startsWith('data-tvc')).forEach(n => marks.push([i, n])));
+process.stdout.write(JSON.stringify({result, marks}));
@@ -0,0 +1,91 @@
+import asyncio
+import contextlib
+import io
+import time
+
+import tiktok_counter
+from tiktok_counter import SCROLL_IDLE_ROUNDS, TikTokViewCounter
+
+
+class LazyGridPage:
+    """
+    Page giả: grid load thêm `step` video sau `delay` giây mỗi lần scroll.
+    responses: số lần scroll đầu tiên chỉ có response item_list về (grid không lớn thêm)
+    """
+
+    def __init__(self, counter, total, step=12, delay=0.02, responses=0):
+        self.counter = counter
+        self.total = total
+        self.step = step
+        self.delay = delay
+        self.responses = responses
+        self.loaded = step
+        self.scrolls = 0
+
+    async def _grow(self):
+        await asyncio.sleep(self.delay)
+        self.loaded = min(self.total, self.loaded + self.step)
+
+    async def _respond(self):
+        await asyncio.sleep(self.delay)
+        self.counter._item_list_event.set()
+
+    async def wait_for_function(self, js, arg=None, timeout=0):
+        assert js is tiktok_counter.ITEMS_GREW_JS
+        deadline = time.perf_counter() + timeout / 1000
+        while self.loaded <= arg['count']:
+            if time.perf_counter() >= deadline:
+                raise TimeoutError
+            await asyncio.sleep(0.005)
+
+    async def evaluate(self, js, args=None):
+        if js.startswith('window.scrollTo'):
+            self.scrolls += 1
+            if self.scrolls <= self.responses:
+                asyncio.ensure_future(self._respond())
+            else:
+                asyncio.ensure_future(self._grow())
+            return None
+        if js is tiktok_counter.SCROLL_STATE_JS:
+            return {'count': self.loaded, 'lastLink': '', 'tailLinks': [], 'scrollY': self.loaded * 100}
+        raise AssertionError(js[:40])
+
+
+def scroll(counter, make_page):
+    async def run():
+        counter.reset()
+        page = make_page(counter)
+        started = time.perf_counter()
+        loaded = await counter.scroll_to_load(page)
+        return page, loaded, time.perf_counter() - started
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(run())
+
+
+def test_scroll_moves_on_as_soon_as_grid_grows_and_stops_when_idle():
+    counter = TikTokViewCounter(scroll_idle_timeout=300)
+    page, loaded, elapsed = scroll(counter, lambda c: LazyGridPage(c, total=60))
+
+    assert loaded == 60
+    # 4 bước có video mới, rồi SCROLL_IDLE_ROUNDS bước không có gì thì dừng
+    assert counter.scroll_steps == 4 + SCROLL_IDLE_ROUNDS
+    assert page.scrolls == counter.scroll_steps
+    # Bước có tiến triển không đợi hết scroll_idle_timeout
+    assert elapsed < SCROLL_IDLE_ROUNDS * 0.3 + 4 * 0.15
+
+
+def test_item_list_response_counts_as_progress():
+    counter = TikTokViewCounter(scroll_idle_timeout=200)
+    page, loaded, elapsed = scroll(counter, lambda c: LazyGridPage(c, total=12, responses=3))
+
+    # Grid không lớn thêm nhưng response item_list về: vẫn scroll tiếp
+    assert loaded == 12
+    assert counter.scroll_steps == 3 + SCROLL_IDLE_ROUNDS
+
+
+def test_max_videos_stops_scrolling_early():
+    counter = TikTokViewCounter(scroll_idle_timeout=300, max_videos=30)
+    page, loaded, elapsed = scroll(counter, lambda c: LazyGridPage(c, total=120))
+
+    assert loaded == 36
+    assert counter.scroll_steps == 2
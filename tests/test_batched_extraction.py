@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+import io
+
+from tiktok_counter import TikTokViewCounter
+
+CARDS = [
+    {'href': '/@batch/video/%d' % (7300000000000000000 + i), 'text': '%dK' % (i + 1), 'caption': 'video %d' % i}
+    for i in range(23)
+]
+CARDS[3]['aria'] = '4,321 views'
+CARDS[7]['title'] = '8,765'
+
+
+def extract(page, batch_size):
+    counter = TikTokViewCounter(batch_size=batch_size)
+    counter.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(counter.extract_videos_batched(page))
+    return counter
+
+
+def test_small_batches_cover_whole_grid_in_order(node_page):
+    page = node_page(CARDS)
+    counter = extract(page, batch_size=5)
+
+    # 23 video / 5 mỗi batch -> 5 round-trip, mỗi round-trip đúng một page.evaluate
+    assert counter.extraction_round_trips == 5
+    assert page.calls == 5
+    assert [v.index for v in counter.videos_data] == list(range(1, 24))
+    assert [v.link for v in counter.videos_data] == ['https://www.tiktok.com' + c['href'] for c in CARDS]
+    assert counter.total_views == sum(v.views for v in counter.videos_data)
+
+
+def test_batched_result_matches_single_batch(node_page):
+    batched = extract(node_page(CARDS), batch_size=4)
+    single = extract(node_page(CARDS), batch_size=500)
+
+    assert single.extraction_round_trips == 1
+    summary = lambda counter: [(v.views, v.source, v.caption) for v in counter.videos_data]
+    assert summary(batched) == summary(single)
+    # aria-label -> title -> text giống get_exact_view_count
+    assert summary(single)[3][:2] == (4321, 'aria-label')
+    assert summary(single)[7][:2] == (8765, 'title-attribute')
+    assert summary(single)[0][:2] == (1000, 'text-strong[data-e2e="video-views"]')
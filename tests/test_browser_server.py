@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+
+import browser_server
+from tiktok_counter import TikTokViewCounter
+
+
+class FakeContext:
+    def __init__(self, log):
+        self.log = log
+
+    async def storage_state(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'cookies': []}, f)
+        self.log.append('storage_state')
+
+    async def close(self):
+        self.log.append('context-closed')
+
+
+class FakePlaywright:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeLauncher:
+    """
+    launch_persistent giả: Chromium ghi DevToolsActivePort một lúc sau khi launch
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.args = None
+
+    async def launch_persistent(self, p, user_data_dir, extra_args):
+        self.args = extra_args
+        assert not os.path.exists(os.path.join(user_data_dir, 'DevToolsActivePort'))
+
+        async def write_port():
+            await asyncio.sleep(0.1)
+            with open(os.path.join(user_data_dir, 'DevToolsActivePort'), 'w') as f:
+                f.write('45123\n/devtools/browser/abc\n')
+        asyncio.ensure_future(write_port())
+        return FakeContext(self.log)
+
+
+def test_read_endpoint_ignores_missing_stale_or_broken_files(tmp_path):
+    profile = str(tmp_path)
+    assert browser_server.read_endpoint(profile) is None
+
+    endpoint_file = tmp_path / browser_server.ENDPOINT_FILE
+    endpoint_file.write_text(json.dumps({'ws_endpoint': 'ws://127.0.0.1:1/x', 'pid': os.getpid()}))
+    assert browser_server.read_endpoint(profile) == 'ws://127.0.0.1:1/x'
+
+    # Server đã chết mà không dọn file
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    endpoint_file.write_text(json.dumps({'ws_endpoint': 'ws://127.0.0.1:1/x', 'pid': dead.pid}))
+    assert browser_server.read_endpoint(profile) is None
+
+    endpoint_file.write_text('{not json')
+    assert browser_server.read_endpoint(profile) is None
+
+
+def test_serve_publishes_endpoint_and_cleans_up_on_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_server, 'async_playwright', FakePlaywright)
+    profile = str(tmp_path / 'profile')
+    user_data = os.path.join(profile, 'user-data')
+    os.makedirs(user_data)
+    with open(os.path.join(user_data, 'DevToolsActivePort'), 'w') as f:
+        f.write('1111\n/devtools/browser/stale\n')
+    log = []
+    launcher = FakeLauncher(log)
+
+    async def run():
+        task = asyncio.ensure_future(browser_server.serve(launcher, profile, port=0))
+        endpoint_file = os.path.join(profile, browser_server.ENDPOINT_FILE)
+        while not os.path.exists(endpoint_file):
+            await asyncio.sleep(0.02)
+        endpoint = browser_server.read_endpoint(profile)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return endpoint
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        endpoint = asyncio.run(run())
+
+    # Endpoint đọc từ DevToolsActivePort mới, không phải file của lần chạy trước
+    assert endpoint == 'ws://127.0.0.1:45123/devtools/browser/abc'
+    assert '--remote-debugging-port=0' in launcher.args
+    assert not os.path.exists(os.path.join(profile, browser_server.ENDPOINT_FILE))
+    assert os.path.exists(browser_server.storage_state_path(profile))
+    assert log == ['storage_state', 'context-closed']
+
+
+class FakeBrowser:
+    def __init__(self, contexts):
+        self.contexts = contexts
+        self.log = []
+
+    async def new_context(self, **options):
+        self.log.append(('new_context', options.get('storage_state')))
+        return 'fresh-context'
+
+    async def close(self):
+        self.log.append('browser-closed')
+
+
+class FakePage:
+    def __init__(self, log):
+        self.log = log
+
+    async def close(self):
+        self.log.append('page-closed')
+
+
+def test_attached_counter_reuses_server_context_and_only_closes_pages():
+    counter = TikTokViewCounter(connect='ws://127.0.0.1:45123/devtools/browser/abc')
+    log = []
+    context = FakeContext(log)
+    browser = FakeBrowser([context])
+
+    async def run():
+        assert await counter.new_context(browser) is context
+        await counter.close_context(context, FakePage(log))
+        await counter.close_browser(browser)
+    asyncio.run(run())
+
+    # Context mặc định (cookie + cache của profile) và browser server vẫn sống
+    assert log == ['page-closed']
+    assert browser.log == []
+
+
+def test_cold_counter_loads_saved_storage_state(tmp_path):
+    path = str(tmp_path / 'storage_state.json')
+    counter = TikTokViewCounter(storage_state=path)
+    browser = FakeBrowser([])
+
+    async def run():
+        await counter.new_context(browser)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'cookies': []}, f)
+        await counter.new_context(browser)
+        await counter.close_browser(browser)
+    asyncio.run(run())
+
+    assert browser.log == [('new_context', None), ('new_context', path), 'browser-closed']
@@ -0,0 +1,98 @@
+import asyncio
+import contextlib
+import io
+import json
+
+import tiktok_counter
+from tiktok_counter import TikTokViewCounter
+
+CHANNEL = 'https://www.tiktok.com/@fake'
+
+
+class GridPage:
+    """
+    Page giả: mỗi bước scroll load thêm 12 video, lỗi ở bước scroll thứ fail_at trở đi
+    """
+
+    def __init__(self, total: int, fail_at: int = None):
+        self.total = total
+        self.loaded = 0
+        self.fail_at = fail_at
+        self.scrolls = 0
+        self.marks = {}
+
+    def on(self, *args):
+        pass
+
+    def remove_listener(self, *args):
+        pass
+
+    def is_closed(self):
+        return False
+
+    async def goto(self, url, **kwargs):
+        self.loaded = 12
+
+    async def wait_for_function(self, js, arg=None, timeout=0):
+        if self.loaded <= arg['count']:
+            raise TimeoutError
+
+    def locator(self, selector):
+        class Locator:
+            async def text_content(self):
+                return 'Fake'
+        return Locator()
+
+    def item(self, i):
+        return {'views': 1000 + i, 'view_text': str(1000 + i), 'source': 'aria-label', 'raw_text': None,
+                'link': f'/@fake/video/{7300000000000000000 + i}', 'caption': f'c{i}'}
+
+    async def evaluate(self, js, args=None):
+        if js.startswith('window.scrollTo'):
+            self.scrolls += 1
+            if self.fail_at and self.scrolls >= self.fail_at:
+                raise RuntimeError('Timeout 30000ms exceeded')
+            self.loaded = min(self.total, self.loaded + 12)
+            return None
+        if js is tiktok_counter.SCROLL_STATE_JS:
+            return {'count': self.loaded, 'lastLink': self.item(self.loaded - 1)['link'], 'tailLinks': [],
+                    'scrollY': self.loaded * 100}
+        if js is tiktok_counter.BATCH_EXTRACT_JS:
+            indexes = list(range(self.loaded))
+            if args.get('onlyNew'):
+                marked = self.marks.setdefault(args.get('mark', 'data-tvc-seen'), set())
+                indexes = [i for i in indexes if i not in marked]
+            indexes = indexes[args['start']:args['start'] + args['limit']]
+            if args.get('onlyNew'):
+                marked.update(indexes)
+            return {'selector': 'x', 'total': self.loaded, 'items': [self.item(i) for i in indexes],
+                    'planHits': 0, 'planMisses': 0, 'planStale': 0, 'discoveryMs': 0, 'extractMs': 0}
+        raise AssertionError(js[:40])
+
+
+def scrape(counter, page):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(counter.scrape_page(page, CHANNEL))
+
+
+def test_checkpoints_are_off_by_default():
+    assert TikTokViewCounter().checkpoints is None
+
+
+def test_resume_fast_forwards_to_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(tiktok_counter, 'PHASE_RETRY_DELAY', 0)
+    directory = str(tmp_path)
+
+    failed = scrape(TikTokViewCounter(checkpoint_dir=directory, scroll_idle_timeout=10), GridPage(400, fail_at=25))
+    assert 'error' in failed
+    saved = json.load(open(failed['checkpoint'], encoding='utf-8'))
+    assert saved['loaded'] == 300 and saved['scroll_y'] == 30000
+
+    resumed = TikTokViewCounter(checkpoint_dir=directory, scroll_idle_timeout=10, resume=True)
+    result = scrape(resumed, GridPage(400))
+    assert result['total_videos'] == 400
+    assert result['total_views'] == sum(1000 + i for i in range(400))
+    # Tua nhanh tới 300 video (24 bước x 12) không checkpoint, rồi mới scroll thường
+    assert result['fast_forward_steps'] == 24
+    assert result['resumed_videos'] == 300
+    assert result['scroll_steps'] > result['fast_forward_steps']
@@ -0,0 +1,63 @@
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+from rate_limiter import AdaptiveRateLimiter
+from tiktok_counter import TikTokViewCounter
+
+STATE = {'ItemModule': {'1': {'stats': {'playCount': 1234567, 'diggCount': 10, 'commentCount': 2, 'shareCount': 1}}}}
+
+
+class Response:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.request = None  # Không có timing: dùng latency đo ở phía gọi
+
+
+class ThrottledTab:
+    """
+    Tab trả 429 (Retry-After) cho `throttled` lần goto đầu rồi mới trả trang video
+    """
+
+    def __init__(self, throttled):
+        self.throttled = throttled
+        self.gotos = []
+
+    async def goto(self, url, **kwargs):
+        self.gotos.append(time.monotonic())
+        if len(self.gotos) <= self.throttled:
+            return Response(429, {'retry-after': '0.2'})
+        return Response(200)
+
+    async def evaluate(self, js, arg=None):
+        return json.dumps(STATE)
+
+
+def fetch(counter, tab):
+    async def main():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return await counter._fetch_video_details(tab, None, 'https://www.tiktok.com/@a', '/@a/video/1')
+    return asyncio.run(main())
+
+
+def test_throttled_video_page_is_retried_after_the_limiter_pause():
+    limiter = AdaptiveRateLimiter(rate=50, max_rate=50)
+    counter = TikTokViewCounter(rate_limiter=limiter)
+    tab = ThrottledTab(throttled=1)
+
+    details = fetch(counter, tab)
+    assert details == {'views': 1234567, 'likes': 10, 'comments': 2, 'shares': 1}
+    assert len(tab.gotos) == 2
+    assert tab.gotos[1] - tab.gotos[0] >= 0.19  # Retry-After được tôn trọng
+    snapshot = limiter.snapshot()
+    assert snapshot['throttled'] == 1 and snapshot['healthy'] == 1 and snapshot['rate'] < 50
+
+
+def test_video_page_throttled_twice_is_given_up():
+    counter = TikTokViewCounter(rate_limiter=AdaptiveRateLimiter(rate=50, max_rate=50))
+    tab = ThrottledTab(throttled=5)
+    assert fetch(counter, tab) is None
+    assert len(tab.gotos) == 2
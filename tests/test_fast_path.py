@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from fast_path import HttpPool
+
+
+def test_timeout_mid_body_closes_the_connection():
+    async def main():
+        async def stall(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\npartial')
+            await writer.drain()
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(stall, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            async with HttpPool(timeout=0.2) as pool:
+                writers = []
+                connect = pool._connect
+
+                async def tracked(key):
+                    reader, writer = await connect(key)
+                    writers.append(writer)
+                    return reader, writer
+
+                pool._connect = tracked
+                with pytest.raises(asyncio.TimeoutError):
+                    await pool.get(f'http://127.0.0.1:{port}/')
+                assert len(writers) == 1 and writers[0].is_closing()
+                assert pool._idle[('http', '127.0.0.1', port)] == []
+
+    asyncio.run(main())
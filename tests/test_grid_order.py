@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+import io
+
+from conftest import load_fixture
+from tiktok_counter import TikTokViewCounter, video_id_from_link
+
+CHANNEL = 'https://www.tiktok.com/@ssr'
+
+
+def grid_ids(fixture):
+    return [video_id_from_link(card['href']) for card in fixture['cards']]
+
+
+def run(coro):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
+
+
+def test_ssr_videos_keep_grid_position_before_limits(node_page):
+    fixture = load_fixture('ssr_grid.json')
+    counter = TikTokViewCounter(max_videos=6)
+    counter.reset()
+    counter.ingest_item_list(fixture['item_list'])
+
+    run(counter._extract_all(node_page(fixture['cards']), CHANNEL))
+    assert [video_id_from_link(v.link) for v in counter.videos_data] == grid_ids(fixture)
+    assert [v.index for v in counter.videos_data] == list(range(1, 13))
+    assert [v.source for v in counter.videos_data[:5]] == ['aria-label'] * 4 + ['api-item-list']
+
+    counter._apply_limits()
+    assert [video_id_from_link(v.link) for v in counter.videos_data] == grid_ids(fixture)[:6]
+    assert counter.total_views == sum(2000000 + i for i in range(4)) + 1000004 + 1000005
+
+
+def test_checkpoint_snapshot_follows_grid_order(node_page, tmp_path):
+    fixture = load_fixture('ssr_grid.json')
+    counter = TikTokViewCounter(checkpoint_dir=str(tmp_path))
+    counter.reset()
+    counter.ingest_item_list(fixture['item_list'])
+
+    run(counter._save_checkpoint(node_page(fixture['cards']), CHANNEL, state={'count': 12, 'scrollY': 0}))
+    saved = counter.checkpoints.load(CHANNEL)['videos']
+    assert [video_id_from_link(v['link']) for v in saved] == grid_ids(fixture)
+    assert saved[4]['source'] == 'api-item-list'
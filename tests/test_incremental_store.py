@@ -0,0 +1,61 @@
+import contextlib
+import io
+
+from tiktok_counter import TikTokViewCounter
+from video_store import VideoStore, channel_key
+
+CHANNEL = 'https://www.tiktok.com/@store'
+
+
+def video(video_id, views):
+    return {'video_id': str(video_id), 'views': views, 'view_text': str(views),
+            'link': f'/@store/video/{video_id}', 'caption': ''}
+
+
+def test_carried_forward_videos_respect_max_videos(tmp_path):
+    store = VideoStore(str(tmp_path / 'views.db'))
+    store.upsert_videos(channel_key(CHANNEL), [video(7300000000000000000 + i, 100) for i in range(5)])
+
+    counter = TikTokViewCounter(store=store, incremental_depth=2, max_videos=4)
+    counter.reset()
+    for i, video_id in enumerate((7400000000000000001, 7400000000000000000, 7300000000000000004), 1):
+        record = counter._build_video_info(i, 500, '500', 'aria-label', f'/@store/video/{video_id}', '')
+        counter.videos_data.append(record)
+    counter.total_views = counter.videos_data.total_views()
+
+    counter._apply_limits()
+    with contextlib.redirect_stdout(io.StringIO()):
+        counter._sync_store(CHANNEL)
+
+    assert [v.source for v in counter.videos_data] == ['aria-label'] * 3 + ['store']
+    assert [v.index for v in counter.videos_data] == [1, 2, 3, 4]
+    assert counter.total_views == 3 * 500 + 100
+    assert counter.reused_videos == 1
+    store.close()
+
+
+def test_partial_scrape_reports_delta_over_known_videos_only(tmp_path):
+    store = VideoStore(str(tmp_path / 'views.db'))
+    channel = channel_key(CHANNEL)
+    store.upsert_videos(channel, [video(7300000000000000000 + i, 1000) for i in range(5)])
+
+    counter = TikTokViewCounter(store=store, max_videos=3)
+    counter.reset()
+    scraped = [(7400000000000000000, 50, '50'), (7300000000000000004, 1200, '1200'),
+               (7300000000000000003, 0, ''), (None, 9, '9')]
+    for i, (video_id, views, text) in enumerate(scraped, 1):
+        link = f'/@store/video/{video_id}' if video_id else '/@store/photo/x'
+        counter.videos_data.append(counter._build_video_info(i, views, text, 'text-strong', link, ''))
+    counter.total_views = counter.videos_data.total_views()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        counter._sync_store(CHANNEL)
+
+    # Video mới (7400...) không tính vào delta; video đọc lỗi giữ view đã lưu
+    assert counter.views_delta == 200
+    assert counter.refreshed_videos == 2
+    assert counter.reused_videos == 1
+    assert counter.videos_data[2].views == 1000 and counter.videos_data[2].source == 'store'
+    assert counter.total_views == 50 + 1200 + 1000 + 9
+    assert store.get_videos(channel)['7300000000000000003']['views'] == 1000
+    store.close()
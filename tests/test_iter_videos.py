@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+import io
+
+import tiktok_counter
+from tiktok_counter import TikTokViewCounter
+
+CHANNEL = 'https://www.tiktok.com/@fake'
+
+
+class VirtualGridPage:
+    """
+    Page giả với grid ảo hóa: DOM chỉ giữ `window` node cuối, mỗi lần scroll thêm
+    `step` video và xóa node đã cuộn qua. Node của video đầu tiên trong lượt mới
+    được render lại (node mới, chưa đánh dấu) để giả lập trùng lặp.
+    """
+
+    def __init__(self, total, step=12, window=24):
+        self.total = total
+        self.step = step
+        self.window = window
+        self.nodes = []  # (node id, index video)
+        self.rendered = 0
+        self.marked = set()
+        self.scrolls = 0
+        self.listeners = []
+        self._render(range(step))
+
+    def _render(self, indexes):
+        for i in indexes:
+            self.rendered += 1
+            self.nodes.append((self.rendered, i))
+        self.nodes = self.nodes[-self.window:]
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    def is_closed(self):
+        return False
+
+    async def goto(self, url, **kwargs):
+        return None
+
+    async def wait_for_function(self, js, arg=None, timeout=0):
+        if len(self.nodes) <= arg['count']:
+            raise TimeoutError
+
+    def locator(self, selector):
+        class Locator:
+            async def text_content(self):
+                return 'Fake'
+        return Locator()
+
+    def item(self, i):
+        return {'views': 1000 + i, 'view_text': str(1000 + i), 'source': 'aria-label', 'raw_text': None,
+                'link': f'/@fake/video/{7300000000000000000 + i}', 'caption': f'c{i}'}
+
+    async def evaluate(self, js, args=None):
+        if js.startswith('window.scrollTo'):
+            self.scrolls += 1
+            loaded = max(i for _, i in self.nodes) + 1
+            fresh = list(range(loaded, min(self.total, loaded + self.step)))
+            self._render(([loaded - 1] if fresh else []) + fresh)
+            return None
+        if js is tiktok_counter.SCROLL_STATE_JS:
+            return {'count': len(self.nodes), 'lastLink': self.item(self.nodes[-1][1])['link'],
+                    'tailLinks': [], 'scrollY': self.scrolls * 1000}
+        if js is tiktok_counter.BATCH_EXTRACT_JS:
+            assert args['onlyNew']
+            fresh = [node for node in self.nodes if node[0] not in self.marked]
+            fresh = fresh[args['start']:args['start'] + args['limit']]
+            self.marked.update(node_id for node_id, _ in fresh)
+            return {'selector': 'x', 'total': len(self.nodes), 'items': [self.item(i) for _, i in fresh],
+                    'planHits': 0, 'planMisses': 0, 'planStale': 0, 'discoveryMs': 0, 'extractMs': 0}
+        raise AssertionError(js[:40])
+
+
+def collect(counter, page, on_video=None):
+    async def run():
+        videos = []
+        async for video in counter.iter_page_videos(page, CHANNEL):
+            if on_video:
+                on_video(video)
+            videos.append(video)
+        return videos
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(run())
+
+
+def test_iter_yields_every_video_once_from_virtualized_grid():
+    page = VirtualGridPage(total=60)
+    counter = TikTokViewCounter(scroll_idle_timeout=50, batch_size=5)
+
+    videos = collect(counter, page)
+
+    # Node đã cuộn qua bị xóa vẫn không mất video; node render lại không gây trùng
+    assert [v.link for v in videos] == [
+        'https://www.tiktok.com' + page.item(i)['link'] for i in range(60)
+    ]
+    assert [v.index for v in videos] == list(range(1, 61))
+    assert counter.video_count == 60
+    assert counter.total_views == sum(1000 + i for i in range(60))
+    assert page.listeners == []
+
+
+def test_iter_streams_before_scrolling_and_stops_at_max_videos():
+    page = VirtualGridPage(total=600)
+    counter = TikTokViewCounter(scroll_idle_timeout=50, max_videos=30)
+    scrolls_at_yield = []
+
+    videos = collect(counter, page, lambda video: scrolls_at_yield.append(page.scrolls))
+
+    assert [v.index for v in videos] == list(range(1, 31))
+    assert counter.video_count == 30
+    assert counter.total_views == sum(1000 + i for i in range(30))
+    # Lượt video đầu được yield ngay, trước bước scroll đầu tiên
+    assert scrolls_at_yield[:12] == [0] * 12
+    # Dừng ngay khi đủ max_videos, không scroll hết kênh
+    assert page.scrolls == 2
+    assert page.listeners == []
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+import io
+import json
+
+import tiktok_counter
+from metrics import NULL_METRICS, Metrics
+from tiktok_counter import TikTokViewCounter
+
+
+class CountingPage:
+    """
+    Page giả đếm mọi lệnh gửi qua CDP: mỗi lần scroll load thêm 10 video, tối đa `total`
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.loaded = 10
+        self.calls = 0
+
+    async def wait_for_function(self, js, arg=None, timeout=0):
+        self.calls += 1
+        if self.loaded <= arg['count']:
+            raise TimeoutError
+
+    async def evaluate(self, js, args=None):
+        self.calls += 1
+        if js.startswith('window.scrollTo'):
+            self.loaded = min(self.total, self.loaded + 10)
+            return None
+        if js is tiktok_counter.SCROLL_STATE_JS:
+            return {'count': self.loaded, 'lastLink': '', 'tailLinks': [], 'scrollY': 0}
+        if js is tiktok_counter.BATCH_EXTRACT_JS:
+            items = [{'views': i, 'view_text': str(i), 'source': 'aria-label' if i % 2 else 'title-attribute',
+                      'raw_text': None, 'link': f'/@fake/video/{7300000000000000000 + i}', 'caption': ''}
+                     for i in range(args['start'], min(self.loaded, args['start'] + args['limit']))]
+            return {'selector': '[data-e2e="user-post-item"]', 'total': self.loaded, 'items': items,
+                    'planHits': 0, 'planMisses': 0, 'planStale': 0, 'discoveryMs': 4, 'extractMs': 0}
+        raise AssertionError(js[:40])
+
+
+def test_phase_timings_counters_and_labels_export_to_json_and_prometheus(tmp_path):
+    metrics = Metrics()
+    with metrics.phase('goto'):
+        pass
+    metrics.observe('video_extraction', 0.5, 10)
+    metrics.observe('video_extraction', 0.25, 5)
+    metrics.count('cdp_calls')
+    metrics.count('cdp_calls', 4)
+    metrics.record('view_source', 'aria-label', 3)
+    metrics.record('view_source', 'text-"x"')
+
+    data = metrics.to_dict()
+    assert data['phases']['video_extraction'] == {'seconds': 0.75, 'count': 15, 'avg_seconds': 0.05}
+    assert data['phases']['goto']['count'] == 1
+    assert data['counters'] == {'cdp_calls': 5}
+    assert data['labeled'] == {'view_source': {'aria-label': 3, 'text-"x"': 1}}
+
+    prom = metrics.to_prometheus()
+    assert 'tiktok_counter_phase_seconds_sum{phase="video_extraction"} 0.750000' in prom
+    assert 'tiktok_counter_phase_seconds_count{phase="video_extraction"} 15' in prom
+    assert 'tiktok_counter_cdp_calls_total 5' in prom
+    assert 'tiktok_counter_view_source_total{view_source="text-\\"x\\""} 1' in prom
+
+    metrics.save(str(tmp_path / 'm.json'))
+    metrics.save(str(tmp_path / 'm.prom'))
+    assert json.loads((tmp_path / 'm.json').read_text(encoding='utf-8')) == data
+    assert (tmp_path / 'm.prom').read_text(encoding='utf-8') == prom
+
+    merged = Metrics()
+    merged.merge(data)
+    merged.merge(data)
+    assert merged.to_dict()['counters'] == {'cdp_calls': 10}
+    assert merged.to_dict()['phases']['video_extraction']['count'] == 30
+
+
+def test_counter_counts_every_cdp_call_and_strategy():
+    metrics = Metrics()
+    counter = TikTokViewCounter(metrics=metrics, batch_size=8, scroll_idle_timeout=50)
+    page = CountingPage(total=35)
+
+    async def run():
+        counter.reset()
+        await counter.scroll_to_load(page)
+        await counter.extract_videos_batched(page)
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run())
+
+    data = metrics.to_dict()
+    assert data['counters']['cdp_calls'] == page.calls
+    assert data['phases']['scroll']['count'] == 1
+    assert data['phases']['video_extraction']['count'] == 35
+    assert data['labeled']['view_source'] == {'aria-label': 17, 'title-attribute': 18}
+    assert data['labeled']['video_selector'] == {'[data-e2e="user-post-item"]': 35}
+    assert data['phases']['selector_discovery']['seconds'] == 0.004
+
+
+def test_null_metrics_is_the_default_and_records_nothing():
+    counter = TikTokViewCounter()
+    assert counter.metrics is NULL_METRICS
+    with NULL_METRICS.phase('goto'):
+        NULL_METRICS.count('cdp_calls')
+        NULL_METRICS.observe('scroll', 1.0)
+        NULL_METRICS.record('view_source', 'aria-label')
+    assert not hasattr(NULL_METRICS, 'counters')
@@ -0,0 +1,41 @@
+import pytest
+
+from tiktok_counter import count_rounding_error, parse_count
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.234M', 1234000),
+    ('1.2M views', 1200000),
+    ('1.25M', 1250000),
+    ('523K', 523000),
+    ('1.5B', 1500000000),
+    ('1,234.5K', 1234500),
+    ('1.234,5K', 1234500),
+    ('1,2 Tr', 1200000),
+    ('12,3 N', 12300),
+    ('2,25 T', 2250000000),
+    ('1,234 triệu', 1234000),
+    ('1.2万', 12000),
+    ('1.2万次观看', 12000),
+    ('3億', 300000000),
+    ('1,5億', 150000000),
+    ('5,234', 5234),
+    ('1.234.567', 1234567),
+    ('1 234 567', 1234567),
+    ('', 0),
+    ('no views', 0),
+])
+def test_parse_count(text, expected):
+    assert parse_count(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.234M', 500),
+    ('1.2M', 50000),
+    ('1,2 Tr', 50000),
+    ('523K', 500),
+    ('1.2万', 500),
+    ('5,234', 0),
+])
+def test_count_rounding_error(text, expected):
+    assert count_rounding_error(text) == expected
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from fast_path import HttpPool
+from fixture_server import ThrottlingFixtureHandler, start_fixture_server
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+CAPACITY = 10.0
+
+
+@pytest.fixture
+def throttling_server(monkeypatch):
+    monkeypatch.setattr(ThrottlingFixtureHandler, 'retry_after', 0.3)
+    ThrottlingFixtureHandler.configure(capacity=CAPACITY, burst=2, base_latency=0.001, max_in_flight=8)
+    server, base_url = start_fixture_server(handler=ThrottlingFixtureHandler)
+    yield f'{base_url}/@hydrated'
+    server.shutdown()
+    server.server_close()
+
+
+async def hammer(url, limiter, workers, duration):
+    """
+    `workers` worker gửi request liên tục trong `duration` giây (qua limiter nếu có)
+    Returns: (số response 200, số response bị từ chối, [(status, tốc độ trước, tốc độ sau)])
+    """
+    ok = refused = 0
+    rates = []
+
+    async def worker(client, deadline):
+        nonlocal ok, refused
+        while time.perf_counter() < deadline:
+            if limiter:
+                await limiter.acquire()
+            started = time.perf_counter()
+            response = await client.get(url)
+            if limiter:
+                before = limiter.snapshot()['rate']
+                limiter.observe(response.status, time.perf_counter() - started,
+                                parse_retry_after(response.headers.get('retry-after')))
+                rates.append((response.status, before, limiter.snapshot()['rate']))
+            if response.status == 200:
+                ok += 1
+            else:
+                refused += 1
+
+    async with HttpPool(limit_per_host=workers) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, deadline) for _ in range(workers)))
+    return ok, refused, rates
+
+
+def test_adaptive_controller_backs_off_and_keeps_refusals_low(throttling_server):
+    unpaced_ok, unpaced_refused, _ = asyncio.run(hammer(throttling_server, None, 8, 1.0))
+    assert unpaced_refused > unpaced_ok  # Server thật sự throttle khi không giới hạn
+
+    ThrottlingFixtureHandler.configure()
+    limiter = AdaptiveRateLimiter(rate=2, max_rate=CAPACITY * 4, burst=2, cooldown=0.2)
+    ok, refused, rates = asyncio.run(hammer(throttling_server, limiter, 8, 3.0))
+
+    snapshot = limiter.snapshot()
+    assert snapshot['throttled'] >= 1 and snapshot['backoffs'] >= 1
+    assert refused / (ok + refused) < 0.2
+    assert any(status != 200 and after < before for status, before, after in rates)
+    # Goodput không tệ hơn nhiều so với capacity của server
+    assert ok >= CAPACITY * 3 * 0.5
+
+
+def test_429_halves_rate_and_retry_after_pauses_sends():
+    limiter = AdaptiveRateLimiter(rate=8, max_rate=8, burst=1)
+    assert limiter.try_acquire() == 0
+
+    assert limiter.observe(429, 0.01, retry_after=0.3) is False
+    assert limiter.snapshot()['rate'] == 4
+    pause = limiter.try_acquire()
+    assert 0.25 < pause <= 0.3
+
+    started = time.perf_counter()
+    asyncio.run(limiter.acquire())
+    assert time.perf_counter() - started >= 0.25
+
+
+def test_rate_recovers_after_healthy_responses():
+    limiter = AdaptiveRateLimiter(rate=8, max_rate=8, cooldown=0)
+    limiter.observe(503, 0.01)
+    assert limiter.snapshot()['rate'] == 4
+    for _ in range(40):
+        limiter.observe(200, 0.01)
+    assert limiter.snapshot()['rate'] == 8
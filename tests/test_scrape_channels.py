@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import io
+
+import tiktok_counter
+from tiktok_counter import TikTokViewCounter
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, number, log):
+        self.number = number
+        self.log = log
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.log.append(('close', self.number))
+
+
+class FakePlaywright:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeScraper:
+    """
+    Kênh 'error' trả kết quả lỗi, 'crash' ném exception, 'closed' làm chết page
+    """
+
+    def __init__(self, log, state):
+        self.log = log
+        self.state = state
+
+    async def scrape_page(self, page, url):
+        self.state['active'] += 1
+        self.state['peak'] = max(self.state['peak'], self.state['active'])
+        try:
+            await asyncio.sleep(0.01)
+            self.log.append((url, page.context.number))
+            if url == 'error':
+                return {'error': 'boom', 'channel_url': url}
+            if url == 'crash':
+                raise RuntimeError('crash')
+            if url == 'closed':
+                page.closed = True
+            return {'channel_url': url, 'total_videos': 2}
+        finally:
+            self.state['active'] -= 1
+
+
+def make_counter(monkeypatch, log, state):
+    monkeypatch.setattr(tiktok_counter, 'async_playwright', FakePlaywright)
+    counter = TikTokViewCounter()
+    contexts = []
+
+    async def open_browser(p):
+        return object()
+
+    async def close_browser(browser):
+        log.append(('browser-closed',))
+
+    async def new_context(browser):
+        contexts.append(FakeContext(len(contexts) + 1, log))
+        return contexts[-1]
+
+    counter.open_browser = open_browser
+    counter.close_browser = close_browser
+    counter.new_context = new_context
+    counter._spawn = lambda: FakeScraper(log, state)
+    return counter, contexts
+
+
+def run(counter, urls, concurrency):
+    async def collect():
+        return [result async for result in counter.scrape_channels(urls, concurrency=concurrency)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(collect())
+
+
+def test_worker_recycles_context_after_error_crash_or_closed_page(monkeypatch):
+    log, state = [], {'active': 0, 'peak': 0}
+    counter, contexts = make_counter(monkeypatch, log, state)
+
+    results = run(counter, ['a', 'error', 'crash', 'closed', 'e', 'f'], concurrency=1)
+
+    assert [r['channel_url'] for r in results] == ['a', 'error', 'crash', 'closed', 'e', 'f']
+    assert 'crash' in results[2]['error']
+    # Kênh sau một kênh lỗi / crash / page đã đóng chạy trên context mới,
+    # kênh bình thường dùng lại context của slot
+    scraped = [entry for entry in log if entry[0] not in ('close', 'browser-closed')]
+    assert scraped == [('a', 1), ('error', 1), ('crash', 2), ('closed', 3), ('e', 4), ('f', 4)]
+    assert sorted(entry[1] for entry in log if entry[0] == 'close') == [1, 2, 3, 4]
+    assert log[-1] == ('browser-closed',)
+    assert counter.batch_stats['channels'] == 6
+    assert counter.batch_stats['failed'] == 2
+    assert counter.batch_stats['videos'] == 8
+
+
+def test_concurrency_bounds_contexts_and_in_flight_channels(monkeypatch):
+    log, state = [], {'active': 0, 'peak': 0}
+    counter, contexts = make_counter(monkeypatch, log, state)
+
+    results = run(counter, ['c%d' % i for i in range(7)], concurrency=3)
+
+    assert sorted(r['channel_url'] for r in results) == ['c%d' % i for i in range(7)]
+    assert state['peak'] == 3
+    # Mỗi slot giữ một context suốt lượt chạy và đóng nó khi xong
+    assert len(contexts) == 3
+    assert sorted(entry[1] for entry in log if entry[0] == 'close') == [1, 2, 3]
@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import io
+
+from conftest import load_fixture
+from selector_plans import SelectorPlanCache, learn_plan
+from tiktok_counter import BATCH_EXTRACT_JS, CAPTION_SELECTORS, VIDEO_SELECTORS, VIEW_SELECTORS, TikTokViewCounter
+
+TEXT_PLAN = {
+    'videoSelector': '[data-e2e="user-post-item"]',
+    'view': 'selector',
+    'viewSelector': 'strong[data-e2e="video-views"]',
+    'captionSelector': '[data-e2e="user-post-item-desc"]',
+}
+
+
+def evaluate(page, plan=None):
+    return asyncio.run(page.evaluate(BATCH_EXTRACT_JS, {
+        'videoSelectors': VIDEO_SELECTORS,
+        'viewSelectors': VIEW_SELECTORS,
+        'captionSelectors': CAPTION_SELECTORS,
+        'start': 0,
+        'limit': 500,
+        'plan': plan,
+        'auditEvery': 8,
+    }))
+
+
+def extract(counter, page):
+    counter.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(counter.extract_videos_batched(page))
+    return [(v.views, v.source) for v in counter.videos_data]
+
+
+def test_plan_keeps_exact_counts_on_mixed_precision_grid(node_page):
+    cards = load_fixture('mixed_precision_grid.json')['cards']
+    probed = evaluate(node_page(cards))
+    planned = evaluate(node_page(cards), TEXT_PLAN)
+
+    strip = lambda batch: [{k: v for k, v in item.items() if k != 'caption_selector'} for item in batch['items']]
+    assert strip(planned) == strip(probed)
+    exact = {i: item['views'] for i, item in enumerate(planned['items']) if item['views'] is not None}
+    assert exact == {1: 1234561, 5: 1234565, 14: 1234574, 17: 1234577, 20: 1234580}
+    assert planned['planStale'] == 0
+
+
+def test_learned_and_cached_plan_match_full_probe(node_page, tmp_path):
+    cards = load_fixture('mixed_precision_grid.json')['cards']
+    reference = extract(TikTokViewCounter(), node_page(cards))
+
+    path = str(tmp_path / 'plans.json')
+    learned = TikTokViewCounter(selector_plans=path)
+    assert extract(learned, node_page(cards)) == reference
+    assert learned.plan_source == 'learned'
+
+    cached = TikTokViewCounter(selector_plans=path)
+    assert extract(cached, node_page(cards)) == reference
+    assert cached.plan_source == 'cache'
+    assert cached.plan_hits > cached.plan_misses
+
+
+def test_learn_plan_needs_dominant_strategy():
+    text = 'text-strong[data-e2e="video-views"]'
+    caption = '[data-e2e="user-post-item-desc"]'
+    assert learn_plan('[data-e2e="user-post-item"]', [(text, caption)] * 10 + [('aria-label', caption)] * 2) == TEXT_PLAN
+    assert learn_plan('[data-e2e="user-post-item"]', [(text, None), ('aria-label', None), ('title-attribute', None)] * 4) is None
+
+
+def test_plan_cache_merges_writes(tmp_path):
+    path = str(tmp_path / 'plans.json')
+    first, second = SelectorPlanCache(path), SelectorPlanCache(path)
+    first.put('a', TEXT_PLAN)
+    second.put('b', None)
+    second.drop('missing')
+
+    reloaded = SelectorPlanCache(path)
+    assert reloaded.get('a') == TEXT_PLAN
+    assert reloaded.known('b') and reloaded.get('b') is None
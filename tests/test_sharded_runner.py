@@ -0,0 +1,43 @@
+import sharded_runner
+from metrics import Metrics
+from sharded_runner import ShardedRunner
+
+
+def fake_worker(conn, counter_kwargs, db_path, pages_per_worker, max_rss, verbose, rate_limiter=None,
+                collect_metrics=False):
+    """
+    Worker giả nói đúng giao thức pipe của _worker_loop (không cần browser)
+    """
+    pages = 0
+    while True:
+        url = conn.recv()
+        if url is None:
+            break
+        pages += 1
+        message = {'result': {'channel_url': url, 'total_videos': 2}, 'rss': 1024, 'pages': pages,
+                   'recycle': pages >= pages_per_worker}
+        if collect_metrics:
+            metrics = Metrics()
+            metrics.count('cdp_calls', 3)
+            metrics.observe('scroll', 0.5)
+            metrics.record('view_source', 'aria-label', 2)
+            message['metrics'] = metrics.to_dict()
+        conn.send(message)
+        if message['recycle']:
+            break
+
+
+def test_worker_metrics_are_merged_and_workers_recycled(monkeypatch):
+    monkeypatch.setattr(sharded_runner, '_worker_main', fake_worker)
+    metrics = Metrics()
+    runner = ShardedRunner(workers=2, pages_per_worker=2, max_rss_mb=None, metrics=metrics)
+
+    urls = [f'https://www.tiktok.com/@c{i}' for i in range(5)]
+    results = list(runner.run(urls))
+
+    assert sorted(r['channel_url'] for r in results) == urls
+    assert runner.stats['videos'] == 10 and runner.stats['recycled'] >= 2
+    merged = metrics.to_dict()
+    assert merged['counters']['cdp_calls'] == 15
+    assert merged['phases']['scroll']['count'] == 5
+    assert merged['labeled']['view_source'] == {'aria-label': 10}
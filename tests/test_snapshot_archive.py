@@ -0,0 +1,60 @@
+from snapshot_archive import SnapshotArchive
+
+CHANNEL = 'https://www.tiktok.com/@archive'
+
+
+def result(views, scraped_at):
+    return {
+        'channel_url': CHANNEL,
+        'scraped_at': scraped_at,
+        'videos': [{'link': f'/@archive/video/{700 + i}', 'views': v, 'caption': ''} for i, v in enumerate(views)],
+    }
+
+
+def test_index_is_cached_between_reads_and_refreshed_by_append(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.append_snapshot(result([10, 20], '2026-01-01T00:00:00'))
+
+    assert list(archive.column('views')) == [10, 20]
+    index = archive._snapshot_index()
+    archive.column('video_id')
+    assert archive._snapshot_index() is index
+
+    archive.append_snapshot(result([15, 30, 5], '2026-01-02T00:00:00'))
+    assert list(archive.column('views')) == [10, 20, 15, 30, 5]
+    assert archive.committed_rows() == 5
+    assert archive.video_history(701) == [(archive.snapshots()[0]['ts'], 20), (archive.snapshots()[1]['ts'], 30)]
+    archive.close()
+
+    reopened = SnapshotArchive(str(tmp_path))
+    assert [s['total_views'] for s in reopened.snapshots()] == [30, 50]
+    reopened.close()
+
+
+def channel_result(channel, ids, views, scraped_at):
+    return {
+        'channel_url': f'https://www.tiktok.com/@{channel}',
+        'scraped_at': scraped_at,
+        'videos': [{'link': f'/@{channel}/video/{i}', 'views': v, 'caption': ''} for i, v in zip(ids, views)],
+    }
+
+
+def test_video_history_and_growth_use_channel_snapshots_only(tmp_path):
+    # ID giả có 8 byte trùng với nửa sau của a + nửa đầu của b (khớp lệch biên)
+    a, b = 0x1111111122222222, 0x3333333344444444
+    shifted = int.from_bytes(a.to_bytes(8, 'little')[4:] + b.to_bytes(8, 'little')[:4], 'little')
+
+    archive = SnapshotArchive(str(tmp_path))
+    archive.append_snapshot(channel_result('one', [a, b], [1, 2], '2026-01-01T00:00:00'))
+    archive.append_snapshot(channel_result('two', [shifted, 900], [10, 20], '2026-01-01T01:00:00'))
+    archive.append_snapshot(channel_result('one', [b, a], [3, 4], '2026-01-01T02:00:00'))
+    archive.append_snapshot(channel_result('two', [900, shifted], [25, 40], '2026-01-01T03:00:00'))
+
+    ts = [s['ts'] for s in archive.snapshots()]
+    assert archive.video_history(shifted) == [(ts[1], 10), (ts[3], 40)]
+    assert archive.video_history(a) == [(ts[0], 1), (ts[2], 4)]
+    assert archive.video_history(12345) == []
+
+    rates = archive.growth_rates('two')
+    assert rates == {shifted: 30 / 2, 900: 5 / 2}
+    archive.close()
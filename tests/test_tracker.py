@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import io
+import json
+
+import tracker
+from tiktok_counter import TikTokViewCounter
+from tracker import ChannelTracker
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+class FakePage:
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self, browser, log):
+        self.browser = browser
+        self.log = log
+        log.append('context')
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.log.append('close')
+
+
+class FakePlaywright:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeScraper:
+    """
+    Mỗi lần scrape view của kênh tăng theo growth[url]; kênh 'broken' luôn lỗi
+    """
+
+    def __init__(self, views, growth):
+        self.views = views
+        self.growth = growth
+
+    async def scrape_page(self, page, url):
+        await asyncio.sleep(0.01)
+        if url.endswith('broken'):
+            raise RuntimeError('boom')
+        self.views[url] += self.growth[url]
+        return {'channel_url': url, 'total_videos': 3, 'total_views': self.views[url],
+                'total_views_formatted': str(self.views[url])}
+
+
+def test_next_interval_follows_view_velocity():
+    daemon = ChannelTracker(TikTokViewCounter(), ['fast', 'mid', 'slow', 'flat', 'new'],
+                            interval=3600, min_interval=600, max_interval=14400)
+    velocities = {'fast': 4000, 'mid': 1000, 'slow': 100, 'flat': 0, 'new': None}
+    for url, velocity in velocities.items():
+        daemon.channels[url].velocity = velocity
+
+    intervals = {url: daemon.next_interval(daemon.channels[url]) for url in velocities}
+    # Trung vị tốc độ (các kênh > 0) là 1000 views/giờ -> interval mặc định
+    assert intervals['mid'] == 3600
+    assert intervals['fast'] == 900
+    # Bị chặn trong [min_interval, max_interval]
+    assert intervals['slow'] == 14400
+    assert intervals['flat'] == 14400
+    assert intervals['new'] == 3600
+
+
+def test_record_result_measures_velocity_and_failures(monkeypatch):
+    daemon = ChannelTracker(TikTokViewCounter(), ['a'])
+    state = daemon.channels['a']
+    clock = [100.0]
+    monkeypatch.setattr(tracker.time, 'monotonic', lambda: clock[0])
+
+    daemon._record_result(state, {'total_videos': 2, 'total_views': 5000}, 1.0)
+    assert state.velocity is None
+    clock[0] += 1800
+    daemon._record_result(state, {'total_videos': 2, 'total_views': 6000}, 2.0)
+    assert state.velocity == 2000
+    daemon._record_result(state, {'error': 'boom'}, 0.5)
+    assert (state.runs, state.failures, state.last_error) == (3, 1, 'boom')
+    assert state.velocity == 2000
+    assert daemon.stats['videos'] == 4
+
+
+def test_daemon_scrapes_on_schedule_and_serves_status(monkeypatch):
+    monkeypatch.setattr(tracker, 'async_playwright', FakePlaywright)
+    monkeypatch.setattr(tracker.random, 'uniform', lambda a, b: 1.0)
+    urls = ['https://www.tiktok.com/@hot', 'https://www.tiktok.com/@cold', 'https://www.tiktok.com/@broken']
+    views = dict.fromkeys(urls, 0)
+    growth = {urls[0]: 1000, urls[1]: 10, urls[2]: 0}
+    log = []
+
+    counter = TikTokViewCounter()
+    browsers = []
+
+    async def open_browser(p):
+        browsers.append(FakeBrowser())
+        return browsers[-1]
+
+    async def close_browser(browser):
+        log.append('browser-closed')
+
+    async def new_context(browser):
+        return FakeContext(browser, log)
+
+    counter.open_browser = open_browser
+    counter.close_browser = close_browser
+    counter.new_context = new_context
+    counter._spawn = lambda: FakeScraper(views, growth)
+
+    async def run():
+        daemon = ChannelTracker(counter, urls, interval=0.2, min_interval=0.05, max_interval=0.8,
+                                jitter=0, max_pages=2)
+        server = await daemon.start_status_server(0)
+        port = server.sockets[0].getsockname()[1]
+        task = asyncio.ensure_future(daemon.run())
+        await asyncio.sleep(1.2)
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /status HTTP/1.1\r\nHost: x\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+
+        daemon.stop()
+        await task
+        return daemon, response
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        daemon, response = asyncio.run(run())
+
+    head, body = response.split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    status = json.loads(body)
+    channels = {c['channel_url']: c for c in status['channels']}
+    hot, cold, broken = (daemon.channels[url] for url in urls)
+
+    # Kênh tăng nhanh được refresh thường xuyên hơn kênh gần như đứng yên
+    assert hot.interval < cold.interval
+    assert hot.runs > cold.runs >= 2
+    # Kênh lỗi được thử lại sau min_interval, context của slot bị thay
+    assert broken.failures == broken.runs >= 2
+    assert broken.interval == 0.05
+    assert channels[urls[2]]['last_error'] == 'boom'
+    assert status['runs'] >= 6
+    assert status['failed'] >= 2
+    assert status['max_pages'] == 2
+    assert len(browsers) == 1
+    assert log.count('context') == log.count('close')
+    assert log[-1] == 'browser-closed'
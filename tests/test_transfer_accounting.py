@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import io
+
+import tiktok_counter
+from metrics import Metrics
+from tiktok_counter import TikTokViewCounter
+
+
+class Request:
+    def __init__(self, size):
+        self.size = size
+
+    async def sizes(self):
+        if self.size is None:
+            await asyncio.sleep(60)  # media đang stream: không bao giờ xong
+        return {'responseBodySize': self.size}
+
+
+class Response:
+    url = 'https://example.com/asset'
+
+    def __init__(self, headers, size=None):
+        self.headers = headers
+        self.request = Request(size)
+
+
+class FailingPage:
+    """
+    Page nhận vài response (1 chunked đang stream) rồi goto lỗi
+    """
+
+    def __init__(self):
+        self.handler = None
+
+    def on(self, event, handler):
+        self.handler = handler
+
+    def remove_listener(self, event, handler):
+        self.handler = None
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def unroute(self, pattern, handler):
+        pass
+
+    async def goto(self, url, **kwargs):
+        self.handler(Response({'content-length': '100'}))
+        self.handler(Response({}))
+        raise RuntimeError('net::ERR_CONNECTION_RESET')
+
+
+def test_transfer_is_not_measured_without_block_or_metrics():
+    counter = TikTokViewCounter()
+    counter.reset()
+    counter._on_response(Response({}, 500))
+    assert not counter.measures_transfer and counter._pending_sizes == []
+    assert 'transferred_bytes' not in counter._build_result('u', 'n')
+
+
+def test_chunked_responses_are_measured_with_metrics():
+    async def main():
+        counter = TikTokViewCounter(metrics=Metrics())
+        counter.reset()
+        counter._on_response(Response({'content-length': '100'}))
+        counter._on_response(Response({}, 250))
+        await counter._collect_transfer_sizes()
+        return counter
+
+    counter = asyncio.run(main())
+    assert counter.transferred_bytes == 350 and counter.unmeasured_responses == 0
+
+
+def test_pending_measurements_are_cancelled_when_scrape_fails(monkeypatch):
+    monkeypatch.setattr(tiktok_counter, 'PHASE_RETRY_DELAY', 0)
+
+    async def main():
+        counter = TikTokViewCounter(block=['media'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await counter.scrape_page(FailingPage(), 'https://www.tiktok.com/@fail')
+        leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return counter, result, leftover
+
+    counter, result, leftover = asyncio.run(main())
+    assert 'error' in result
+    assert counter._pending_sizes == [] and counter.unmeasured_responses >= 1
+    assert all(task.done() or task.cancelling() for task in leftover)
@@ -0,0 +1,37 @@
+import json
+
+from video_records import VideoList, VideoRecord, summarize_videos, video_to_json
+
+
+def record(**details):
+    return VideoRecord(1, 1200, '1.2K', 'text-strong', '/@a/video/1', 'caption', **details)
+
+
+def test_record_reads_like_a_mapping():
+    video = record(likes=7)
+    assert 'views' in video and 'likes' in video
+    assert 'shares' not in video and 0 not in video
+    assert list(video) == ['index', 'views', 'view_text', 'source', 'link', 'caption', 'likes']
+    assert dict(video) == video.to_dict()
+    assert {**video}['source'] == 'text-strong'
+
+
+def test_video_list_serializes_with_default_or_to_dicts():
+    result = {'total_videos': 1, 'videos': VideoList([record()])}
+    expected = json.dumps({'total_videos': 1, 'videos': result['videos'].to_dicts()})
+    assert json.dumps(result, default=video_to_json) == expected
+
+
+def test_summary_of_records_matches_dict_path():
+    views = [5, 0, 9, 9, 3, 0, 12, 9, 1, 7, 7, 2]
+    sources = ['aria-label', 'text-strong', 'api-item-list']
+    records = VideoList(VideoRecord(i + 1, v, str(v), sources[i % 3], f'/@a/video/{i}', '')
+                        for i, v in enumerate(views))
+
+    fast = summarize_videos(records, 4)
+    slow = summarize_videos([video.to_dict() for video in records], 4)
+    assert fast[0] == slow[0] == {'aria-label': 4, 'text-strong': 4, 'api-item-list': 4}
+    assert fast[1] == slow[1] == 10
+    # Trùng view: video đứng trước được giữ
+    assert [v.link for v in fast[2]] == [v['link'] for v in slow[2]] == \
+        ['/@a/video/6', '/@a/video/2', '/@a/video/3', '/@a/video/7']
@@ -5,305 +5,2267 @@ Cải thiện độ chính xác khi parse view count
 """
 
 import asyncio
+import collections
+import copy
 import json
+import os
 import re
-from typing import Dict, List, Optional
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 from playwright.async_api import async_playwright
 import argparse
 from datetime import datetime
+import browser_server
+from checkpoint import CHECKPOINT_EVERY, DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from fast_path import HttpError, HttpPool, extract_rehydration, parse_profile_state, parse_video_state
+from metrics import NULL_METRICS, Metrics
+from rate_limiter import THROTTLE_STATUSES, AdaptiveRateLimiter, ThrottledError, parse_retry_after
+from selector_plans import (
+    DEFAULT_PLAN_FILE, PLAN_AUDIT_EVERY, PLAN_MIN_HIT_RATE, PLAN_SAMPLE, SelectorPlanCache, learn_plan,
+    page_fingerprint
+)
+from sharded_runner import ShardedRunner
+from snapshot_archive import SnapshotArchive
+from tracker import ChannelTracker
+from video_records import VideoList, VideoRecord, summarize_videos, video_to_json
+from video_store import VideoStore, channel_key
+
+# Hậu tố rút gọn của view count theo locale -> hệ số nhân
+# (so khớp không phân biệt hoa thường; hậu tố dài được thử trước)
+COUNT_SUFFIXES = {
+    # English
+    'k': 1000,
+    'm': 1000000,
+    'b': 1000000000,
+    # Tiếng Việt: "12,3 N" (nghìn), "1,2 Tr" (triệu), "1,1 T" (tỷ)
+    'n': 1000,
+    'nghìn': 1000,
+    'ngàn': 1000,
+    'tr': 1000000,
+    'triệu': 1000000,
+    't': 1000000000,
+    'tỷ': 1000000000,
+    'tỉ': 1000000000,
+    # CJK: 千 = 10^3, 万/萬/만 = 10^4, 億/亿/억 = 10^8
+    '千': 1000,
+    '천': 1000,
+    '万': 10000,
+    '萬': 10000,
+    '만': 10000,
+    '億': 100000000,
+    '亿': 100000000,
+    '억': 100000000,
+}
+
+# Số (có thể có dấu phân cách . , hoặc khoảng trắng) + hậu tố tùy chọn.
+# Hậu tố Latin phải đứng riêng ("1.2M views" khớp, "12 thousand" thì không);
+# hậu tố CJK có thể dính chữ phía sau ("1.2万次观看").
+COUNT_RE = re.compile(
+    r'(?P<num>\d+(?:[.,\u00a0\u202f ]\d+)*)\s*(?:(?P<suffix>'
+    + '|'.join(re.escape(s) for s in sorted(COUNT_SUFFIXES, key=len, reverse=True))
+    + r')(?![a-z\u00c0-\u024f\u1e00-\u1eff]))?',
+    re.IGNORECASE
+)
+NON_DIGIT_RE = re.compile(r'\D')
+
+
+def _split_decimal(num: str) -> tuple:
+    """
+    Tách phần nguyên / phần thập phân của số đứng trước hậu tố.
+    Một dấu . hoặc , duy nhất luôn là dấu thập phân ("1.234M", "1,2 Tr");
+    nhiều dấu thì dấu cuối là thập phân nếu khác loại các dấu trước
+    ("1,234.5K", "1.234,5K"), còn lại đều là phân cách hàng nghìn.
+    Returns: (chữ số phần nguyên, chữ số phần thập phân hoặc '')
+    """
+    separators = [i for i, char in enumerate(num) if char in '.,']
+    if separators:
+        last = separators[-1]
+        if len(separators) == 1 or any(num[i] != num[last] for i in separators[:-1]):
+            return NON_DIGIT_RE.sub('', num[:last]), NON_DIGIT_RE.sub('', num[last + 1:])
+    return NON_DIGIT_RE.sub('', num), ''
+
+
+@lru_cache(maxsize=65536)
+def parse_count(text: str) -> int:
+    """
+    Chuyển đổi string view count thành số, hỗ trợ nhiều locale
+    
+    Ví dụ: "1.2M" -> 1200000, "1,2 Tr" -> 1200000, "1.2万" -> 12000, "5,234" -> 5234
+    
+    Có hậu tố: một dấu . hoặc , duy nhất là dấu thập phân ("1,2 Tr", "1.234M"),
+    xem _split_decimal.
+    Không có hậu tố: bỏ mọi ký tự không phải số. Kết quả được cache (LRU) vì
+    cùng một chuỗi hiển thị lặp lại rất nhiều.
+    """
+    if not text:
+        return 0
+    
+    match = COUNT_RE.search(text)
+    if not match:
+        return 0
+    
+    num = match.group('num')
+    suffix = match.group('suffix')
+    if not suffix:
+        return int(NON_DIGIT_RE.sub('', num))
+    
+    multiplier = COUNT_SUFFIXES[suffix.lower()]
+    integer, fraction = _split_decimal(num)
+    
+    value = int(integer) * multiplier
+    if fraction:
+        # Làm tròn đúng cách thay vì cắt bỏ phần lẻ
+        value += round(int(fraction) * multiplier / 10 ** len(fraction))
+    return value
+
+
+def count_rounding_error(text: str) -> int:
+    """
+    Sai số tối đa của view count hiển thị rút gọn (nửa đơn vị của chữ số cuối)
+    
+    Ví dụ: "1.2M" -> 50000, "523K" -> 500, "1,2 Tr" -> 50000, "5,234" -> 0
+    """
+    match = COUNT_RE.search(text or '')
+    if not match or not match.group('suffix'):
+        return 0
+    
+    num = match.group('num')
+    multiplier = COUNT_SUFFIXES[match.group('suffix').lower()]
+    decimals = len(_split_decimal(num)[1])
+    return multiplier // (2 * 10 ** decimals)
+
+
+def parse_counts(texts: Iterable[str]) -> array:
+    """
+    Parse hàng loạt view count (ví dụ view_text của dữ liệu đã lưu)
+    Returns: array('q') cùng thứ tự với đầu vào
+    """
+    return array('q', map(parse_count, texts))
+
+
+# Selector cho từng video item trong grid của trang kênh (thử theo thứ tự)
+VIDEO_SELECTORS = [
+    '[data-e2e="user-post-item"]',
+    '[data-e2e="user-post-item-list"] > div',
+    '.video-feed-item',
+    'div[data-e2e="user-post-item-list"] div'
+]
+
+# Selector cho view count bên trong mỗi video item (chiến lược 3)
+VIEW_SELECTORS = [
+    'strong[data-e2e="video-views"]',
+    'strong',
+    '[data-e2e="video-views"]',
+    '.video-count',
+    'span[title*="views"]'
+]
+
+# Selector cho caption bên trong mỗi video item
+CAPTION_SELECTORS = [
+    '[data-e2e="user-post-item-desc"]',
+    '.video-meta-caption',
+    'div[data-e2e="user-post-item-desc"]'
+]
+
+# Script chạy trong page: đọc aria-label, title, text, href, caption cho một
+# đoạn [start, start + limit) của danh sách video chỉ trong 1 round-trip.
+# Thứ tự fallback giống hệt get_exact_view_count: aria-label -> title -> text.
+# Text thô được trả về để Python parse bằng parse_view_count.
+# args.plan (selector_plans): selector video / view selector / caption selector đã
+# học được query trước, aria-label và title vẫn luôn được thử trước text nên view
+# chính xác không bao giờ bị thay bằng số làm tròn. Cứ args.auditEvery item lại dò
+# đầy đủ một item: view selector đứng trước plan khớp thì bỏ plan cho phần còn lại
+# của batch (planStale). args.learn: trả thêm caption selector đã trúng.
+BATCH_EXTRACT_JS = """
+(args) => {
+    const started = performance.now();
+    let selector = null;
+    let elements = [];
+    for (const sel of args.videoSelectors) {
+        try {
+            const found = document.querySelectorAll(sel);
+            if (found.length > 0) {
+                selector = sel;
+                elements = found;
+                break;
+            }
+        } catch (e) {}
+    }
+
+    const discoveryMs = performance.now() - started;
+
+    // Chế độ streaming/checkpoint: chỉ đọc node chưa đánh dấu, rồi đánh dấu lại
+    const total = elements.length;
+    const mark = args.mark || 'data-tvc-seen';
+    if (args.onlyNew) {
+        elements = Array.from(elements).filter(el => !el.hasAttribute(mark));
+    }
+
+    // Chiến lược 1: aria-label
+    const readAria = (el, item) => {
+        const aria = el.getAttribute('aria-label');
+        const ariaMatch = aria ? aria.match(/(\\d[\\d,]*)\\s*view/i) : null;
+        if (!ariaMatch) return false;
+        item.views = parseInt(ariaMatch[1].replace(/,/g, ''), 10);
+        item.view_text = ariaMatch[1];
+        item.source = 'aria-label';
+        return true;
+    };
+
+    // Chiến lược 2: title của strong[data-e2e="video-views"]
+    const readTitle = (el, item) => {
+        const strong = el.querySelector('strong[data-e2e="video-views"]');
+        const title = strong ? strong.getAttribute('title') : null;
+        if (!title || !/\\d/.test(title)) return false;
+        item.views = parseInt(title.replace(/\\D/g, ''), 10);
+        item.view_text = title;
+        item.source = 'title-attribute';
+        return true;
+    };
+
+    // Chiến lược 3: title hoặc text của một view selector
+    const readSelector = (el, item, sel) => {
+        let viewEl = null;
+        try { viewEl = el.querySelector(sel); } catch (e) { return false; }
+        if (!viewEl) return false;
+        const title = viewEl.getAttribute('title');
+        if (title && title.trim() && /\\d/.test(title)) {
+            item.views = parseInt(title.replace(/\\D/g, ''), 10);
+            item.view_text = title;
+            item.source = 'title-' + sel;
+            return true;
+        }
+        const text = viewEl.textContent;
+        if (text && text.trim()) {
+            item.raw_text = text.trim();
+            item.view_text = item.raw_text;
+            item.source = 'text-' + sel;
+            return true;
+        }
+        return false;
+    };
+
+    const readCaption = (el, sel) => {
+        let capEl = null;
+        try { capEl = el.querySelector(sel); } catch (e) { return null; }
+        return capEl && capEl.textContent ? capEl.textContent : null;
+    };
+
+    // Thứ hạng của chiến lược trong chuỗi fallback (nhỏ = được thử trước, chính xác hơn)
+    const rankOf = (view, sel) => view === 'aria' ? 0 : view === 'title' ? 1 : 2 + args.viewSelectors.indexOf(sel);
+    const sourceRank = (source) => {
+        if (source === 'aria-label') return 0;
+        if (source === 'title-attribute') return 1;
+        const sel = source.replace(/^(title|text)-/, '');
+        return sel === source ? Infinity : rankOf('selector', sel);
+    };
+
+    let plan = args.plan || null;
+    const plannedRank = plan ? rankOf(plan.view, plan.viewSelector) : 0;
+    let planHits = 0;
+    let planMisses = 0;
+    let planStale = 0;
+
+    const items = [];
+    const end = Math.min(elements.length, args.start + args.limit);
+    for (let i = args.start; i < end; i++) {
+        const el = elements[i];
+        const item = {
+            views: null, view_text: '0', source: 'unknown', raw_text: null,
+            link: '', caption: ''
+        };
+
+        // aria-label và title (số chính xác) luôn được thử trước; plan chỉ chọn
+        // view selector được query đầu tiên khi phải đọc tới chiến lược 3
+        const audit = plan && args.auditEvery && i % args.auditEvery === 0;
+        const planned = plan && !audit && plan.view === 'selector' ? plan.viewSelector : null;
+        if (!readAria(el, item) && !readTitle(el, item)
+                && !(planned && readSelector(el, item, planned))) {
+            for (const sel of args.viewSelectors) {
+                if (readSelector(el, item, sel)) break;
+            }
+        }
+        if (plan && !(plan.view === 'selector' && sourceRank(item.source) < 2)) {
+            // Item đọc được từ aria-label/title trước khi tới view selector: không tính vào plan
+            const rank = sourceRank(item.source);
+            if (rank === plannedRank) {
+                planHits++;
+            } else {
+                planMisses++;
+                if (audit && rank >= 2 && rank < plannedRank) {
+                    // Một view selector đứng trước plan trong chuỗi fallback lại khớp:
+                    // dò đầy đủ phần còn lại của batch
+                    planStale++;
+                    plan = null;
+                }
+            }
+        }
+
+        const link = el.querySelector('a');
+        item.link = link ? (link.getAttribute('href') || '') : '';
+
+        let captionSelector = null;
+        let caption = plan && plan.captionSelector ? readCaption(el, plan.captionSelector) : null;
+        if (caption !== null) {
+            captionSelector = plan.captionSelector;
+        } else {
+            for (const sel of args.captionSelectors) {
+                caption = readCaption(el, sel);
+                if (caption !== null) {
+                    captionSelector = sel;
+                    break;
+                }
+            }
+        }
+        item.caption = caption || '';
+        if (args.learn) item.caption_selector = captionSelector;
+
+        if (args.onlyNew) el.setAttribute(mark, '1');
+        items.push(item);
+    }
+
+    return {
+        selector: selector, total: total, items: items,
+        planHits: planHits, planMisses: planMisses, planStale: planStale,
+        discoveryMs: discoveryMs, extractMs: performance.now() - started - discoveryMs
+    };
+}
+"""
+
+# JSON state của trang video (số liệu chính xác: playCount, diggCount, ...)
+VIDEO_STATE_JS = """
+() => {
+    for (const id of ['__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE']) {
+        const el = document.getElementById(id);
+        if (el && el.textContent) return el.textContent;
+    }
+    return null;
+}
+"""
+
+# Các API mà trang kênh gọi để lấy danh sách video (JSON có playCount chính xác)
+ITEM_LIST_URL_PATTERNS = [
+    '/api/post/item_list',
+    '/api/creator/item_list',
+]
+
+VIDEO_ID_RE = re.compile(r'/video/(\d+)')
+
+# Trạng thái grid sau mỗi bước scroll: số video, link của video cuối cùng
+# và link của args.tail video cuối (dùng cho chế độ incremental)
+SCROLL_STATE_JS = """
+(args) => {
+    const hrefOf = (el) => {
+        const link = el.querySelector('a');
+        return link ? (link.getAttribute('href') || '') : '';
+    };
+    for (const sel of args.selectors) {
+        try {
+            const found = document.querySelectorAll(sel);
+            if (found.length > 0) {
+                const tail = [];
+                for (let i = Math.max(0, found.length - args.tail); i < found.length; i++) {
+                    tail.push(hrefOf(found[i]));
+                }
+                return {count: found.length, lastLink: hrefOf(found[found.length - 1]), tailLinks: tail,
+                        scrollY: Math.round(window.scrollY)};
+            }
+        } catch (e) {}
+    }
+    return {count: 0, lastLink: '', tailLinks: [], scrollY: Math.round(window.scrollY)};
+}
+"""
+
+# Điều kiện cho page.wait_for_function: số video đã tăng so với args.count
+ITEMS_GREW_JS = """
+(args) => {
+    for (const sel of args.selectors) {
+        try {
+            const n = document.querySelectorAll(sel).length;
+            if (n > 0) return n > args.count;
+        } catch (e) {}
+    }
+    return false;
+}
+"""
+
+# Chữ ký cấu trúc của thẻ video đầu tiên cho selector_plans: host, đường dẫn
+# tổ tiên và tag/data-e2e/tên thuộc tính (không lấy giá trị) của các node trong
+# thẻ. Thẻ = tổ tiên cao nhất của link video đầu tiên chưa chứa link video khác.
+PAGE_FINGERPRINT_JS = """
+() => {
+    const link = document.querySelector('a[href*="/video/"]');
+    if (!link) return null;
+    // Giá trị class (băm theo bản build), href, id... khác nhau giữa các kênh: bỏ qua
+    const ignored = new Set(['class', 'style', 'href', 'id', 'src', 'alt', 'data-e2e']);
+    const describe = (el) => {
+        const e2e = el.getAttribute('data-e2e');
+        return el.tagName.toLowerCase() + (e2e ? '[' + e2e + ']' : '');
+    };
+    const withAttributes = (el) => {
+        const names = el.getAttributeNames().filter(n => !ignored.has(n) && !n.startsWith('data-tvc'));
+        return describe(el) + (names.length ? '{' + names.sort().join(',') + '}' : '');
+    };
+
+    let card = link;
+    for (let depth = 0; depth < 8 && card.parentElement && card.parentElement !== document.body; depth++) {
+        if (card.parentElement.querySelectorAll('a[href*="/video/"]').length > 1) break;
+        card = card.parentElement;
+    }
+
+    const path = [];
+    for (let el = card.parentElement; el && el !== document.body && path.length < 4; el = el.parentElement) {
+        path.push(describe(el));
+    }
+    const nodes = new Set([withAttributes(card)]);
+    const inner = card.querySelectorAll('*');
+    for (let i = 0; i < inner.length && i < 50; i++) nodes.add(withAttributes(inner[i]));
+    return location.host + '|' + path.reverse().join('>') + '|' + Array.from(nodes).sort().join(';');
+}
+"""
+
+# Nhóm request có thể chặn bằng --block (theo resource type của Playwright)
+BLOCK_RESOURCE_TYPES = {
+    'media': {'media'},
+    'image': {'image'},
+    'font': {'font'},
+    'stylesheet': {'stylesheet'},
+}
+
+# Nhóm 'analytics' chặn theo URL (tracking/log/monitor), kể cả script và XHR
+ANALYTICS_URL_PATTERNS = [
+    '/monitor_browser/',
+    '/web/report',
+    'mon.tiktokv.com',
+    'mcs.tiktokw.com',
+    'analytics.tiktok.com',
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'sentry',
+]
+
+BLOCK_CATEGORIES = sorted(set(BLOCK_RESOURCE_TYPES) | {'analytics'})
+
+# Dung lượng GIẢ ĐỊNH của một request bị chặn, theo nhóm. Request bị abort trước
+# khi có response nên không đo được: chỉ dùng cho con số ước lượng thô trong báo cáo
+# (số đo thật là transferred_bytes, xem benchmark --block)
+ROUGH_BLOCKED_BYTES_PER_REQUEST = {
+    'media': 1500000,
+    'image': 60000,
+    'font': 40000,
+    'stylesheet': 30000,
+    'analytics': 5000,
+}
+
+FIRST_ITEM_TIMEOUT = 15000  # ms đợi video đầu tiên xuất hiện sau goto
+SCROLL_IDLE_ROUNDS = 2      # Số lần liên tiếp không có video mới thì dừng scroll
+MAX_SCROLL_STEPS = 500      # Giới hạn an toàn cho vòng scroll
+PHASE_RETRIES = 2           # Số lần chạy lại một phase lỗi trên cùng page
+PHASE_RETRY_DELAY = 2       # giây, tăng dần theo số lần thử
+ENRICH_TABS = 4             # Số tab dùng lại để mở trang video khi enrich
+ENRICH_THROTTLE_RETRIES = 1 # Số lần mở lại trang video bị 429/5xx (sau khi rate controller giảm tốc)
+TRANSFER_SIZE_TIMEOUT = 2   # giây đợi đo nốt dung lượng response không có content-length
+
+# Flag Chromium tránh detection (dùng cho cả browser thường và browser server)
+CHROMIUM_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+]
+
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+
+
+def video_id_from_link(link: str) -> Optional[str]:
+    """
+    Lấy video ID từ link (.../video/7300000000000000000 -> "7300000000000000000")
+    """
+    match = VIDEO_ID_RE.search(link or '')
+    return match.group(1) if match else None
+
+
+def video_timestamp(video_id: str) -> Optional[datetime]:
+    """
+    Thời điểm đăng video, suy ra từ ID (32 bit cao là unix timestamp)
+    """
+    try:
+        return datetime.fromtimestamp(int(video_id) >> 32)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
 
 class TikTokViewCounter:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, batch_size: int = 500, intercept: bool = False,
+                 max_videos: Optional[int] = None, since: Optional[datetime] = None,
+                 scroll_idle_timeout: int = 2000, store: Optional[VideoStore] = None,
+                 incremental_depth: int = 0, block: Optional[List[str]] = None,
+                 metrics: Optional[Metrics] = None, fast_path: bool = False,
+                 connect: Optional[str] = None, storage_state: Optional[str] = None,
+                 checkpoint_dir: Optional[str] = None, resume: bool = False,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 enrich: Optional[int] = None, enrich_tabs: int = ENRICH_TABS,
+                 selector_plans: Optional[str] = None):
         self.headless = headless
+        self.batch_size = batch_size  # Số video đọc trong mỗi lần page.evaluate
+        self.intercept = intercept  # Đọc view chính xác từ response item_list
+        self.max_videos = max_videos  # Dừng scroll khi đã load đủ số video
+        self.since = since  # Dừng scroll khi gặp video đăng trước mốc này
+        self.scroll_idle_timeout = scroll_idle_timeout  # ms đợi tối đa mỗi bước scroll
+        self.store = store  # VideoStore lưu view mới nhất của từng video
+        # Incremental: dừng scroll khi gặp liên tiếp N video đã có trong store
+        self.incremental_depth = incremental_depth if store else 0
+        # Các nhóm request bị chặn khi scrape (media, image, font, stylesheet, analytics)
+        self.block = set(block or [])
+        unknown = self.block - set(BLOCK_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Nhóm block không hợp lệ: {', '.join(sorted(unknown))} "
+                             f"(hỗ trợ: {', '.join(BLOCK_CATEGORIES)})")
+        # Đo thời gian từng phase + đếm CDP call (NULL_METRICS: không tốn chi phí)
+        self.metrics = metrics or NULL_METRICS
+        # Thử đọc JSON rehydration qua HTTP trước, chỉ mở browser khi thiếu/không đủ
+        self.fast_path = fast_path
+        self.connect = connect  # Websocket endpoint của browser server (None = tự launch)
+        self.storage_state = storage_state  # File cookie/localStorage nạp vào context mới
+        # Checkpoint video đã extract + vị trí scroll (None = tắt)
+        self.checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        self.resume = resume  # Tiếp tục từ checkpoint của lần chạy trước
+        # Rate controller dùng chung cho goto/scroll/HTTP của mọi page (None = không giới hạn)
+        self.rate_limiter = rate_limiter
+        # Mở trang video của các video có view làm tròn/thiếu để lấy số chính xác
+        # (None = tắt, 0 = mọi video cần enrich, N = tối đa N trang)
+        self.enrich = enrich
+        self.enrich_tabs = max(1, enrich_tabs)
+        # Plan selector đã học theo cấu trúc trang, lưu giữa các lần chạy (None = tắt)
+        self.plans = SelectorPlanCache(selector_plans) if selector_plans else None
+        self._startup_started = None  # Mốc bắt đầu khởi động browser (đo tới lần goto đầu)
+        self.batch_stats = {}
+        self.reset()
+        
+    def parse_view_count(self, view_str: str) -> int:
+        """
+        Chuyển đổi string view count thành số - IMPROVED VERSION
+        Cải thiện: Làm tròn đúng cách để giảm sai số
+        
+        Ví dụ: "1.2M" -> 1200000, "523K" -> 523000, "1,2 Tr" -> 1200000
+        (xem parse_count)
+        """
+        return parse_count(view_str)
+    
+    async def get_exact_view_count(self, video_elem) -> tuple:
+        """
+        Lấy view count chính xác nhất có thể từ nhiều nguồn
+        Returns: (view_count, view_text, source)
+        """
+        view_count = 0
+        view_text = "0"
+        source = "unknown"
+        
+        # Chiến lược 1: Tìm trong data attributes (chính xác nhất)
+        try:
+            # Thử lấy từ aria-label hoặc title (có thể chứa số đầy đủ)
+            self.metrics.count('cdp_calls')
+            aria_label = await video_elem.get_attribute('aria-label')
+            if aria_label and 'view' in aria_label.lower():
+                # Extract số từ aria-label: "5234 views" -> 5234
+                numbers = re.findall(r'(\d[\d,]*)\s*view', aria_label, re.IGNORECASE)
+                if numbers:
+                    clean_num = numbers[0].replace(',', '')
+                    view_count = int(clean_num)
+                    view_text = numbers[0]
+                    source = "aria-label"
+                    self.metrics.record('view_source', source)
+                    return (view_count, view_text, source)
+        except:
+            pass
+        
+        # Chiến lược 2: Tìm strong element với data attributes
+        try:
+            view_elem = video_elem.locator('strong[data-e2e="video-views"]').first
+            self.metrics.count('cdp_calls')
+            if await view_elem.count() > 0:
+                # Thử lấy title attribute
+                self.metrics.count('cdp_calls')
+                title = await view_elem.get_attribute('title')
+                if title:
+                    clean_num = re.sub(r'[^\d]', '', title)
+                    if clean_num:
+                        view_count = int(clean_num)
+                        view_text = title
+                        source = "title-attribute"
+                        self.metrics.record('view_source', source)
+                        return (view_count, view_text, source)
+        except:
+            pass
+        
+        # Chiến lược 3: Parse từ text (ít chính xác nhất - có làm tròn)
+        for view_selector in VIEW_SELECTORS:
+            try:
+                view_elem = video_elem.locator(view_selector)
+                self.metrics.count('cdp_calls')
+                if await view_elem.count() > 0:
+                    # Thử lấy title trước
+                    elem = view_elem.first
+                    self.metrics.count('cdp_calls')
+                    title = await elem.get_attribute('title')
+                    if title and title.strip():
+                        clean_num = re.sub(r'[^\d]', '', title)
+                        if clean_num:
+                            view_count = int(clean_num)
+                            view_text = title
+                            source = f"title-{view_selector}"
+                            self.metrics.record('view_source', source)
+                            return (view_count, view_text, source)
+                    
+                    # Nếu không có title, lấy text
+                    self.metrics.count('cdp_calls')
+                    text = await elem.text_content()
+                    if text and text.strip():
+                        view_text = text.strip()
+                        view_count = self.parse_view_count(view_text)
+                        source = f"text-{view_selector}"
+                        self.metrics.record('view_source', source)
+                        return (view_count, view_text, source)
+            except:
+                continue
+        
+        self.metrics.record('view_source', source)
+        return (view_count, view_text, source)
+    
+    def _build_video_info(self, index: int, views: int, view_text: str, source: str,
+                          video_link: str, caption: str, stats: Optional[Dict] = None) -> VideoRecord:
+        """
+        Tạo bản ghi video theo schema chung của kết quả (xem video_records.py)
+        stats: số liệu API (diggCount/commentCount/shareCount) nếu có
+        """
+        if video_link and not video_link.startswith('http'):
+            video_link = f"https://www.tiktok.com{video_link}"
+        
+        stats = stats or {}
+        return VideoRecord(
+            index, views, view_text,
+            source,  # IMPROVED: Ghi lại nguồn data (mã hóa qua bảng nguồn dùng chung)
+            video_link or "",
+            caption[:100] if caption else "",
+            stats.get('diggCount'), stats.get('commentCount'), stats.get('shareCount')
+        )
+    
+    async def _attach_page(self, page):
+        """
+        Gắn listener response và route chặn request vào page
+        """
+        page.on("response", self._on_response)
+        if self.block:
+            self.metrics.count('cdp_calls')
+            await page.route('**/*', self._route_request)
+    
+    async def _detach_page(self, page):
+        """
+        Gỡ listener/route để page có thể dùng lại cho kênh khác
+        """
+        page.remove_listener("response", self._on_response)
+        if self.block:
+            try:
+                self.metrics.count('cdp_calls')
+                await page.unroute('**/*', self._route_request)
+            except Exception:
+                pass
+    
+    def _block_category(self, request) -> Optional[str]:
+        """
+        Nhóm block của request, hoặc None nếu được phép tải.
+        Document và XHR dữ liệu (item_list) luôn được đi qua.
+        """
+        resource_type = request.resource_type
+        if resource_type == 'document':
+            return None
+        
+        if 'analytics' in self.block and any(pattern in request.url for pattern in ANALYTICS_URL_PATTERNS):
+            return 'analytics'
+        
+        for category in self.block:
+            if resource_type in BLOCK_RESOURCE_TYPES.get(category, ()):
+                return category
+        
+        return None
+    
+    async def _route_request(self, route):
+        """
+        Handler cho page.route: abort request thuộc nhóm bị chặn
+        """
+        category = self._block_category(route.request)
+        self.metrics.count('cdp_calls')
+        if category:
+            self.blocked_requests[category] = self.blocked_requests.get(category, 0) + 1
+            self.blocked_bytes_rough_estimate += ROUGH_BLOCKED_BYTES_PER_REQUEST.get(category, 0)
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    @property
+    def measures_transfer(self) -> bool:
+        """
+        Chỉ đếm dung lượng tải khi có người đọc số đó (--block hoặc --metrics):
+        response chunked tốn thêm 1 CDP call và tối đa TRANSFER_SIZE_TIMEOUT để đo
+        """
+        return bool(self.block) or self.metrics is not NULL_METRICS
+    
+    def _on_response(self, response):
+        """
+        Handler cho page.on("response"): đếm dung lượng tải và giữ lại response item_list
+        """
+        if self.measures_transfer:
+            try:
+                self.transferred_bytes += int(response.headers['content-length'])
+            except (KeyError, TypeError, ValueError):
+                # Chunked/không có content-length: đo body thực tế khi request xong
+                self._pending_sizes.append(asyncio.ensure_future(self._measure_transfer(response)))
+        
+        if any(pattern in response.url for pattern in ITEM_LIST_URL_PATTERNS):
+            self._observe_response(response, 'api')
+            # Báo cho vòng scroll biết đã có batch video mới
+            self._item_list_event.set()
+            if self.intercept:
+                self._pending_responses.append(asyncio.ensure_future(self._read_item_list(response)))
+    
+    async def _pace(self):
+        """
+        Đợi lượt của rate controller trước một request ra ngoài
+        """
+        if self.rate_limiter:
+            waited = await self.rate_limiter.acquire()
+            if waited:
+                self.metrics.observe('rate_wait', waited)
+    
+    def _observe_response(self, response, kind: str, fallback_latency: Optional[float] = None) -> bool:
+        """
+        Báo status + latency (tới byte đầu tiên) của response Playwright cho rate controller.
+        fallback_latency: latency đo ở phía gọi, dùng khi response không có timing
+        Returns: False nếu response bị throttle (429/5xx)
+        """
+        status = response.status
+        if status in THROTTLE_STATUSES:
+            self.metrics.count('throttled_responses')
+        if not self.rate_limiter:
+            return status not in THROTTLE_STATUSES
+        
+        latency = fallback_latency
+        try:
+            response_start = response.request.timing['responseStart']
+            if response_start >= 0:
+                latency = response_start / 1000
+        except (AttributeError, KeyError, TypeError):
+            pass
+        retry_after = parse_retry_after(response.headers.get('retry-after'))
+        return self.rate_limiter.observe(status, latency, retry_after, kind=kind)
+    
+    async def _read_item_list(self, response):
+        """
+        Decode JSON của một response item_list và lưu các item vào self.api_items
+        """
+        try:
+            self.metrics.count('cdp_calls')
+            payload = await response.json()
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Không decode được item_list: {str(e)}")
+            return
+        
+        self.ingest_item_list(payload)
+    
+    def ingest_item_list(self, payload: Dict) -> int:
+        """
+        Lưu các video trong payload item_list (giữ thứ tự, bỏ trùng theo ID)
+        Returns: số video mới
+        """
+        if not isinstance(payload, dict):
+            return 0
+        
+        self.api_responses += 1
+        added = 0
+        for item in payload.get('itemList') or []:
+            video_id = str(item.get('id') or '')
+            stats = item.get('stats') or item.get('statsV2') or {}
+            if not video_id or 'playCount' not in stats:
+                continue
+            if video_id not in self.api_items:
+                added += 1
+            self.api_items[video_id] = item
+        
+        return added
+    
+    async def _measure_transfer(self, response):
+        """
+        Cộng dung lượng body (đã nén, như trên đường truyền) của response không có content-length
+        """
+        try:
+            self.metrics.count('cdp_calls')
+            sizes = await response.request.sizes()
+            self.transferred_bytes += sizes['responseBodySize']
+        except Exception:
+            self.unmeasured_responses += 1
+    
+    async def _collect_transfer_sizes(self):
+        """
+        Đợi các phép đo dung lượng còn dở (tối đa TRANSFER_SIZE_TIMEOUT); response
+        chưa xong (ví dụ media đang stream) được đếm vào unmeasured_responses
+        """
+        pending, self._pending_sizes = self._pending_sizes, []
+        if not pending:
+            return
+        _, unfinished = await asyncio.wait(pending, timeout=TRANSFER_SIZE_TIMEOUT)
+        for future in unfinished:
+            future.cancel()
+        self.unmeasured_responses += len(unfinished)
+    
+    def _cancel_transfer_sizes(self):
+        """
+        Hủy các phép đo còn dở khi page được trả lại (lỗi, streaming dừng sớm)
+        """
+        pending, self._pending_sizes = self._pending_sizes, []
+        for future in pending:
+            if not future.done():
+                future.cancel()
+                self.unmeasured_responses += 1
+    
+    async def flush_intercepted(self):
+        """
+        Đợi tất cả response item_list đang decode xong
+        """
+        while self._pending_responses:
+            pending = self._pending_responses
+            self._pending_responses = []
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _video_from_api_item(self, index: int, video_id: str, item: Dict, channel_url: str,
+                             track: bool = True) -> Dict:
+        """
+        Chuyển một item của item_list thành video_info (view = stats.playCount)
+        track=False: không ghi metrics (dùng khi ghi checkpoint)
+        """
+        stats = item.get('stats') or item.get('statsV2') or {}
+        views = int(stats.get('playCount') or 0)
+        author = (item.get('author') or {}).get('uniqueId')
+        if author:
+            video_link = f"https://www.tiktok.com/@{author}/video/{video_id}"
+        else:
+            video_link = f"{channel_url.rstrip('/')}/video/{video_id}"
+        
+        if track:
+            self.metrics.record('view_source', 'api-item-list')
+        return self._build_video_info(
+            index, views, str(views), 'api-item-list', video_link, item.get('desc') or "", stats
+        )
+    
+    def _video_from_dom_item(self, index: int, item: Dict, track: bool = True) -> Dict:
+        """
+        Chuyển một item do BATCH_EXTRACT_JS trả về thành video_info
+        """
+        if item['views'] is not None:
+            views = item['views']
+        elif item['raw_text'] is not None:
+            views = self.parse_view_count(item['raw_text'])
+        else:
+            views = 0
+        
+        if track:
+            self.metrics.record('view_source', item['source'])
+        return self._build_video_info(
+            index, views, item['view_text'], item['source'], item['link'], item['caption']
+        )
+    
+    def build_videos_from_api(self, channel_url: str) -> List[Dict]:
+        """
+        Tạo videos_data từ các item_list đã bắt được, không cần đụng tới DOM.
+        View lấy từ stats.playCount nên là số chính xác, không bị làm tròn.
+        """
+        for video_id, item in self.api_items.items():
+            video_info = self._video_from_api_item(len(self.videos_data) + 1, video_id, item, channel_url)
+            self.videos_data.append(video_info)
+            self.total_views += video_info.views
+        
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Lấy {len(self.api_items)} video "
+              f"từ {self.api_responses} response item_list")
+        return self.videos_data
+    
+    async def extract_videos_batched(self, page, skip_ids: Optional[set] = None) -> List[Dict]:
+        """
+        Extract tất cả video trên page bằng một (hoặc vài) lần page.evaluate
+        thay vì hàng chục CDP round-trip cho mỗi video.
+        
+        Giữ nguyên thứ tự fallback aria-label -> title -> text và các nhãn
+        source của get_exact_view_count. Số round-trip đã dùng được lưu vào
+        self.extraction_round_trips.
+        
+        skip_ids: bỏ qua các video có ID đã có (ví dụ đã lấy từ item_list); video
+        còn lại được chèn vào đúng vị trí của nó trên grid thay vì nối vào cuối
+        (trang đầu render sẵn trong HTML là các video mới nhất)
+        """
+        start = 0
+        total = None
+        selector = None
+        inserted = False
+        
+        while total is None or start < total:
+            batch_started = time.perf_counter()
+            batch = await self._evaluate_batch(page, start, self.batch_size)
+            self.extraction_round_trips += 1
+            
+            if total is None:
+                total = batch['total']
+                selector = batch['selector']
+                self.metrics.observe('selector_discovery', batch['discoveryMs'] / 1000)
+                self.metrics.record('video_selector', selector or 'none', total or 1)
+                if selector:
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Sử dụng selector: {selector}")
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Tìm thấy {total} video")
+                if not total:
+                    print("[WARNING] Không tìm thấy video nào. Có thể cần cập nhật selector hoặc page chưa load đủ.")
+            
+            if not batch['items']:
+                break
+            
+            for position, item in enumerate(batch['items'], start):
+                if skip_ids and video_id_from_link(item['link']) in skip_ids:
+                    continue
+                
+                # Các video đứng trước trên grid (API hoặc DOM) đã nằm trong videos_data
+                i = min(position, len(self.videos_data)) + 1 if skip_ids else len(self.videos_data) + 1
+                video_info = self._video_from_dom_item(i, item)
+                views = video_info.views
+                if i <= len(self.videos_data):
+                    self.videos_data.insert(i - 1, video_info)
+                    inserted = True
+                else:
+                    self.videos_data.append(video_info)
+                self.total_views += views
+                
+                # In progress với thông tin nguồn
+                if i % 10 == 0 or views > 0:
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Video {i}: {video_info.view_text} views (source: {video_info.source})")
+            
+            self.metrics.observe('video_extraction', time.perf_counter() - batch_started, len(batch['items']))
+            start += len(batch['items'])
+        
+        if inserted:
+            for i, video in enumerate(self.videos_data, 1):
+                video.index = i
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Extract xong {len(self.videos_data)} video "
+              f"trong {self.extraction_round_trips} round-trip")
+        return self.videos_data
+    
+    async def _evaluate_batch(self, page, start: int, limit: int, **options) -> Dict:
+        """
+        Một lần BATCH_EXTRACT_JS theo plan selector hiện tại (nếu có).
+        Khi đang học plan, batch bị giới hạn ở số item mẫu còn thiếu để các item
+        sau đã được đọc theo plan. batch['limit'] là giới hạn thực tế đã dùng.
+        """
+        if self.plans and self.plan_fingerprint is None:
+            await self._resolve_plan(page)
+        learning = self._learning_plan()
+        if learning:
+            limit = min(limit, PLAN_SAMPLE - len(self._plan_samples))
+        
+        self.metrics.count('cdp_calls')
+        batch = await page.evaluate(BATCH_EXTRACT_JS, {
+            'videoSelectors': self._video_selectors(),
+            'viewSelectors': VIEW_SELECTORS,
+            'captionSelectors': CAPTION_SELECTORS,
+            'start': start,
+            'limit': limit,
+            'plan': self._plan,
+            'auditEvery': PLAN_AUDIT_EVERY,
+            'learn': learning,
+            **options,
+        })
+        batch['limit'] = limit
+        
+        if self._plan:
+            self._check_plan(batch)
+        elif learning:
+            self._learn_from(batch)
+        return batch
+    
+    async def _resolve_plan(self, page):
+        """
+        Đọc fingerprint cấu trúc trang (1 round-trip) và lấy plan đã học cho nó
+        """
+        self.metrics.count('cdp_calls')
+        signature = await page.evaluate(PAGE_FINGERPRINT_JS)
+        if not signature:
+            return
+        self.plan_fingerprint = page_fingerprint(signature)
+        self._plan = self.plans.get(self.plan_fingerprint)
+        if self._plan:
+            self.plan_source = 'cache'
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🧭 Dùng selector plan đã học "
+                  f"({self.plan_fingerprint}): {self._describe_plan()}")
+    
+    def _learning_plan(self) -> bool:
+        return bool(self.plans and self.plan_fingerprint and self._plan is None
+                    and not self.plans.known(self.plan_fingerprint))
+    
+    def _video_selectors(self) -> List[str]:
+        """
+        VIDEO_SELECTORS với selector video của plan được thử trước
+        """
+        if not self._plan:
+            return VIDEO_SELECTORS
+        planned = self._plan['videoSelector']
+        return [planned] + [sel for sel in VIDEO_SELECTORS if sel != planned]
+    
+    def _describe_plan(self) -> str:
+        plan = self._plan
+        view = plan['view'] if plan['view'] != 'selector' else f"selector {plan['viewSelector']}"
+        return f"video {plan['videoSelector']}, view {view}, caption {plan['captionSelector'] or '-'}"
+    
+    def _learn_from(self, batch: Dict):
+        """
+        Gom (source, caption selector) của các item mẫu; đủ PLAN_SAMPLE thì học plan
+        """
+        if not batch['selector']:
+            return
+        self._plan_samples.extend((item['source'], item['caption_selector']) for item in batch['items'])
+        if len(self._plan_samples) < PLAN_SAMPLE:
+            return
+        
+        plan = learn_plan(batch['selector'], self._plan_samples)
+        self._plan_samples = []
+        # plan None cũng được lưu: cấu trúc này không có chiến lược trội, không học lại
+        self.plans.put(self.plan_fingerprint, plan)
+        if plan:
+            self._plan = plan
+            self.plan_source = 'learned'
+            self._plan_window = [0, 0]
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🧭 Học selector plan từ {PLAN_SAMPLE} video đầu: "
+                  f"{self._describe_plan()}")
+    
+    def _check_plan(self, batch: Dict):
+        """
+        Đếm số lần trúng/trượt plan; bỏ plan (dò lại từ đầu) khi selector video
+        không còn khớp, item kiểm tra khớp view selector đứng trước plan, hoặc tỉ lệ
+        trúng của một cửa sổ PLAN_SAMPLE item tụt dưới PLAN_MIN_HIT_RATE.
+        Item trượt vẫn đúng vì đã được dò cả chuỗi fallback.
+        """
+        hits, misses = batch['planHits'], batch['planMisses']
+        self.plan_hits += hits
+        self.plan_misses += misses
+        self.metrics.record('selector_plan', 'hit', hits)
+        self.metrics.record('selector_plan', 'miss', misses)
+        
+        reason = None
+        if batch['selector'] and batch['selector'] != self._plan['videoSelector']:
+            reason = f"selector video đổi thành {batch['selector']}"
+        elif batch['planStale']:
+            reason = f"{batch['planStale']} video khớp view selector đứng trước plan"
+        else:
+            window = self._plan_window
+            window[0] += hits
+            window[1] += misses
+            checked = window[0] + window[1]
+            if checked >= PLAN_SAMPLE:
+                if window[0] < checked * PLAN_MIN_HIT_RATE:
+                    reason = f"chỉ trúng {window[0]}/{checked} video"
+                self._plan_window = [0, 0]
+        
+        if reason:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🧭 Bỏ selector plan ({reason}), dò lại")
+            self.plans.drop(self.plan_fingerprint)
+            self._plan = None
+            self._plan_samples = []
+            self.plan_reprobes += 1
+            self.metrics.count('selector_plan_reprobes')
+    
+    async def launch_browser(self, p):
+        """
+        Khởi tạo Chromium với các options để tránh detection
+        """
+        with self.metrics.phase('browser_launch'):
+            return await p.chromium.launch(headless=self.headless, args=CHROMIUM_ARGS)
+    
+    async def launch_persistent(self, p, user_data_dir: str, extra_args: List[str]):
+        """
+        Launch Chromium với profile trên đĩa (dùng cho browser server)
+        Returns: context mặc định của profile
+        """
+        with self.metrics.phase('browser_launch'):
+            return await p.chromium.launch_persistent_context(
+                user_data_dir, headless=self.headless, args=CHROMIUM_ARGS + extra_args, **CONTEXT_OPTIONS
+            )
+    
+    async def connect_browser(self, p):
+        """
+        Gắn vào browser server đang chạy (xem browser_server.py) qua websocket CDP
+        """
+        with self.metrics.phase('browser_connect'):
+            return await p.chromium.connect_over_cdp(self.connect)
+    
+    async def open_browser(self, p):
+        """
+        Browser để scrape: gắn vào browser server nếu có connect, ngược lại launch mới
+        """
+        if self.connect:
+            return await self.connect_browser(p)
+        return await self.launch_browser(p)
+    
+    async def close_browser(self, browser):
+        """
+        Đóng browser tự launch; browser server dùng chung thì để nguyên
+        (kết nối tự ngắt khi playwright dừng)
+        """
+        if not self.connect:
+            await browser.close()
+    
+    async def close_context(self, context, page):
+        """
+        Đóng context sau khi scrape. Với browser server chỉ đóng page:
+        context mặc định giữ cookie + HTTP cache cho các lần sau
+        """
+        if self.connect:
+            await page.close()
+        else:
+            await context.close()
+    
+    async def new_context(self, browser):
+        """
+        Tạo context với user agent thực.
+        Browser server: dùng context mặc định (cookie + HTTP cache trên đĩa);
+        browser thường: nạp storage state đã lưu nếu có.
+        """
+        if self.connect and browser.contexts:
+            return browser.contexts[0]
+        
+        options = dict(CONTEXT_OPTIONS)
+        if self.storage_state and os.path.isfile(self.storage_state):
+            options['storage_state'] = self.storage_state
+        return await browser.new_context(**options)
+    
+    def reset(self):
+        """
+        Xóa dữ liệu của lần scrape trước
+        """
+        self.total_views = 0
+        self.videos_data = VideoList()
+        self.extraction_round_trips = 0
+        self.api_items = {}  # video_id -> item từ response item_list
+        self.api_responses = 0
+        self._pending_responses = []
+        self._pending_sizes = []  # Đo dung lượng response chunked đang chạy
+        self._item_list_event = asyncio.Event()
+        self.scroll_steps = 0
+        self.scroll_seconds = 0.0
+        self.navigation_seconds = 0.0  # goto + đợi video đầu tiên
+        self.extraction_seconds = 0.0
+        self.video_count = 0  # Số video đã yield ở chế độ streaming
+        self.seen_keys = set()  # ID/link đã yield (bỏ trùng khi streaming)
+        self.channel_name = "Unknown"
+        self._known_ids = set()  # Video ID đã có trong store (chế độ incremental)
+        self.refreshed_videos = 0
+        self.reused_videos = 0
+        self.views_delta = None
+        self.blocked_requests = {}  # nhóm -> số request đã chặn
+        self.blocked_bytes_rough_estimate = 0  # Giả định theo nhóm, không phải số đo
+        self.transferred_bytes = 0  # Tổng body response được tải (content-length hoặc đo khi chunked)
+        self.unmeasured_responses = 0  # Response chưa đo được dung lượng
+        self.startup_seconds = None  # Khởi động (launch/connect) -> lần điều hướng đầu tiên
+        self.phase_retries = 0  # Số lần chạy lại phase lỗi trên cùng page
+        self._checkpoint_videos = {}  # video ID/link -> VideoRecord đã ghi checkpoint (theo thứ tự grid)
+        self._checkpoint_loaded = 0  # Số video trên grid ở lần checkpoint gần nhất
+        self._checkpoint_step = 0  # scroll_steps ở lần checkpoint gần nhất
+        self.checkpoint_saves = 0
+        self.resumed_videos = 0  # Video nạp lại từ checkpoint của lần chạy trước
+        self.resumed_scroll_steps = 0  # scroll_steps ghi trong checkpoint (chỉ để ghi tiếp vào checkpoint)
+        self._resume_scroll_y = 0  # Vị trí scroll của checkpoint, tua nhanh tới đây khi --resume
+        self.fast_forward_steps = 0  # Bước scroll tua nhanh (không checkpoint, không đếm idle)
+        self.fast_forward_seconds = 0.0
+        self.recovered_videos = 0  # Video chỉ còn trong checkpoint (grid không còn giữ)
+        self.enrich_candidates = 0  # Video có view làm tròn/thiếu cần mở trang video
+        self.enriched_videos = 0
+        self.enrich_failed = 0
+        self.enrich_seconds = 0.0
+        self.rounding_error_before = 0  # Tổng sai số làm tròn tối đa trước/sau enrich
+        self.rounding_error_after = 0
+        self.plan_fingerprint = None  # Fingerprint cấu trúc trang (None = chưa đọc được)
+        self.plan_source = None  # 'cache' | 'learned' | None (dò đầy đủ mỗi item)
+        self._plan = None
+        self._plan_samples = []  # (source, caption selector) của các item đang dùng để học
+        self._plan_window = [0, 0]  # Số lần trúng/trượt plan trong cửa sổ đo hiện tại
+        self.plan_hits = 0
+        self.plan_misses = 0
+        self.plan_reprobes = 0  # Số lần bỏ plan vì tỉ lệ trúng giảm
+    
+    def _spawn(self) -> 'TikTokViewCounter':
+        """
+        Tạo counter con cùng cấu hình (dùng cho mỗi kênh khi scrape song song)
+        """
+        child = copy.copy(self)
+        child.reset()
+        return child
+    
+    async def scrape_channel(self, channel_url: str) -> Dict:
+        """
+        Scrape thông tin và tổng view từ kênh TikTok
+        """
+        if self.fast_path:
+            async with HttpPool() as client:
+                result = await self.fetch_channel_http(channel_url, client)
+            if result:
+                return result
+        
+        self._startup_started = time.perf_counter()
+        async with async_playwright() as p:
+            browser = await self.open_browser(p)
+            
+            try:
+                context = await self.new_context(browser)
+                page = await context.new_page()
+                try:
+                    return await self.scrape_page(page, channel_url)
+                finally:
+                    await self.close_context(context, page)
+            finally:
+                await self.close_browser(browser)
+    
+    async def fetch_channel_http(self, channel_url: str, client: HttpPool) -> Optional[Dict]:
+        """
+        Fast path không cần browser: tải HTML trang kênh và đọc JSON rehydration nhúng sẵn.
+        Returns: kết quả cùng schema với scrape_page, hoặc None nếu không có blob hoặc
+        blob chưa đủ video (khi đó cần scroll bằng browser)
+        """
+        self.reset()
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        
+        await self._pace()
+        started = time.perf_counter()
+        try:
+            with self.metrics.phase('http_fetch'):
+                response = await client.get(channel_url)
+        except (OSError, asyncio.TimeoutError, HttpError) as e:
+            if self.rate_limiter and isinstance(e, asyncio.TimeoutError):
+                self.rate_limiter.observe(None, client.timeout)
+            print(f"[{timestamp}] HTTP fast path lỗi ({e}), chuyển sang browser")
+            return None
+        self.navigation_seconds = round(time.perf_counter() - started, 3)
+        self.transferred_bytes = len(response.body)
+        if response.status in THROTTLE_STATUSES:
+            self.metrics.count('throttled_responses')
+        if self.rate_limiter:
+            self.rate_limiter.observe(response.status, self.navigation_seconds,
+                                      parse_retry_after(response.headers.get('retry-after')))
+        
+        profile = parse_profile_state(extract_rehydration(response.text())) if response.status == 200 else None
+        if not profile or not profile['items']:
+            print(f"[{timestamp}] Không có JSON rehydration (HTTP {response.status}), chuyển sang browser")
+            return None
+        
+        if self.incremental_depth:
+            self._known_ids = self.store.known_ids(channel_key(channel_url))
+        
+        extraction_started = time.perf_counter()
+        self.ingest_item_list({'itemList': profile['items']})
+        links = [f"{channel_url.rstrip('/')}/video/{video_id}" for video_id in self.api_items]
+        state = {
+            'count': len(links),
+            'lastLink': links[-1] if links else None,
+            'tailLinks': links[-self.incremental_depth:] if self.incremental_depth else [],
+        }
+        
+        # Đủ khi blob chứa mọi video của kênh, hoặc đã chạm điều kiện dừng scroll
+        video_count = profile['video_count']
+        complete = (
+            (video_count is not None and len(self.api_items) >= video_count)
+            or profile['has_more'] is False
+            or self._scroll_limit_reached(state)
+        )
+        if not complete:
+            print(f"[{timestamp}] JSON rehydration chỉ có {len(self.api_items)}/{video_count} video, "
+                  f"chuyển sang browser")
+            return None
+        
+        self.build_videos_from_api(channel_url)
+        self.extraction_seconds = round(time.perf_counter() - extraction_started, 3)
+        self._apply_limits()
+        
+        if self.store:
+            self._sync_store(channel_url)
+        
+        if self.checkpoints:
+            self.checkpoints.clear(channel_url)
+        
+        print(f"[{timestamp}] ⚡ HTTP fast path: {len(self.videos_data)} video, không cần browser")
+        return self._build_result(channel_url, profile['nickname'] or profile['unique_id'] or "Unknown")
+    
+    async def scrape_page(self, page, channel_url: str) -> Dict:
+        """
+        Scrape một kênh trên page có sẵn (page có thể được dùng lại cho kênh khác)
+        """
+        self.reset()
+        
+        # Lắng nghe response item_list trong suốt quá trình load + scroll
+        await self._attach_page(page)
+        
+        try:
+            if self.incremental_depth:
+                self._known_ids = self.store.known_ids(channel_key(channel_url))
+            
+            if self.checkpoints:
+                self._load_checkpoint(channel_url)
+            
+            # Phase lỗi được chạy lại trên cùng page, không mở lại browser
+            await self._run_phase('open_channel', page, lambda: self.open_channel(page, channel_url))
+            
+            # Scroll để load thêm video (checkpoint định kỳ)
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Đang tải danh sách video...")
+            await self._run_phase('scroll', page, lambda: self.scroll_to_load(page, channel_url))
+            
+            # Lấy thông tin channel
+            channel_name = await self.read_channel_name(page)
+            
+            extraction_started = time.perf_counter()
+            await self._run_phase('extract', page, lambda: self._extract_all(page, channel_url))
+            self.extraction_seconds = round(time.perf_counter() - extraction_started, 3)
+            
+            self._apply_limits()
+            
+            if self.enrich is not None:
+                await self.enrich_videos(page, channel_url)
+            
+            if self.store:
+                self._sync_store(channel_url)
+            
+            if self.checkpoints:
+                self.checkpoints.clear(channel_url)
+            
+            await self._collect_transfer_sizes()
+            return self._build_result(channel_url, channel_name)
+            
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Lỗi khi scrape: {str(e)}")
+            error = {
+                'error': str(e),
+                'channel_url': channel_url,
+                'scraped_at': datetime.now().isoformat()
+            }
+            if self.checkpoints:
+                # Giữ lại những gì đã load được cho lần chạy --resume
+                try:
+                    await self._save_checkpoint(page, channel_url)
+                except Exception:
+                    pass
+                if self._checkpoint_videos:
+                    error['checkpoint'] = self.checkpoints.path(channel_url)
+                    error['checkpoint_videos'] = len(self._checkpoint_videos)
+            if self.phase_retries:
+                error['phase_retries'] = self.phase_retries
+            return error
+            
+        finally:
+            self._cancel_transfer_sizes()
+            await self._detach_page(page)
+    
+    async def _run_phase(self, name: str, page, phase):
+        """
+        Chạy một phase (hàm trả về coroutine), lỗi thì chạy lại tối đa PHASE_RETRIES
+        lần trên cùng page. Trạng thái đã có (scroll_steps, api_items, checkpoint)
+        được giữ nguyên nên phase chạy lại tiếp tục từ chỗ đang dở.
+        """
+        for attempt in range(PHASE_RETRIES + 1):
+            try:
+                return await phase()
+            except Exception as e:
+                if attempt >= PHASE_RETRIES or page.is_closed():
+                    raise
+                self.phase_retries += 1
+                self.metrics.count('phase_retries')
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Phase {name} lỗi ({e}), "
+                      f"thử lại {attempt + 1}/{PHASE_RETRIES} trên cùng page")
+                await asyncio.sleep(PHASE_RETRY_DELAY * (attempt + 1))
+    
+    async def _extract_all(self, page, channel_url: str):
+        """
+        Extract toàn bộ video đã load (API trước, DOM bổ sung), rồi gộp các video
+        chỉ còn trong checkpoint. Chạy lại được: videos_data được dựng lại từ đầu.
+        """
+        self.videos_data = VideoList()
         self.total_views = 0
-        self.videos_data = []
+        self.extraction_round_trips = 0
+        
+        if self.intercept:
+            await self.flush_intercepted()
+        
+        if self.api_items:
+            # View chính xác từ API; DOM chỉ bổ sung video không có
+            # trong item_list (ví dụ trang đầu được render sẵn trong HTML),
+            # chèn theo vị trí trên grid trước khi áp dụng giới hạn
+            self.build_videos_from_api(channel_url)
+            await self.extract_videos_batched(page, skip_ids=set(self.api_items))
+        else:
+            if self.intercept:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Không bắt được item_list, dùng DOM extractor")
+            # Extract toàn bộ video bằng batched page.evaluate
+            await self.extract_videos_batched(page)
+        
+        if self._checkpoint_videos:
+            # Video đầu grid đã được checkpoint nhưng không còn trên page
+            # (grid xóa node đã cuộn qua, hoặc lần chạy này chưa scroll tới)
+            extracted = {video_id_from_link(v.link) or v.link for v in self.videos_data}
+            missing = [v for key, v in self._checkpoint_videos.items() if key not in extracted]
+            if missing:
+                self.videos_data = VideoList(missing + self.videos_data)
+                for i, video in enumerate(self.videos_data, 1):
+                    video.index = i
+                self.total_views = self.videos_data.total_views()
+            self.recovered_videos = len(missing)
+    
+    def _enrich_candidates(self) -> List[tuple]:
+        """
+        Video cần mở trang video: view đọc từ text làm tròn (source text-*) hoặc thiếu view.
+        Sắp theo sai số tối đa giảm dần; video thiếu view được tính sai số bằng view
+        trung bình của kênh. Với enrich=N chỉ giữ N video đầu.
+        Returns: [(sai số, video)]
+        """
+        known = [video.views for video in self.videos_data if video.views > 0]
+        missing_error = sum(known) // len(known) if known else 0
+        
+        candidates = []
+        for video in self.videos_data:
+            if not video_id_from_link(video.link):
+                continue
+            if video.views <= 0:
+                candidates.append((missing_error, video))
+            elif video.source.startswith('text-'):
+                error = count_rounding_error(video.view_text)
+                if error:
+                    candidates.append((error, video))
+        
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return candidates[:self.enrich] if self.enrich else candidates
+    
+    async def enrich_videos(self, page, channel_url: str):
+        """
+        Mở trang video của các video có view làm tròn/thiếu trên pool `enrich_tabs`
+        tab dùng lại (tab đầu là page của kênh), sai số lớn nhất trước. View chính xác,
+        like, comment, share được ghi thẳng vào bản ghi và total_views.
+        Với fast_path: thử HTTP trước, chỉ mở tab khi HTML không có JSON state.
+        """
+        candidates = self._enrich_candidates()
+        if not candidates:
+            return
+        
+        started = time.perf_counter()
+        self.enrich_candidates = len(candidates)
+        self.rounding_error_before = sum(error for error, _ in candidates)
+        resolved_error = 0
+        queue = collections.deque(candidates)
+        tab_count = min(self.enrich_tabs, len(candidates))
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Enrich {len(candidates)} video "
+              f"(view làm tròn/thiếu) trên {tab_count} tab")
+        
+        async def worker(tab, client):
+            nonlocal resolved_error
+            while queue:
+                error, video = queue.popleft()
+                details = await self._fetch_video_details(tab, client, channel_url, video.link)
+                if details is None:
+                    self.enrich_failed += 1
+                    continue
+                self.total_views += details['views'] - video.views
+                video.views = details['views']
+                video.view_text = str(details['views'])
+                video.source = 'video-page'
+                video.likes = details['likes']
+                video.comments = details['comments']
+                video.shares = details['shares']
+                self.enriched_videos += 1
+                resolved_error += error
+        
+        tabs = [page]
+        client = HttpPool(limit_per_host=tab_count) if self.fast_path else None
+        with self.metrics.phase('enrich'):
+            try:
+                for _ in range(tab_count - 1):
+                    tab = await page.context.new_page()
+                    await self._attach_page(tab)
+                    tabs.append(tab)
+                await asyncio.gather(*(worker(tab, client) for tab in tabs))
+            finally:
+                if client:
+                    await client.close()
+                for tab in tabs[1:]:
+                    await self._detach_page(tab)
+                    await tab.close()
+        
+        self.rounding_error_after = self.rounding_error_before - resolved_error
+        self.enrich_seconds = round(time.perf_counter() - started, 3)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Enrich xong {self.enriched_videos}/{len(candidates)} video "
+              f"trong {self.enrich_seconds}s")
+    
+    async def _fetch_video_details(self, tab, client: Optional[HttpPool], channel_url: str,
+                                   link: str) -> Optional[Dict]:
+        """
+        Số liệu chính xác của 1 video từ JSON state của trang video
+        Returns: {'views', 'likes', 'comments', 'shares'} hoặc None nếu không đọc được
+        """
+        # Trang video cùng origin với trang kênh (TikTok thật hoặc fixture server)
+        origin = urlsplit(channel_url)
+        parts = urlsplit(link)
+        url = f"{origin.scheme}://{origin.netloc}{parts.path}{f'?{parts.query}' if parts.query else ''}"
+        
+        if client is not None:
+            await self._pace()
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+            except (OSError, asyncio.TimeoutError, HttpError):
+                response = None
+            if response is not None:
+                if self.rate_limiter:
+                    self.rate_limiter.observe(response.status, time.perf_counter() - started,
+                                              parse_retry_after(response.headers.get('retry-after')))
+                if response.status == 200:
+                    details = parse_video_state(extract_rehydration(response.text()))
+                    if details:
+                        return details
+        
+        for attempt in range(ENRICH_THROTTLE_RETRIES + 1):
+            # _pace đợi hết thời gian tạm dừng (Retry-After) và tốc độ đã giảm sau lần bị throttle
+            await self._pace()
+            try:
+                self.metrics.count('cdp_calls')
+                started = time.perf_counter()
+                response = await tab.goto(url, wait_until='domcontentloaded', timeout=30000)
+                if response is not None and not self._observe_response(
+                        response, 'page', time.perf_counter() - started):
+                    if attempt == ENRICH_THROTTLE_RETRIES:
+                        return None
+                    self.metrics.count('enrich_throttle_retries')
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Trang video bị throttle "
+                          f"({response.status}), thử lại sau khi giảm tốc: {url}")
+                    if not self.rate_limiter:
+                        await asyncio.sleep(parse_retry_after(response.headers.get('retry-after'))
+                                            or PHASE_RETRY_DELAY)
+                    continue
+                self.metrics.count('cdp_calls')
+                text = await tab.evaluate(VIDEO_STATE_JS)
+                return parse_video_state(json.loads(text)) if text else None
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Không đọc được trang video {url}: {str(e)}")
+                return None
+    
+    def _load_checkpoint(self, channel_url: str):
+        """
+        Nạp checkpoint của lần chạy trước (chỉ khi --resume)
+        """
+        data = self.checkpoints.load(channel_url)
+        if not data:
+            return
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        if not self.resume:
+            print(f"[{timestamp}] Có checkpoint {len(data['videos'])} video từ {data.get('saved_at')}, "
+                  f"chạy với --resume để tiếp tục")
+            return
+        
+        for video in data['videos']:
+            record = VideoRecord(**video)
+            self._checkpoint_videos[video_id_from_link(record.link) or record.link] = record
+        self._checkpoint_loaded = data.get('loaded', 0)
+        self._resume_scroll_y = data.get('scroll_y', 0)
+        self.resumed_videos = len(self._checkpoint_videos)
+        self.resumed_scroll_steps = data.get('scroll_steps', 0)
+        print(f"[{timestamp}] ♻️ Resume từ checkpoint {data.get('saved_at')}: {self.resumed_videos} video, "
+              f"tua nhanh tới {self._checkpoint_loaded} video trên grid (scrollY {self._resume_scroll_y})")
+    
+    async def _save_checkpoint(self, page, channel_url: str, state: Optional[Dict] = None):
+        """
+        Extract các video mới xuất hiện từ lần checkpoint trước (đánh dấu node
+        bằng data-tvc-checkpoint) rồi ghi checkpoint của kênh xuống đĩa
+        """
+        with self.metrics.phase('checkpoint'):
+            if state is None:
+                state = await self._read_scroll_state(page)
+            videos = self._checkpoint_videos
+            if self.intercept:
+                await self.flush_intercepted()
+            
+            # Theo thứ tự grid: node mới trên DOM, ưu tiên bản ghi từ item_list (view chính xác)
+            while True:
+                batch = await self._evaluate_batch(page, 0, self.batch_size,
+                                                   onlyNew=True, mark='data-tvc-checkpoint')
+                for item in batch['items']:
+                    video_id = video_id_from_link(item['link'])
+                    if video_id in videos or (not video_id and item['link'] in videos):
+                        continue
+                    if video_id in self.api_items:
+                        video = self._video_from_api_item(len(videos) + 1, video_id, self.api_items[video_id],
+                                                          channel_url, track=False)
+                    else:
+                        video = self._video_from_dom_item(len(videos) + 1, item, track=False)
+                    videos[video_id or video.link] = video
+                if len(batch['items']) < batch['limit']:
+                    break
+            
+            # Item đã bắt được nhưng chưa render lên grid nằm sau các node đã thấy
+            for video_id, item in self.api_items.items():
+                if video_id not in videos:
+                    videos[video_id] = self._video_from_api_item(
+                        len(videos) + 1, video_id, item, channel_url, track=False
+                    )
+            
+            if not videos:
+                return
+            self.checkpoints.save(
+                channel_url, [video.to_dict() for video in videos.values()],
+                scroll_steps=max(self.scroll_steps, self.resumed_scroll_steps),
+                loaded=max(state['count'], self._checkpoint_loaded), scroll_y=state.get('scrollY', 0),
+            )
+            self._checkpoint_loaded = max(state['count'], self._checkpoint_loaded)
+            self._checkpoint_step = self.scroll_steps
+            self.checkpoint_saves += 1
+    
+    def _build_result(self, channel_url: str, channel_name: str) -> Dict:
+        """
+        Tạo dict kết quả từ videos_data + thống kê của lần scrape
+        """
+        result = {
+            'channel_url': channel_url,
+            'channel_name': channel_name,
+            'total_videos': len(self.videos_data),
+            'total_views': self.total_views,
+            'total_views_formatted': self.format_number(self.total_views),
+            'average_views': self.total_views // len(self.videos_data) if self.videos_data else 0,
+            'videos': self.videos_data,
+            'extraction_round_trips': self.extraction_round_trips,
+            'api_responses': self.api_responses,
+            'scroll_steps': self.scroll_steps,
+            'scroll_seconds': self.scroll_seconds,
+            'navigation_seconds': self.navigation_seconds,
+            'extraction_seconds': self.extraction_seconds,
+            'phase_retries': self.phase_retries,
+            'scraped_at': datetime.now().isoformat()
+        }
+        
+        if self.rate_limiter:
+            result['rate_limit'] = self.rate_limiter.snapshot()
+        
+        if self.enrich is not None:
+            result['enrich_candidates'] = self.enrich_candidates
+            result['enriched_videos'] = self.enriched_videos
+            result['enrich_failed'] = self.enrich_failed
+            result['enrich_seconds'] = self.enrich_seconds
+            result['rounding_error_before'] = self.rounding_error_before
+            result['rounding_error_after'] = self.rounding_error_after
+        
+        if self.plans:
+            result['selector_plan'] = {
+                'fingerprint': self.plan_fingerprint,
+                'source': self.plan_source,
+                'hits': self.plan_hits,
+                'misses': self.plan_misses,
+                'reprobes': self.plan_reprobes,
+            }
+        
+        if self.checkpoints:
+            result['checkpoint_saves'] = self.checkpoint_saves
+            result['resumed_videos'] = self.resumed_videos
+            result['fast_forward_steps'] = self.fast_forward_steps
+            result['fast_forward_seconds'] = self.fast_forward_seconds
+            result['recovered_videos'] = self.recovered_videos
+        
+        if self.startup_seconds is not None:
+            result['startup_seconds'] = self.startup_seconds
+            result['browser_mode'] = 'attached' if self.connect else 'cold'
+        
+        if self.block:
+            result['blocked_requests'] = self.blocked_requests
+            result['blocked_bytes_rough_estimate'] = self.blocked_bytes_rough_estimate
+        if self.measures_transfer:
+            result['transferred_bytes'] = self.transferred_bytes
+            if self.unmeasured_responses:
+                result['unmeasured_responses'] = self.unmeasured_responses
+        
+        if self.store:
+            result['refreshed_videos'] = self.refreshed_videos
+            result['reused_videos'] = self.reused_videos
+            result['views_delta'] = self.views_delta
         
-    def parse_view_count(self, view_str: str) -> int:
+        return result
+    
+    async def open_channel(self, page, channel_url: str):
         """
-        Chuyển đổi string view count thành số - IMPROVED VERSION
-        Cải thiện: Làm tròn đúng cách để giảm sai số
-        
-        Ví dụ: "1.2M" -> 1200000, "523K" -> 523000
+        Mở trang kênh: không đợi networkidle, chỉ đợi video đầu tiên xuất hiện
         """
-        if not view_str:
-            return 0
-            
-        view_str = view_str.strip().upper()
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Đang truy cập: {channel_url}")
+        started = time.perf_counter()
+        if self._startup_started is not None:
+            self.startup_seconds = round(started - self._startup_started, 3)
+            self.metrics.observe('startup_to_first_navigation', self.startup_seconds)
+            self._startup_started = None
+        await self._pace()
+        with self.metrics.phase('goto'):
+            self.metrics.count('cdp_calls')
+            response = await page.goto(channel_url, wait_until='domcontentloaded', timeout=60000)
         
-        # Xử lý các trường hợp đặc biệt
-        multipliers = {
-            'K': 1000,
-            'M': 1000000,
-            'B': 1000000000
-        }
+        if response is not None and not self._observe_response(response, 'page'):
+            # Server đang từ chối/quá tải: báo lỗi rõ ràng để phase được chạy lại sau khi giảm tốc
+            raise ThrottledError(response.status, channel_url,
+                                 parse_retry_after(response.headers.get('retry-after')))
         
-        # Tìm và xử lý số với ký tự viết tắt
-        for suffix, multiplier in multipliers.items():
-            if suffix in view_str:
-                try:
-                    # Lấy phần số trước ký tự
-                    num_str = view_str.replace(suffix, '').strip()
-                    # Chuyển đổi và nhân với hệ số
-                    # IMPROVEMENT: Sử dụng round() thay vì int() để làm tròn đúng
-                    return round(float(num_str) * multiplier)
-                except:
-                    continue
+        try:
+            with self.metrics.phase('first_item_wait'):
+                self.metrics.count('cdp_calls')
+                await page.wait_for_function(
+                    ITEMS_GREW_JS, arg={'selectors': self._video_selectors(), 'count': 0},
+                    timeout=FIRST_ITEM_TIMEOUT
+                )
+        except Exception:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Chưa thấy video sau {FIRST_ITEM_TIMEOUT // 1000}s, tiếp tục")
+        
+        self.navigation_seconds = round(time.perf_counter() - started, 3)
         
-        # Nếu không có ký tự viết tắt, cố gắng parse số trực tiếp
+        if self.plans and self.plan_fingerprint is None:
+            await self._resolve_plan(page)
+    
+    async def read_channel_name(self, page) -> str:
+        """
+        Lấy tên kênh từ header của trang
+        """
         try:
-            # Loại bỏ các ký tự không phải số (như dấu phẩy)
-            clean_str = re.sub(r'[^\d]', '', view_str)
-            return int(clean_str) if clean_str else 0
-        except:
-            return 0
+            self.metrics.count('cdp_calls')
+            return await page.locator('h1[data-e2e="user-title"]').text_content()
+        except Exception:
+            try:
+                self.metrics.count('cdp_calls')
+                return await page.locator('h2[data-e2e="user-subtitle"]').text_content()
+            except Exception:
+                return "Unknown"
     
-    async def get_exact_view_count(self, video_elem) -> tuple:
+    async def scroll_to_load(self, page, channel_url: Optional[str] = None) -> int:
         """
-        Lấy view count chính xác nhất có thể từ nhiều nguồn
-        Returns: (view_count, view_text, source)
+        Scroll cho tới khi grid không còn video mới.
+        Mỗi bước đi tiếp ngay khi số video tăng hoặc response item_list về;
+        scroll_idle_timeout chỉ là mốc dự phòng. Dừng sớm theo max_videos / since.
+        Có channel_url + checkpoint: ghi checkpoint sau mỗi CHECKPOINT_EVERY bước
+        khi grid đã vượt vị trí của checkpoint trước. Khi --resume, grid được tua
+        nhanh tới vị trí của checkpoint trước (xem _fast_forward).
+        Returns: số video đã load
         """
-        view_count = 0
-        view_text = "0"
-        source = "unknown"
+        started = time.perf_counter()
+        idle_rounds = 0
+        state = await self._read_scroll_state(page)
         
-        # Chiến lược 1: Tìm trong data attributes (chính xác nhất)
-        try:
-            # Thử lấy từ aria-label hoặc title (có thể chứa số đầy đủ)
-            aria_label = await video_elem.get_attribute('aria-label')
-            if aria_label and 'view' in aria_label.lower():
-                # Extract số từ aria-label: "5234 views" -> 5234
-                numbers = re.findall(r'(\d[\d,]*)\s*view', aria_label, re.IGNORECASE)
-                if numbers:
-                    clean_num = numbers[0].replace(',', '')
-                    view_count = int(clean_num)
-                    view_text = numbers[0]
-                    source = "aria-label"
-                    return (view_count, view_text, source)
-        except:
-            pass
+        if self.resumed_videos and not self._resume_reached(state):
+            state = await self._fast_forward(page, state)
         
-        # Chiến lược 2: Tìm strong element với data attributes
-        try:
-            view_elem = video_elem.locator('strong[data-e2e="video-views"]').first
-            if await view_elem.count() > 0:
-                # Thử lấy title attribute
-                title = await view_elem.get_attribute('title')
-                if title:
-                    clean_num = re.sub(r'[^\d]', '', title)
-                    if clean_num:
-                        view_count = int(clean_num)
-                        view_text = title
-                        source = "title-attribute"
-                        return (view_count, view_text, source)
-        except:
-            pass
+        while self.scroll_steps < MAX_SCROLL_STEPS and not self._scroll_limit_reached(state):
+            state, progressed = await self._scroll_step(page, state)
+            
+            if (channel_url and self.checkpoints
+                    and self.scroll_steps - self._checkpoint_step >= CHECKPOINT_EVERY
+                    and state['count'] > self._checkpoint_loaded):
+                await self._save_checkpoint(page, channel_url, state)
+            
+            if progressed:
+                idle_rounds = 0
+            else:
+                idle_rounds += 1
+                if idle_rounds >= SCROLL_IDLE_ROUNDS:
+                    break
         
-        # Chiến lược 3: Parse từ text (ít chính xác nhất - có làm tròn)
-        view_selectors = [
-            'strong[data-e2e="video-views"]',
-            'strong',
-            '[data-e2e="video-views"]',
-            '.video-count',
-            'span[title*="views"]'
-        ]
-        
-        for view_selector in view_selectors:
+        # Cộng dồn: phase scroll có thể được chạy lại sau lỗi
+        elapsed = time.perf_counter() - started
+        self.scroll_seconds = round(self.scroll_seconds + elapsed, 3)
+        self.metrics.observe('scroll', elapsed)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Scroll xong: {self.scroll_steps} bước "
+              f"trong {self.scroll_seconds}s")
+        return state['count']
+    
+    def _resume_reached(self, state: Dict) -> bool:
+        """
+        Grid đã tới vị trí của checkpoint: đủ số video đã load, hoặc scrollY đã qua
+        vị trí cũ (grid xóa node đã cuộn qua nên số video có thể không bao giờ đủ)
+        """
+        return (state['count'] >= self._checkpoint_loaded
+                or bool(self._resume_scroll_y and state.get('scrollY', 0) >= self._resume_scroll_y))
+    
+    async def _fast_forward(self, page, state: Dict) -> Dict:
+        """
+        --resume: scroll liên tục tới vị trí của checkpoint. Mỗi bước chỉ đợi grid
+        lớn thêm (không đợi response item_list, không ghi checkpoint, không in từng
+        bước); grid ngừng lớn trong scroll_idle_timeout thì quay về scroll thường.
+        Returns: state sau khi tua
+        """
+        started = time.perf_counter()
+        while (self.scroll_steps < MAX_SCROLL_STEPS and not self._resume_reached(state)
+               and not self._scroll_limit_reached(state)):
+            await self._pace()
+            self.metrics.count('cdp_calls')
+            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+            self.scroll_steps += 1
+            self.fast_forward_steps += 1
             try:
-                view_elem = video_elem.locator(view_selector)
-                if await view_elem.count() > 0:
-                    # Thử lấy title trước
-                    elem = view_elem.first
-                    title = await elem.get_attribute('title')
-                    if title and title.strip():
-                        clean_num = re.sub(r'[^\d]', '', title)
-                        if clean_num:
-                            view_count = int(clean_num)
-                            view_text = title
-                            source = f"title-{view_selector}"
-                            return (view_count, view_text, source)
-                    
-                    # Nếu không có title, lấy text
-                    text = await elem.text_content()
-                    if text and text.strip():
-                        view_text = text.strip()
-                        view_count = self.parse_view_count(view_text)
-                        source = f"text-{view_selector}"
-                        return (view_count, view_text, source)
-            except:
+                self.metrics.count('cdp_calls')
+                await page.wait_for_function(
+                    ITEMS_GREW_JS, arg={'selectors': self._video_selectors(), 'count': state['count']},
+                    timeout=self.scroll_idle_timeout
+                )
+            except Exception:
+                state = await self._read_scroll_state(page)
+                break
+            state = await self._read_scroll_state(page)
+        
+        # Checkpoint kế tiếp tính từ vị trí đã tua tới
+        self._checkpoint_step = self.scroll_steps
+        self.fast_forward_seconds = round(self.fast_forward_seconds + time.perf_counter() - started, 3)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] ♻️ Tua nhanh {self.fast_forward_steps} bước tới "
+              f"{state['count']}/{self._checkpoint_loaded} video trong {self.fast_forward_seconds}s")
+        return state
+    
+    async def _read_scroll_state(self, page) -> Dict:
+        """
+        Đọc trạng thái grid (số video, link cuối) trong 1 round-trip
+        """
+        self.metrics.count('cdp_calls')
+        return await page.evaluate(SCROLL_STATE_JS, {
+            'selectors': self._video_selectors(),
+            'tail': self.incremental_depth if self._known_ids else 0,
+        })
+    
+    async def _scroll_step(self, page, state: Dict) -> tuple:
+        """
+        Scroll một bước và đợi video mới
+        Returns: (state mới, có tiến triển hay không)
+        """
+        previous_count = state['count']
+        self._item_list_event.clear()
+        
+        # Scroll xuống cuối trang (mỗi bước kéo theo 1 request item_list)
+        await self._pace()
+        self.metrics.count('cdp_calls')
+        await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+        self.scroll_steps += 1
+        
+        response_seen = await self._wait_for_more(page, previous_count)
+        state = await self._read_scroll_state(page)
+        
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Scroll {self.scroll_steps}: {state['count']} video")
+        return state, state['count'] > previous_count or response_seen
+    
+    async def _wait_for_more(self, page, previous_count: int) -> bool:
+        """
+        Đợi số video tăng hoặc response item_list về, tối đa scroll_idle_timeout
+        Returns: True nếu đã thấy response item_list
+        """
+        self.metrics.count('cdp_calls')
+        growth = asyncio.ensure_future(page.wait_for_function(
+            ITEMS_GREW_JS, arg={'selectors': self._video_selectors(), 'count': previous_count},
+            timeout=self.scroll_idle_timeout
+        ))
+        response = asyncio.ensure_future(self._item_list_event.wait())
+        
+        done, pending = await asyncio.wait(
+            [growth, response], timeout=self.scroll_idle_timeout / 1000,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        # Bỏ qua TimeoutError của wait_for_function
+        await asyncio.gather(growth, response, return_exceptions=True)
+        
+        return response in done
+    
+    def _scroll_limit_reached(self, state: Dict) -> bool:
+        """
+        Kiểm tra điều kiện dừng --max-videos / --since
+        """
+        if self.max_videos and max(state['count'], self.video_count) >= self.max_videos:
+            return True
+        
+        if self.since and state['lastLink']:
+            video_id = video_id_from_link(state['lastLink'])
+            posted = video_timestamp(video_id) if video_id else None
+            if posted and posted < self.since:
+                return True
+        
+        if self._known_ids and self.incremental_depth:
+            # Incremental: dừng khi `incremental_depth` video cuối đều đã có trong store
+            tail = state.get('tailLinks') or []
+            if len(tail) >= self.incremental_depth and all(
+                video_id_from_link(link) in self._known_ids for link in tail
+            ):
+                return True
+        
+        return False
+    
+    def _sync_store(self, channel_url: str):
+        """
+        Ghi view mới vào store. Video đọc lỗi (views = 0) giữ view đã lưu thay vì
+        ghi đè. Ở chế độ incremental, các video cũ không được scroll tới sẽ lấy
+        view từ store (carry forward), rồi giới hạn max_videos / since được áp
+        lại trên danh sách đã gộp. views_delta chỉ tính trên các video vừa
+        scrape đã có trong store (lần scrape có thể chỉ là một phần của kênh).
+        """
+        channel = channel_key(channel_url)
+        stored = self.store.get_videos(channel)
+        
+        refreshed = []
+        scraped_ids = set()
+        views_delta = 0
+        for video in self.videos_data:
+            video_id = video_id_from_link(video.link)
+            if not video_id:
                 continue
+            scraped_ids.add(video_id)
+            row = stored.get(video_id)
+            if row is None:
+                refreshed.append(dict(video.to_dict(), video_id=video_id))
+            elif video.views <= 0 < row['views']:
+                # Không parse được view: dùng lại số đã lưu
+                self.total_views += row['views'] - video.views
+                video.views = row['views']
+                video.view_text = row['view_text'] or str(row['views'])
+                video.source = 'store'
+            else:
+                views_delta += video.views - row['views']
+                refreshed.append(dict(video.to_dict(), video_id=video_id))
+        self.store.upsert_videos(channel, refreshed)
+        self.refreshed_videos = len(refreshed)
         
-        return (view_count, view_text, source)
+        if self.incremental_depth:
+            for video_id, row in stored.items():
+                if video_id in scraped_ids:
+                    continue
+                self.videos_data.append(self._build_video_info(
+                    len(self.videos_data) + 1, row['views'], row['view_text'] or str(row['views']),
+                    'store', row['link'], row['caption']
+                ))
+            self.total_views = self.videos_data.total_views()
+            # Video gộp từ store cũng phải theo max_videos / since
+            self._apply_limits()
+        self.reused_videos = sum(1 for video in self.videos_data if video.source == 'store')
+        
+        # Chỉ so sánh được khi đã có dữ liệu từ lần trước
+        self.views_delta = views_delta if scraped_ids & stored.keys() else None
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Store: refresh {self.refreshed_videos} video, "
+              f"dùng lại {self.reused_videos} video")
     
-    async def scrape_channel(self, channel_url: str) -> Dict:
+    def _is_recent(self, video: Dict) -> bool:
         """
-        Scrape thông tin và tổng view từ kênh TikTok
+        Video có đăng từ mốc since trở đi không (không rõ ngày thì giữ lại)
+        """
+        video_id = video_id_from_link(video.link)
+        posted = video_timestamp(video_id) if video_id else None
+        return posted is None or posted >= self.since
+    
+    def _apply_limits(self):
+        """
+        Cắt danh sách video theo max_videos / since sau khi extract
+        """
+        videos = self.videos_data
+        
+        if self.since:
+            videos = VideoList(v for v in videos if self._is_recent(v))
+        
+        if self.max_videos:
+            videos = VideoList(videos[:self.max_videos])
+        
+        if len(videos) != len(self.videos_data):
+            for i, video in enumerate(videos, 1):
+                video.index = i
+            self.videos_data = videos
+            self.total_views = videos.total_views()
+    
+    async def iter_videos(self, channel_url: str):
+        """
+        Streaming API: yield từng video ngay khi nó xuất hiện trên grid.
+        
+            async for video in counter.iter_videos(url):
+                ...
+        
+        Video không được giữ lại trong self.videos_data; self.total_views và
+        self.video_count là tổng chạy (running aggregate).
         """
         async with async_playwright() as p:
-            # Khởi tạo browser với các options để tránh detection
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                ]
-            )
+            browser = await self.open_browser(p)
             
-            # Tạo context với user agent thực
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
+            try:
+                context = await self.new_context(browser)
+                page = await context.new_page()
+                try:
+                    async for video in self.iter_page_videos(page, channel_url):
+                        yield video
+                finally:
+                    await self.close_context(context, page)
+            finally:
+                await self.close_browser(browser)
+    
+    async def iter_page_videos(self, page, channel_url: str):
+        """
+        Như iter_videos nhưng chạy trên page có sẵn.
+        Sau mỗi bước scroll chỉ đọc các node mới (đánh dấu data-tvc-seen) nên
+        video không bị mất nếu grid xóa node đã cuộn qua; trùng lặp được loại
+        theo video ID (hoặc link).
+        """
+        self.reset()
+        await self._attach_page(page)
+        started = time.perf_counter()
+        
+        try:
+            await self.open_channel(page, channel_url)
+            self.channel_name = await self.read_channel_name(page)
             
-            page = await context.new_page()
+            idle_rounds = 0
+            state = await self._read_scroll_state(page)
             
-            try:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Đang truy cập: {channel_url}")
+            while True:
+                new_videos = await self._extract_new_videos(page, channel_url)
+                for video in new_videos:
+                    yield video
+                    if self.max_videos and video.index >= self.max_videos:
+                        return
                 
-                # Navigate với timeout dài hơn
-                await page.goto(channel_url, wait_until='networkidle', timeout=60000)
+                if self.scroll_steps >= MAX_SCROLL_STEPS or self._scroll_limit_reached(state):
+                    break
                 
-                # Đợi content load
-                await page.wait_for_timeout(5000)
-                
-                # Scroll để load thêm video
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Đang tải danh sách video...")
-                
-                previous_height = 0
-                scroll_attempts = 0
-                max_scrolls = 15
-                
-                while scroll_attempts < max_scrolls:
-                    # Scroll xuống cuối trang
-                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await page.wait_for_timeout(3000)
-                    
-                    # Kiểm tra chiều cao mới
-                    current_height = await page.evaluate('document.body.scrollHeight')
-                    
-                    if current_height == previous_height:
-                        scroll_attempts += 1
-                        if scroll_attempts >= 3:
-                            break
-                    else:
-                        scroll_attempts = 0
-                        previous_height = current_height
+                state, progressed = await self._scroll_step(page, state)
+                if progressed or new_videos:
+                    idle_rounds = 0
+                else:
+                    idle_rounds += 1
+                    if idle_rounds >= SCROLL_IDLE_ROUNDS:
+                        break
+            
+            # Đọc nốt các node xuất hiện ở bước scroll cuối
+            for video in await self._extract_new_videos(page, channel_url):
+                yield video
+                if self.max_videos and video.index >= self.max_videos:
+                    return
+        finally:
+            self.scroll_seconds = round(time.perf_counter() - started, 3)
+            self.metrics.observe('scroll', self.scroll_seconds)
+            self._cancel_transfer_sizes()
+            await self._detach_page(page)
+    
+    async def _extract_new_videos(self, page, channel_url: str) -> List[Dict]:
+        """
+        Đọc các video mới xuất hiện từ lần gọi trước (API trước, rồi tới DOM)
+        """
+        candidates = []
+        
+        if self.intercept:
+            await self.flush_intercepted()
+            for video_id, item in self.api_items.items():
+                if video_id not in self.seen_keys:
+                    candidates.append((video_id, self._video_from_api_item(0, video_id, item, channel_url)))
+        
+        while True:
+            batch_started = time.perf_counter()
+            batch = await self._evaluate_batch(page, 0, self.batch_size, onlyNew=True)
+            self.extraction_round_trips += 1
+            self.metrics.observe('selector_discovery', batch['discoveryMs'] / 1000)
+            if batch['selector'] and batch['items']:
+                self.metrics.record('video_selector', batch['selector'], len(batch['items']))
+            
+            for item in batch['items']:
+                key = video_id_from_link(item['link']) or item['link']
+                candidates.append((key, self._video_from_dom_item(0, item)))
+            
+            self.metrics.observe('video_extraction', time.perf_counter() - batch_started, len(batch['items']))
+            if len(batch['items']) < batch['limit']:
+                break
+        
+        videos = []
+        for key, video in candidates:
+            # Không nhận quá max_videos: video_count/total_views khớp với số video đã yield
+            if self.max_videos and self.video_count >= self.max_videos:
+                break
+            if key and key in self.seen_keys:
+                continue
+            if self.since and not self._is_recent(video):
+                continue
+            if key:
+                self.seen_keys.add(key)
+            
+            self.video_count += 1
+            video.index = self.video_count
+            self.total_views += video.views
+            videos.append(video)
+        
+        return videos
+    
+    async def stream_to_ndjson(self, channel_url: str, filename: str = None) -> Dict:
+        """
+        Ghi từng video ra file NDJSON (1 JSON/dòng, flush ngay sau mỗi dòng)
+        Returns: kết quả tổng hợp (không kèm danh sách video)
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            channel = channel_url.rstrip('/').split('/')[-1].replace('@', '')
+            filename = f"tiktok_views_{channel}_{timestamp}.ndjson"
+        
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                async for video in self.iter_videos(channel_url):
+                    f.write(json.dumps(video.to_dict(), ensure_ascii=False) + '\n')
+                    f.flush()
                     
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Scroll {scroll_attempts + 1}/{max_scrolls}")
+                    if self.video_count % 10 == 0 or video.views > 0:
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Video {self.video_count}: "
+                              f"{video.view_text} views (source: {video.source})")
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Lỗi khi scrape: {str(e)}")
+            return {
+                'error': str(e),
+                'channel_url': channel_url,
+                'scraped_at': datetime.now().isoformat()
+            }
+        
+        print(f"\n💾 Đã stream {self.video_count} video vào: {filename}")
+        return {
+            'channel_url': channel_url,
+            'channel_name': self.channel_name,
+            'total_videos': self.video_count,
+            'total_views': self.total_views,
+            'total_views_formatted': self.format_number(self.total_views),
+            'average_views': self.total_views // self.video_count if self.video_count else 0,
+            'videos': [],
+            'ndjson_file': filename,
+            'extraction_round_trips': self.extraction_round_trips,
+            'scroll_steps': self.scroll_steps,
+            'scroll_seconds': self.scroll_seconds,
+            'scraped_at': datetime.now().isoformat()
+        }
+    
+    async def scrape_channels(self, channel_urls: List[str], concurrency: int = 4):
+        """
+        Scrape nhiều kênh trên MỘT browser dùng chung với pool context/page.
+        Tối đa `concurrency` kênh chạy cùng lúc; kết quả được yield ngay khi
+        từng kênh xong (không theo thứ tự đầu vào).
+        
+        Thống kê throughput được lưu vào self.batch_stats.
+        """
+        queue = asyncio.Queue()
+        for url in channel_urls:
+            queue.put_nowait(url)
+        results = asyncio.Queue()
+        workers_count = max(1, min(concurrency, len(channel_urls)))
+        
+        self.batch_stats = {
+            'channels': 0,
+            'failed': 0,
+            'videos': 0,
+            'elapsed_seconds': 0.0,
+            'channels_per_minute': 0.0,
+            'videos_per_second': 0.0,
+        }
+        started = time.perf_counter()
+        
+        if self.fast_path:
+            # Kênh nào đọc được từ JSON rehydration thì không cần tới browser
+            async with HttpPool(limit_per_host=workers_count) as client:
+                async def fetch(url):
+                    return url, await self._spawn().fetch_channel_http(url, client)
                 
-                # Lấy thông tin channel
+                fallback = []
+                for future in asyncio.as_completed([fetch(url) for url in channel_urls]):
+                    url, result = await future
+                    if result is None:
+                        fallback.append(url)
+                        continue
+                    self.batch_stats['videos'] += result['total_videos']
+                    self.batch_stats['channels'] += 1
+                    self._update_batch_stats(started)
+                    yield result
+            
+            queue = asyncio.Queue()
+            for url in fallback:
+                queue.put_nowait(url)
+            workers_count = min(workers_count, len(fallback))
+            if not fallback:
+                return
+        
+        async with async_playwright() as p:
+            browser = await self.open_browser(p)
+            
+            async def recycle(context, page):
+                # Đóng context cũ (bỏ qua lỗi nếu page/context đã chết)
+                if context is None:
+                    return
                 try:
-                    channel_name = await page.locator('h1[data-e2e="user-title"]').text_content()
+                    await self.close_context(context, page)
                 except Exception:
-                    try:
-                        channel_name = await page.locator('h2[data-e2e="user-subtitle"]').text_content()
-                    except Exception:
-                        channel_name = "Unknown"
-                
-                # Tìm tất cả video items
-                video_selectors = [
-                    '[data-e2e="user-post-item"]',
-                    '[data-e2e="user-post-item-list"] > div',
-                    '.video-feed-item',
-                    'div[data-e2e="user-post-item-list"] div'
-                ]
-                
-                video_elements = []
-                for selector in video_selectors:
-                    try:
-                        elements = await page.locator(selector).all()
-                        if elements:
-                            video_elements = elements
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Sử dụng selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Tìm thấy {len(video_elements)} video")
-                
-                if not video_elements:
-                    print("[WARNING] Không tìm thấy video nào. Có thể cần cập nhật selector hoặc page chưa load đủ.")
-                
-                # Extract thông tin từ mỗi video
-                for i, video_elem in enumerate(video_elements, 1):
-                    try:
-                        # IMPROVED: Sử dụng hàm get_exact_view_count mới
-                        views, view_text, source = await self.get_exact_view_count(video_elem)
-                        
-                        # Lấy link video
+                    pass
+            
+            async def worker():
+                # Mỗi slot giữ 1 context + 1 page và dùng lại cho các kênh kế tiếp
+                context = page = None
+                try:
+                    while True:
                         try:
-                            link_elem = video_elem.locator('a').first
-                            video_link = await link_elem.get_attribute('href') if await video_elem.locator('a').count() > 0 else ""
-                            if video_link and not video_link.startswith('http'):
-                                video_link = f"https://www.tiktok.com{video_link}"
-                        except:
-                            video_link = ""
-                        
-                        # Lấy caption/description
+                            url = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
                         try:
-                            caption_selectors = [
-                                '[data-e2e="user-post-item-desc"]',
-                                '.video-meta-caption',
-                                'div[data-e2e="user-post-item-desc"]'
-                            ]
-                            caption = ""
-                            for cap_selector in caption_selectors:
-                                try:
-                                    caption_elem = video_elem.locator(cap_selector)
-                                    if await caption_elem.count() > 0:
-                                        caption = await caption_elem.first.text_content()
-                                        if caption:
-                                            break
-                                except:
-                                    continue
-                        except:
-                            caption = ""
-                        
-                        video_info = {
-                            'index': i,
-                            'views': views,
-                            'view_text': view_text,
-                            'source': source,  # IMPROVED: Ghi lại nguồn data
-                            'link': video_link,
-                            'caption': caption[:100] if caption else ""
-                        }
-                        
-                        self.videos_data.append(video_info)
-                        self.total_views += views
-                        
-                        # In progress với thông tin nguồn
-                        if i % 10 == 0 or views > 0:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Video {i}: {view_text} views (source: {source})")
-                        
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Lỗi khi xử lý video {i}: {str(e)}")
-                        continue
-                
-                # Tạo kết quả
-                result = {
-                    'channel_url': channel_url,
-                    'channel_name': channel_name,
-                    'total_videos': len(self.videos_data),
-                    'total_views': self.total_views,
-                    'total_views_formatted': self.format_number(self.total_views),
-                    'average_views': self.total_views // len(self.videos_data) if self.videos_data else 0,
-                    'videos': self.videos_data,
-                    'scraped_at': datetime.now().isoformat()
-                }
-                
-                return result
-                
-            except Exception as e:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Lỗi khi scrape: {str(e)}")
-                return {
-                    'error': str(e),
-                    'channel_url': channel_url,
-                    'scraped_at': datetime.now().isoformat()
-                }
+                            if context is None or page.is_closed():
+                                await recycle(context, page)
+                                context = await self.new_context(browser)
+                                page = await context.new_page()
+                            result = await self._spawn().scrape_page(page, url)
+                        except Exception as e:
+                            result = {'error': str(e), 'channel_url': url,
+                                      'scraped_at': datetime.now().isoformat()}
+                        if 'error' in result:
+                            # Page có thể đã hỏng: kênh kế tiếp dùng context mới
+                            await recycle(context, page)
+                            context = page = None
+                        await results.put(result)
+                finally:
+                    await recycle(context, page)
+            
+            async def run_workers():
+                try:
+                    await asyncio.gather(*(worker() for _ in range(workers_count)))
+                finally:
+                    await results.put(None)
+            
+            runner = asyncio.ensure_future(run_workers())
+            try:
+                while True:
+                    result = await results.get()
+                    if result is None:
+                        break
+                    
+                    if 'error' in result:
+                        self.batch_stats['failed'] += 1
+                    else:
+                        self.batch_stats['videos'] += result['total_videos']
+                    self.batch_stats['channels'] += 1
+                    self._update_batch_stats(started)
+                    yield result
                 
+                await runner
             finally:
-                await browser.close()
+                runner.cancel()
+                await self.close_browser(browser)
+                self._update_batch_stats(started)
+    
+    def _update_batch_stats(self, started: float):
+        """
+        Cập nhật throughput tổng hợp: kênh/phút và video/giây
+        """
+        elapsed = time.perf_counter() - started
+        stats = self.batch_stats
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        if elapsed > 0:
+            stats['channels_per_minute'] = round(stats['channels'] / elapsed * 60, 2)
+            stats['videos_per_second'] = round(stats['videos'] / elapsed, 2)
+        if self.rate_limiter:
+            stats['rate_limit'] = self.rate_limiter.snapshot()
     
     def format_number(self, num: int) -> str:
         """
@@ -328,6 +2290,9 @@ class TikTokViewCounter:
         
         if 'error' in data:
             print(f"❌ Lỗi: {data['error']}")
+            if data.get('checkpoint'):
+                print(f"💾 Đã lưu checkpoint {data['checkpoint_videos']} video: {data['checkpoint']} "
+                      f"(chạy lại với --resume để tiếp tục)")
             return
         
         print(f"📱 Kênh: {data['channel_name']}")
@@ -340,27 +2305,73 @@ class TikTokViewCounter:
         
         print(f"🕐 Thời gian scrape: {data['scraped_at']}")
         
+        if 'startup_seconds' in data:
+            print(f"🚀 Khởi động → điều hướng đầu tiên: {data['startup_seconds']}s ({data['browser_mode']})")
+        
+        if 'extraction_round_trips' in data:
+            print(f"🔁 Round-trip extract: {data['extraction_round_trips']}")
+        
+        if 'scroll_seconds' in data:
+            print(f"📜 Scroll: {data['scroll_steps']} bước trong {data['scroll_seconds']}s")
+        
+        if 'rate_limit' in data:
+            self.print_rate_limit(data['rate_limit'])
+        
+        if data.get('enrich_candidates'):
+            print(f"🔎 Enrich: {data['enriched_videos']}/{data['enrich_candidates']} video lấy view chính xác "
+                  f"từ trang video ({data['enrich_failed']} lỗi) trong {data['enrich_seconds']}s; "
+                  f"sai số làm tròn tối đa ±{self.format_number(data['rounding_error_before'])} "
+                  f"→ ±{self.format_number(data['rounding_error_after'])}")
+        
+        plan = data.get('selector_plan')
+        if plan and plan['source']:
+            checked = plan['hits'] + plan['misses']
+            print(f"🧭 Selector plan ({'đã lưu' if plan['source'] == 'cache' else 'vừa học'}, {plan['fingerprint']}): "
+                  f"trúng {plan['hits']}/{checked} video, dò lại {plan['reprobes']} lần")
+        
+        if data.get('phase_retries'):
+            print(f"🔄 Phase chạy lại trên cùng page: {data['phase_retries']} lần (không phải mở lại browser)")
+        
+        if data.get('resumed_videos'):
+            print(f"♻️ Resume: nạp {data['resumed_videos']} video từ checkpoint, tua nhanh "
+                  f"{data['fast_forward_steps']} bước scroll trong {data['fast_forward_seconds']}s "
+                  f"(không checkpoint/đợi idle); {data['recovered_videos']} video chỉ còn trong checkpoint được gộp lại")
+        
+        if 'blocked_requests' in data:
+            blocked = ', '.join(f"{k}: {v}" for k, v in sorted(data['blocked_requests'].items())) or '0'
+            print(f"🚫 Request bị chặn: {blocked} (ước lượng thô ~{self.format_number(data['blocked_bytes_rough_estimate'])}B "
+                  f"theo dung lượng giả định mỗi nhóm, không phải số đo)")
+        
+        if data.get('transferred_bytes'):
+            unmeasured = f" ({data['unmeasured_responses']} response chưa đo được)" if data.get('unmeasured_responses') else ""
+            print(f"📦 Dung lượng tải: {self.format_number(data['transferred_bytes'])}B{unmeasured}")
+        
+        if 'refreshed_videos' in data:
+            print(f"🗄️ Store: refresh {data['refreshed_videos']} video, dùng lại {data['reused_videos']} video")
+            if data['views_delta'] is not None:
+                print(f"📈 Thay đổi view (video đã có trong store): {data['views_delta']:+,}")
+        
+        if data.get('api_responses'):
+            print(f"📡 Response item_list: {data['api_responses']}")
+        
         # Thống kê nguồn dữ liệu
         if data['videos']:
-            sources = {}
-            for video in data['videos']:
-                src = video.get('source', 'unknown')
-                sources[src] = sources.get(src, 0) + 1
+            # Một lần duyệt: đếm nguồn, đếm video có view, giữ top 10 bằng heap
+            sources, with_views, top_videos = summarize_videos(data['videos'], 10)
             
             print(f"\n📊 NGUỒN DỮ LIỆU:")
             for src, count in sources.items():
                 print(f"  - {src}: {count} videos")
             
-            # Lọc video có views > 0
-            videos_with_views = [v for v in data['videos'] if v['views'] > 0]
-            print(f"\n📌 VIDEO CÓ VIEW DATA: {len(videos_with_views)}/{len(data['videos'])}")
+            print(f"\n📌 VIDEO CÓ VIEW DATA: {with_views}/{len(data['videos'])}")
             print("-"*60)
             
-            if videos_with_views:
-                # Sắp xếp theo views
-                sorted_videos = sorted(videos_with_views, key=lambda x: x['views'], reverse=True)
-                for i, video in enumerate(sorted_videos[:10], 1):
+            if top_videos:
+                for i, video in enumerate(top_videos, 1):
                     print(f"{i}. {self.format_number(video['views'])} views ({video['view_text']}) [src: {video['source']}]")
+                    if video.get('likes') is not None:
+                        print(f"   ❤️ {self.format_number(video['likes'])}  💬 {self.format_number(video.get('comments', 0))}  "
+                              f"🔁 {self.format_number(video.get('shares', 0))}")
                     if video['caption']:
                         print(f"   Caption: {video['caption'][:70]}...")
                     if video['link']:
@@ -369,6 +2380,30 @@ class TikTokViewCounter:
         
         print("="*60)
     
+    def print_batch_summary(self, stats: Dict):
+        """
+        In thống kê throughput của một lần scrape nhiều kênh
+        """
+        print("\n" + "="*60)
+        print("📊 TỔNG KẾT SCRAPE NHIỀU KÊNH")
+        print("="*60)
+        print(f"📱 Số kênh: {stats.get('channels', 0)} (lỗi: {stats.get('failed', 0)})")
+        print(f"📹 Tổng số video: {stats.get('videos', 0)}")
+        print(f"⏱️ Thời gian: {stats.get('elapsed_seconds', 0)}s")
+        print(f"🚀 Throughput: {stats.get('channels_per_minute', 0)} kênh/phút, "
+              f"{stats.get('videos_per_second', 0)} video/giây")
+        if 'rate_limit' in stats:
+            self.print_rate_limit(stats['rate_limit'])
+        print("="*60)
+    
+    def print_rate_limit(self, rate: Dict):
+        """
+        In trạng thái rate controller
+        """
+        print(f"🚦 Rate: {rate['rate']} req/s (đỉnh {rate['peak_rate']}), {rate['requests']} request, "
+              f"giảm tốc {rate['backoffs']} lần (429/5xx: {rate['throttled']}, latency vọt: {rate['latency_spikes']}), "
+              f"chờ tổng {rate['wait_seconds']}s")
+    
     async def save_to_file(self, data: Dict, filename: str = None):
         """
         Lưu kết quả vào file JSON
@@ -379,11 +2414,126 @@ class TikTokViewCounter:
             filename = f"tiktok_views_{channel_name}_{timestamp}.json"
         
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=video_to_json)
         
         print(f"\n💾 Đã lưu kết quả vào: {filename}")
 
+def load_urls_file(path: str) -> List[str]:
+    """
+    Đọc danh sách URL kênh (bỏ qua dòng trống và dòng bắt đầu bằng #)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+def parse_block_arg(value: str) -> List[str]:
+    """
+    Parse giá trị --block (ví dụ "media,image,font,analytics")
+    """
+    categories = [c.strip() for c in value.split(',') if c.strip()]
+    unknown = [c for c in categories if c not in BLOCK_CATEGORIES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown block type(s): {', '.join(unknown)} (choose from {', '.join(BLOCK_CATEGORIES)})"
+        )
+    return categories
+
+async def run_batch(counter: TikTokViewCounter, urls: List[str], args):
+    """
+    Scrape nhiều kênh song song và in kết quả ngay khi từng kênh xong
+    """
+    print(f"🚀 Bắt đầu scrape {len(urls)} kênh (concurrency: {args.concurrency})")
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    
+    async for result in counter.scrape_channels(urls, concurrency=args.concurrency):
+        if 'error' in result:
+            print(f"❌ {result['channel_url']}: {result['error']}")
+        else:
+            print(f"✅ {result['channel_url']}: {result['total_videos']} video, "
+                  f"{result['total_views_formatted']} views")
+            if args.save:
+                await counter.save_to_file(result)
+            if archive:
+                archive.append_snapshot(result)
+    
+    counter.print_batch_summary(counter.batch_stats)
+
+async def run_sharded(counter: TikTokViewCounter, counter_kwargs: Dict, urls: List[str], args):
+    """
+    Scrape nhiều kênh trên nhiều process (mỗi process 1 browser), gộp kết quả thành 1 stream
+    """
+    print(f"🚀 Bắt đầu scrape {len(urls)} kênh trên {args.processes} process")
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    runner = ShardedRunner(counter_kwargs, workers=args.processes,
+                           pages_per_worker=args.pages_per_worker,
+                           max_rss_mb=args.max_worker_rss, db_path=args.db,
+                           rate_limiter=counter.rate_limiter,
+                           metrics=counter.metrics if args.metrics else None)
+    
+    for result in runner.run(urls):
+        if counter.rate_limiter:
+            runner.stats['rate_limit'] = counter.rate_limiter.snapshot()
+        if 'error' in result:
+            print(f"❌ {result['channel_url']}: {result['error']}")
+        else:
+            print(f"✅ {result['channel_url']}: {result['total_videos']} video, "
+                  f"{result['total_views_formatted']} views")
+            if args.save:
+                await counter.save_to_file(result)
+            if archive:
+                archive.append_snapshot(result)
+    
+    counter.print_batch_summary(runner.stats)
+    print(f"♻️ Worker: {runner.stats['workers_started']} đã chạy, {runner.stats['recycled']} được thay mới, "
+          f"{runner.stats['crashed']} crash ({runner.stats['requeued']} kênh chạy lại), "
+          f"peak RSS {runner.stats['peak_worker_rss'] / 1024 / 1024:.0f} MB")
+    if args.metrics:
+        counter.metrics.save(args.metrics)
+        print(f"📈 Đã lưu metrics (gộp từ mọi worker) vào: {args.metrics}")
+
+async def run_daemon(counter: TikTokViewCounter, urls: List[str], args):
+    """
+    Theo dõi các kênh liên tục tới khi bị dừng (Ctrl+C)
+    """
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    
+    def on_result(result: Dict):
+        if archive and 'error' not in result:
+            archive.append_snapshot(result)
+    
+    tracker = ChannelTracker(counter, urls, interval=args.interval * 60,
+                             max_pages=args.concurrency, on_result=on_result)
+    try:
+        await tracker.run(status_port=args.status_port)
+    finally:
+        if args.metrics:
+            counter.metrics.save(args.metrics)
+
+async def serve_main(argv: List[str]):
+    """
+    `tiktok_counter.py serve`: chạy browser server cho các lần chạy --connect
+    """
+    parser = argparse.ArgumentParser(prog='tiktok_counter.py serve',
+                                     description='Long-lived browser server for --connect')
+    parser.add_argument('--port', type=int, default=browser_server.DEFAULT_PORT,
+                       help='CDP websocket port (0 = pick a free port)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--profile-dir', default=browser_server.DEFAULT_PROFILE_DIR,
+                       help='Directory keeping cookies, storage state and HTTP cache')
+    parser.add_argument('--headless', action='store_false', default=True,
+                       help='Run browser in non-headless mode (show browser window)')
+    
+    args = parser.parse_args(argv)
+    counter = TikTokViewCounter(headless=args.headless)
+    try:
+        await browser_server.serve(counter, args.profile_dir, args.port, args.host)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
 async def main():
+    if sys.argv[1:2] == ['serve']:
+        await serve_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(description='TikTok Channel Views Counter - IMPROVED')
     parser.add_argument('url', nargs='?', default='https://www.tiktok.com/@huongzang007',
                        help='TikTok channel URL')
@@ -391,24 +2541,137 @@ async def main():
                        help='Run browser in non-headless mode (show browser window)')
     parser.add_argument('--save', action='store_true',
                        help='Save results to JSON file')
+    parser.add_argument('--batch-size', type=int, default=500,
+                       help='Number of videos extracted per page.evaluate round-trip')
+    parser.add_argument('--intercept', action='store_true',
+                       help='Read exact play counts from item-list API responses')
+    parser.add_argument('--max-videos', type=int,
+                       help='Stop scrolling once this many videos are loaded')
+    parser.add_argument('--since', type=datetime.fromisoformat,
+                       help='Stop scrolling at videos posted before this date (YYYY-MM-DD)')
+    parser.add_argument('--ndjson', nargs='?', const='', default=None, metavar='FILE',
+                       help='Stream videos to an NDJSON file while scrolling (one record per line)')
+    parser.add_argument('--db', metavar='PATH',
+                       help='SQLite store keeping the latest count of every video')
+    parser.add_argument('--incremental', type=int, nargs='?', const=12, default=0, metavar='DEPTH',
+                       help='With --db: stop scrolling after DEPTH already-known videos and reuse stored counts')
+    parser.add_argument('--block', type=parse_block_arg,
+                       default=[], metavar='TYPES',
+                       help=f"Block request types while scraping, comma-separated ({','.join(BLOCK_CATEGORIES)})")
+    parser.add_argument('--connect', nargs='?', const='', default=None, metavar='WS_ENDPOINT',
+                       help="Attach to a running 'serve' browser (default: endpoint of the local profile dir)")
+    parser.add_argument('--storage-state', metavar='PATH',
+                       help='Load cookies/localStorage from this file into new browser contexts')
+    parser.add_argument('--enrich', type=int, nargs='?', const=0, default=None, metavar='MAX_PAGES',
+                       help='Open the video page of items with rounded or missing counts (largest rounding '
+                            'error first) to get exact views, likes, comments and shares; MAX_PAGES caps the visits')
+    parser.add_argument('--enrich-tabs', type=int, default=ENRICH_TABS,
+                       help='With --enrich: number of reused tabs loading video pages concurrently')
+    parser.add_argument('--checkpoint-dir', metavar='DIR',
+                       help='Periodically save extracted videos and scroll position of each channel here '
+                            f'(off by default; --resume alone uses {DEFAULT_CHECKPOINT_DIR})')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue from the checkpoint left by an interrupted run '
+                            '(fast-scrolls back to the saved position)')
+    parser.add_argument('--selector-plans', nargs='?', const=DEFAULT_PLAN_FILE, default=None, metavar='PATH',
+                       help=f"Remember which video/view/caption selectors hit for each page structure and "
+                            f"query those first on later items and runs (default file: {DEFAULT_PLAN_FILE})")
+    parser.add_argument('--rate', type=float, default=2.0, metavar='REQ_PER_SEC',
+                       help='Initial request rate shared by all pages/workers; adapts up while responses '
+                            'stay healthy and backs off on 429/5xx or latency spikes (0 = no pacing)')
+    parser.add_argument('--max-rate', type=float, default=10.0, metavar='REQ_PER_SEC',
+                       help='Upper bound for the adaptive request rate')
+    parser.add_argument('--fast', action='store_true',
+                       help='Read the JSON embedded in the profile HTML over plain HTTP first; '
+                            'launch the browser only when it is missing or incomplete')
+    parser.add_argument('--urls-file',
+                       help='File with one channel URL per line (scraped over one shared browser)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='Max channels scraped at the same time with --urls-file')
+    parser.add_argument('--processes', type=int, metavar='N',
+                       help='With --urls-file: shard channels across N worker processes, one browser each')
+    parser.add_argument('--pages-per-worker', type=int, default=50,
+                       help='With --processes: restart a worker (and its browser) after this many channels')
+    parser.add_argument('--max-worker-rss', type=int, default=1500, metavar='MB',
+                       help='With --processes: restart a worker once its process tree uses more memory than this')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Keep the browser warm and re-scrape the channels on a schedule')
+    parser.add_argument('--interval', type=float, default=60,
+                       help='With --daemon: base refresh interval in minutes (fast-growing channels go sooner)')
+    parser.add_argument('--status-port', type=int, metavar='PORT',
+                       help='With --daemon: serve queue depth, latency and throughput at http://127.0.0.1:PORT/status')
+    parser.add_argument('--archive', metavar='DIR',
+                       help='Append each result as a snapshot to a columnar archive directory')
+    parser.add_argument('--metrics', metavar='PATH',
+                       help='Write per-phase timings and CDP call counts (.prom -> Prometheus, else JSON)')
     
     args = parser.parse_args()
     
-    print(f"🚀 Bắt đầu scrape kênh: {args.url}")
-    print(f"🖥️ Chế độ headless: {args.headless}")
+    if args.incremental and not args.db:
+        parser.error('--incremental requires --db')
+    
+    if args.resume and not args.checkpoint_dir:
+        args.checkpoint_dir = DEFAULT_CHECKPOINT_DIR
+    
+    if args.connect == '':
+        args.connect = browser_server.read_endpoint()
+        if not args.connect:
+            parser.error("--connect: no running browser server found (start one with 'tiktok_counter.py serve')")
+    
+    # Rate controller dùng chung (bộ nhớ chia sẻ khi chạy nhiều process)
+    rate_limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.max_rate,
+                                       shared=bool(args.urls_file and args.processes)) if args.rate > 0 else None
     
     # Khởi tạo counter
-    counter = TikTokViewCounter(headless=args.headless)
+    counter_kwargs = dict(headless=args.headless, batch_size=args.batch_size,
+                          intercept=args.intercept, max_videos=args.max_videos,
+                          since=args.since, incremental_depth=args.incremental, block=args.block,
+                          fast_path=args.fast, connect=args.connect, storage_state=args.storage_state,
+                          checkpoint_dir=args.checkpoint_dir,
+                          resume=args.resume, enrich=args.enrich, enrich_tabs=args.enrich_tabs,
+                          selector_plans=args.selector_plans)
+    counter = TikTokViewCounter(store=VideoStore(args.db) if args.db else None,
+                                metrics=Metrics() if args.metrics else None,
+                                rate_limiter=rate_limiter, **counter_kwargs)
+    
+    if args.daemon:
+        await run_daemon(counter, load_urls_file(args.urls_file) if args.urls_file else [args.url], args)
+        return
+    
+    if args.urls_file and args.processes:
+        await run_sharded(counter, counter_kwargs, load_urls_file(args.urls_file), args)
+        return
+    
+    if args.urls_file:
+        await run_batch(counter, load_urls_file(args.urls_file), args)
+        if args.metrics:
+            counter.metrics.save(args.metrics)
+        return
+    
+    print(f"🚀 Bắt đầu scrape kênh: {args.url}")
+    print(f"🖥️ Chế độ headless: {args.headless}")
     
     # Scrape channel
-    result = await counter.scrape_channel(args.url)
+    if args.ndjson is not None:
+        result = await counter.stream_to_ndjson(args.url, args.ndjson or None)
+    else:
+        result = await counter.scrape_channel(args.url)
     
     # In báo cáo
-    counter.print_report(result)
+    with counter.metrics.phase('report'):
+        counter.print_report(result)
     
     # Lưu file nếu cần
     if args.save:
         await counter.save_to_file(result)
+    
+    if args.archive and 'error' not in result:
+        SnapshotArchive(args.archive).append_snapshot(result)
+        print(f"📦 Đã ghi snapshot vào archive: {args.archive}")
+    
+    if args.metrics:
+        counter.metrics.save(args.metrics)
+        print(f"📈 Đã lưu metrics vào: {args.metrics}")
 
 if __name__ == "__main__":
     print("""
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Tracker daemon - theo dõi nhiều kênh TikTok theo lịch, giữ browser luôn chạy
+Kênh có view tăng nhanh được refresh thường xuyên hơn kênh ít biến động.
+Trạng thái (queue, latency, throughput) xem qua HTTP endpoint local.
+"""
+
+import asyncio
+import heapq
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+from fast_path import HttpPool
+
+
+class ChannelState:
+    """
+    Lịch + lịch sử gần nhất của một kênh
+    """
+
+    __slots__ = ('url', 'interval', 'next_run', 'total_views', 'last_scraped',
+                 'velocity', 'runs', 'failures', 'last_latency', 'last_error')
+
+    def __init__(self, url: str, interval: float):
+        self.url = url
+        self.interval = interval
+        self.next_run = 0.0
+        self.total_views = None
+        self.last_scraped = None  # time.monotonic() của lần scrape thành công gần nhất
+        self.velocity = None  # views/giờ giữa 2 lần scrape gần nhất
+        self.runs = 0
+        self.failures = 0
+        self.last_latency = None
+        self.last_error = None
+
+
+class ChannelTracker:
+    """
+    Daemon theo dõi danh sách kênh trên MỘT browser được giữ ấm.
+
+    Lịch: mỗi kênh có interval riêng, tính từ tốc độ tăng view (views/giờ)
+    so với trung vị của các kênh; kênh tăng nhanh -> interval ngắn (>= min_interval),
+    kênh không đổi -> max_interval. Mỗi lần hẹn được cộng jitter ±jitter.
+    Tối đa max_pages page chạy cùng lúc cho toàn bộ daemon.
+    """
+
+    def __init__(self, counter, channel_urls: List[str], interval: float = 3600,
+                 min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 jitter: float = 0.1, max_pages: int = 4, on_result=None):
+        self.counter = counter
+        self.interval = interval  # Interval mặc định (giây) khi chưa biết tốc độ
+        self.min_interval = min_interval or interval / 8
+        self.max_interval = max_interval or interval * 4
+        self.jitter = jitter
+        self.max_pages = max(1, max_pages)
+        self.on_result = on_result  # callback(result) sau mỗi lần scrape
+
+        self.channels = {url: ChannelState(url, interval) for url in dict.fromkeys(channel_urls)}
+        self._schedule = []  # heap (next_run, url)
+        self._queue = asyncio.Queue()  # Kênh đã tới hạn, đợi page trống
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+
+        self.browser = None
+        self._http = None  # Pool HTTP cho fast path (counter.fast_path)
+        self._browser_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.started_at = None
+        self.stats = {
+            'runs': 0,
+            'failed': 0,
+            'videos': 0,
+            'last_run': None,
+        }
+
+        # Kênh đầu tiên chạy ngay, các kênh sau rải đều trong vài giây đầu
+        now = time.monotonic()
+        for i, state in enumerate(self.channels.values()):
+            state.next_run = now + i * min(1.0, self.min_interval)
+            heapq.heappush(self._schedule, (state.next_run, state.url))
+
+    def next_interval(self, state: ChannelState) -> float:
+        """
+        Interval cho lần scrape kế tiếp (chưa cộng jitter)
+        """
+        if state.velocity is None:
+            return self.interval
+        if state.velocity <= 0:
+            return self.max_interval
+
+        velocities = [s.velocity for s in self.channels.values() if s.velocity]
+        reference = statistics.median(velocities) if velocities else state.velocity
+        interval = self.interval * reference / state.velocity
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _reschedule(self, state: ChannelState, interval: float):
+        state.interval = interval
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        state.next_run = time.monotonic() + delay
+        heapq.heappush(self._schedule, (state.next_run, state.url))
+        self._wakeup.set()
+
+    def _record_result(self, state: ChannelState, result: Dict, latency: float):
+        """
+        Cập nhật tốc độ view + thống kê sau một lần scrape
+        """
+        now = time.monotonic()
+        state.runs += 1
+        state.last_latency = round(latency, 3)
+        self.stats['runs'] += 1
+        self.stats['last_run'] = {
+            'channel_url': state.url,
+            'latency_seconds': state.last_latency,
+            'finished_at': datetime.now().isoformat(),
+        }
+
+        if 'error' in result:
+            state.failures += 1
+            state.last_error = result['error']
+            self.stats['failed'] += 1
+            return
+
+        state.last_error = None
+        self.stats['videos'] += result['total_videos']
+        if state.total_views is not None and state.last_scraped is not None:
+            hours = (now - state.last_scraped) / 3600
+            if hours > 0:
+                state.velocity = max(0, result['total_views'] - state.total_views) / hours
+        state.total_views = result['total_views']
+        state.last_scraped = now
+
+    async def _ensure_browser(self, p):
+        """
+        Browser dùng chung cho mọi page; tự khởi động lại nếu bị crash
+        """
+        async with self._browser_lock:
+            if self.browser is None or not self.browser.is_connected():
+                self.browser = await self.counter.open_browser(p)
+            return self.browser
+
+    async def _scheduler(self):
+        """
+        Đẩy kênh tới hạn vào queue, ngủ tới lần hẹn gần nhất
+        """
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, url = heapq.heappop(self._schedule)
+                self._queue.put_nowait(url)
+
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self, p):
+        """
+        Một slot page: giữ 1 context + 1 page, dùng lại cho các kênh kế tiếp
+        """
+        context = None
+        page = None
+        try:
+            while True:
+                url = await self._queue.get()
+                state = self.channels[url]
+
+                self.in_flight += 1
+                started = time.perf_counter()
+                try:
+                    result = None
+                    if self._http:
+                        result = await self.counter._spawn().fetch_channel_http(url, self._http)
+                    if result is None:
+                        browser = await self._ensure_browser(p)
+                        if context is None or context.browser is not browser or page.is_closed():
+                            context = await self.counter.new_context(browser)
+                            page = await context.new_page()
+                        result = await self.counter._spawn().scrape_page(page, url)
+                except Exception as e:
+                    result = {'error': str(e), 'channel_url': url, 'scraped_at': datetime.now().isoformat()}
+                finally:
+                    self.in_flight -= 1
+                latency = time.perf_counter() - started
+
+                self._record_result(state, result, latency)
+                if 'error' in result:
+                    # Page có thể đã hỏng: lần sau tạo context mới
+                    await self._close_context(context, page)
+                    context = None
+                    self._reschedule(state, self.min_interval)
+                    print(f"❌ {url}: {result['error']}")
+                else:
+                    self._reschedule(state, self.next_interval(state))
+                    print(f"✅ {url}: {result['total_views_formatted']} views, "
+                          f"{latency:.1f}s, lần tới sau {state.interval / 60:.1f} phút")
+
+                if self.on_result:
+                    self.on_result(result)
+        finally:
+            await self._close_context(context, page)
+
+    async def _close_context(self, context, page):
+        if context is None:
+            return
+        try:
+            await self.counter.close_context(context, page)
+        except Exception:
+            pass
+
+    def status(self) -> Dict:
+        """
+        Trạng thái daemon cho endpoint /status
+        """
+        now = time.monotonic()
+        elapsed = now - self.started_at if self.started_at else 0.0
+        latencies = [s.last_latency for s in self.channels.values() if s.last_latency is not None]
+
+        return {
+            'uptime_seconds': round(elapsed, 1),
+            'queue_depth': self._queue.qsize(),
+            'in_flight': self.in_flight,
+            'max_pages': self.max_pages,
+            'runs': self.stats['runs'],
+            'failed': self.stats['failed'],
+            'last_run': self.stats['last_run'],
+            'average_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            'rate_limit': self.counter.rate_limiter.snapshot() if self.counter.rate_limiter else None,
+            'throughput': {
+                'channels_per_minute': round(self.stats['runs'] / elapsed * 60, 2) if elapsed else 0.0,
+                'videos_per_second': round(self.stats['videos'] / elapsed, 2) if elapsed else 0.0,
+            },
+            'channels': [
+                {
+                    'channel_url': s.url,
+                    'next_run_in_seconds': round(max(0.0, s.next_run - now), 1),
+                    'interval_seconds': round(s.interval, 1),
+                    'views_per_hour': round(s.velocity, 1) if s.velocity is not None else None,
+                    'total_views': s.total_views,
+                    'runs': s.runs,
+                    'failures': s.failures,
+                    'last_latency_seconds': s.last_latency,
+                    'last_error': s.last_error,
+                }
+                for s in sorted(self.channels.values(), key=lambda s: s.next_run)
+            ],
+        }
+
+    async def _handle_status(self, reader, writer):
+        """
+        HTTP tối giản: GET /status (hoặc /) trả JSON, còn lại 404
+        """
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+            if path.split('?')[0] in ('/', '/status'):
+                body = json.dumps(self.status(), ensure_ascii=False, indent=2).encode('utf-8')
+                head = '200 OK'
+            else:
+                body = b'{"error": "not found"}'
+                head = '404 Not Found'
+
+            writer.write(
+                f'HTTP/1.1 {head}\r\nContent-Type: application/json\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start_status_server(self, port: int, host: str = '127.0.0.1'):
+        """
+        Chạy endpoint trạng thái trên cùng event loop với daemon
+        """
+        return await asyncio.start_server(self._handle_status, host, port)
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    async def run(self, status_port: Optional[int] = None, status_host: str = '127.0.0.1'):
+        """
+        Chạy daemon tới khi stop() được gọi (hoặc task bị cancel)
+        """
+        self.started_at = time.monotonic()
+        server = None
+        if status_port is not None:
+            server = await self.start_status_server(status_port, status_host)
+            port = server.sockets[0].getsockname()[1]
+            print(f"📡 Status: http://{status_host}:{port}/status")
+
+        print(f"🛰️ Theo dõi {len(self.channels)} kênh, tối đa {self.max_pages} page cùng lúc")
+
+        async with async_playwright() as p:
+            if self.counter.fast_path:
+                # Browser chỉ được mở khi có kênh không đọc được qua HTTP
+                self._http = HttpPool(limit_per_host=self.max_pages)
+            else:
+                await self._ensure_browser(p)
+            tasks = [asyncio.ensure_future(self._scheduler())]
+            tasks += [asyncio.ensure_future(self._worker(p)) for _ in range(self.max_pages)]
+            try:
+                await self._stopped.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if server:
+                    server.close()
+                    await server.wait_closed()
+                if self._http:
+                    await self._http.close()
+                if self.browser:
+                    await self.counter.close_browser(self.browser)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Bản ghi video gọn cho TikTok View Counter
+VideoRecord dùng __slots__ thay cho dict và lưu nguồn view (source) dưới dạng mã
+số trỏ vào bảng chuỗi dùng chung, nên mỗi video không còn giữ một bản sao của
+chuỗi selector dài. VideoList vẫn xuất được đúng schema dict cũ khi ghi JSON.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bảng nguồn view dùng chung trong process: mã -> chuỗi, chuỗi -> mã
+SOURCES: List[str] = []
+_SOURCE_CODES: Dict[str, int] = {}
+
+VIDEO_FIELDS = ('index', 'views', 'view_text', 'source', 'link', 'caption')
+# Chỉ có khi đọc được từ API/trang video (None = chưa biết, không ghi ra JSON)
+DETAIL_FIELDS = ('likes', 'comments', 'shares')
+
+
+def source_code(source: str) -> int:
+    """
+    Mã của chuỗi nguồn trong bảng dùng chung (thêm mới nếu chưa có)
+    """
+    code = _SOURCE_CODES.get(source)
+    if code is None:
+        code = _SOURCE_CODES[source] = len(SOURCES)
+        SOURCES.append(source)
+    return code
+
+
+class VideoRecord:
+    """
+    Một video trong kết quả scrape. Đọc được như dict chỉ đọc (video['views'],
+    video.get('link'), 'views' in video, dict(video)) để code cũ không phải đổi;
+    to_dict() trả về schema JSON. Không phải dict nên json.dumps cần
+    default=video_to_json (hoặc VideoList.to_dicts()).
+    """
+
+    __slots__ = ('index', 'views', 'view_text', 'source_code', 'link', 'caption', 'likes', 'comments', 'shares')
+
+    def __init__(self, index: int, views: int, view_text: str, source: str, link: str, caption: str,
+                 likes: Optional[int] = None, comments: Optional[int] = None, shares: Optional[int] = None):
+        self.index = index
+        self.views = views
+        self.view_text = view_text
+        code = _SOURCE_CODES.get(source)  # Tra thẳng bảng: hàm này chạy cho mỗi video
+        self.source_code = source_code(source) if code is None else code
+        self.link = link
+        self.caption = caption
+        self.likes = likes
+        self.comments = comments
+        self.shares = shares
+
+    @property
+    def source(self) -> str:
+        return SOURCES[self.source_code]
+
+    @source.setter
+    def source(self, value: str):
+        self.source_code = source_code(value)
+
+    def to_dict(self) -> Dict:
+        data = {
+            'index': self.index,
+            'views': self.views,
+            'view_text': self.view_text,
+            'source': SOURCES[self.source_code],
+            'link': self.link,
+            'caption': self.caption,
+        }
+        for field in DETAIL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+    def keys(self) -> Tuple[str, ...]:
+        """
+        Các khóa giống to_dict(): field chi tiết chỉ có khi đã biết giá trị
+        """
+        return VIDEO_FIELDS + tuple(field for field in DETAIL_FIELDS if getattr(self, field) is not None)
+
+    def __getitem__(self, key: str):
+        if key not in VIDEO_FIELDS and key not in DETAIL_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        if key in VIDEO_FIELDS:
+            return True
+        return key in DETAIL_FIELDS and getattr(self, key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, key: str, default=None):
+        if key not in VIDEO_FIELDS and key not in DETAIL_FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __reduce__(self):
+        # Mã nguồn chỉ có nghĩa trong process hiện tại: pickle bằng chuỗi
+        return (VideoRecord, (self.index, self.views, self.view_text, self.source, self.link, self.caption,
+                              self.likes, self.comments, self.shares))
+
+    def __repr__(self):
+        return f"VideoRecord({self.to_dict()!r})"
+
+
+class VideoList(list):
+    """
+    Danh sách VideoRecord của một kênh (result['videos'])
+    """
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Schema dict cũ (dùng khi ghi JSON)
+        """
+        return [video.to_dict() for video in self]
+
+    def total_views(self) -> int:
+        return sum(video.views for video in self)
+
+
+def summarize_videos(videos: Iterable, top_n: int = 10) -> Tuple[Dict[str, int], int, List]:
+    """
+    Thống kê cho báo cáo trong MỘT lần duyệt: số video theo nguồn, số video có view
+    và top N video nhiều view nhất (heap giới hạn N phần tử, không sort toàn bộ).
+    VideoList được đọc thẳng qua thuộc tính và mã nguồn; iterable khác (dict từ
+    JSON đã lưu, list hỗn hợp) đi qua giao diện dict.
+    Returns: (sources, videos_with_views, top) - top sắp giảm dần theo view
+    """
+    if isinstance(videos, VideoList):
+        return _summarize_records(videos, top_n)
+
+    sources = {}
+    with_views = 0
+    heap = []  # (views, thứ tự, video) - thứ tự giữ ổn định khi trùng view
+
+    for order, video in enumerate(videos):
+        source = video.get('source', 'unknown')
+        sources[source] = sources.get(source, 0) + 1
+
+        views = video['views']
+        if views <= 0:
+            continue
+        with_views += 1
+        entry = (views, -order, video)
+        if len(heap) < top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    top = [video for _, _, video in sorted(heap, reverse=True)]
+    return sources, with_views, top
+
+
+def _summarize_records(videos: 'VideoList', top_n: int) -> Tuple[Dict[str, int], int, List]:
+    """
+    summarize_videos cho VideoRecord: đếm theo source_code (list thay cho dict chuỗi),
+    chỉ đụng tới heap khi view vượt ngưỡng top N hiện tại
+    """
+    counts = [0] * len(SOURCES)
+    with_views = 0
+    heap = []
+    floor = 0  # View nhỏ nhất trong heap khi heap đã đủ N phần tử
+
+    for order, video in enumerate(videos):
+        counts[video.source_code] += 1
+
+        views = video.views
+        if views <= 0:
+            continue
+        with_views += 1
+        if len(heap) < top_n:
+            heapq.heappush(heap, (views, -order, video))
+            if len(heap) == top_n:
+                floor = heap[0][0]
+        elif views > floor:
+            # Trùng view thì video đứng trước giữ chỗ (như bản dùng dict)
+            heapq.heapreplace(heap, (views, -order, video))
+            floor = heap[0][0]
+
+    sources = {SOURCES[code]: count for code, count in enumerate(counts) if count}
+    top = [video for _, _, video in sorted(heap, reverse=True)]
+    return sources, with_views, top
+
+
+def video_to_json(video) -> Optional[Dict]:
+    """
+    `default` cho json.dump: chuyển VideoRecord về dict
+    """
+    if isinstance(video, VideoRecord):
+        return video.to_dict()
+    raise TypeError(f"Object of type {type(video).__name__} is not JSON serializable")
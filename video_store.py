@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+SQLite video store - lưu view mới nhất của từng video theo kênh
+Dùng cho chế độ incremental: chỉ scrape lại các video mới, video cũ lấy từ store
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    channel     TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    views       INTEGER NOT NULL,
+    view_text   TEXT,
+    source      TEXT,
+    link        TEXT,
+    caption     TEXT,
+    first_seen  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (channel, video_id)
+);
+"""
+
+
+def channel_key(channel_url: str) -> str:
+    """
+    Khóa kênh trong store: username không có @ (https://www.tiktok.com/@abc -> abc)
+    """
+    path = channel_url.split('?')[0].rstrip('/')
+    for part in reversed(path.split('/')):
+        if part.startswith('@'):
+            return part[1:].lower()
+    return path.split('/')[-1].lower()
+
+
+class VideoStore:
+    """
+    Store SQLite keyed theo (channel, video_id), giữ view mới nhất + thời gian cập nhật
+    """
+
+    def __init__(self, path: str = 'tiktok_views.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def get_videos(self, channel: str) -> Dict[str, Dict]:
+        """
+        Tất cả video đã lưu của kênh, mới nhất trước (ID tăng theo thời gian đăng)
+        Returns: {video_id: row}
+        """
+        rows = self.conn.execute(
+            'SELECT * FROM videos WHERE channel = ? ORDER BY LENGTH(video_id) DESC, video_id DESC',
+            (channel,)
+        )
+        return {row['video_id']: dict(row) for row in rows}
+
+    def known_ids(self, channel: str) -> set:
+        """
+        Tập video ID đã có trong store của kênh
+        """
+        rows = self.conn.execute('SELECT video_id FROM videos WHERE channel = ?', (channel,))
+        return {row[0] for row in rows}
+
+    def total_views(self, channel: str) -> int:
+        """
+        Tổng view đang lưu của kênh
+        """
+        row = self.conn.execute(
+            'SELECT COALESCE(SUM(views), 0) FROM videos WHERE channel = ?', (channel,)
+        ).fetchone()
+        return row[0]
+
+    def upsert_videos(self, channel: str, videos: List[Dict], updated_at: Optional[str] = None) -> int:
+        """
+        Ghi view mới nhất cho các video (video cần có 'video_id')
+        Returns: số video đã ghi
+        """
+        updated_at = updated_at or datetime.now().isoformat()
+        rows = [
+            (channel, video['video_id'], video['views'], video.get('view_text'), video.get('source'),
+             video.get('link'), video.get('caption'), updated_at, updated_at)
+            for video in videos if video.get('video_id')
+        ]
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO videos (channel, video_id, views, view_text, source, link, caption,
+                                    first_seen, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (channel, video_id) DO UPDATE SET
+                    views = excluded.views,
+                    view_text = excluded.view_text,
+                    source = excluded.source,
+                    link = excluded.link,
+                    caption = excluded.caption,
+                    updated_at = excluded.updated_at
+            """, rows)
+
+        return len(rows)
+
+    def close(self):
+        self.conn.close()